@@ -1,11 +1,21 @@
+import base64
+import operator
+import functools
 from collections import OrderedDict
 
+from bson import json_util
+from modularodm import Q
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.utils.urls import (
     replace_query_param, remove_query_param
 )
 
+from api.base.filters import ODMOrderingFilter
+
+
 class JSONAPIPagination(pagination.PageNumberPagination):
     """Custom paginator that formats responses in a JSON-API compatible format."""
 
@@ -39,3 +49,147 @@ class JSONAPIPagination(pagination.PageNumberPagination):
             ])),
         ])
         return Response(response_dict)
+
+
+class JSONAPICursorPagination(pagination.BasePagination):
+    """Paginator for modular-odm querysets that pages by position in the
+    ordering of the results instead of by page number, in the same format as
+    `JSONAPIPagination`. Each page is a range query on the ordering fields,
+    so deep pages are as fast as the first when the ordering is indexed, and
+    the total is only counted when requested with ``page[total]=true``.
+
+    Results are ordered by the view's ordering, then by primary key. Views
+    must build their queries with `ODMFilterMixin`.
+    """
+
+    cursor_query_param = 'page[cursor]'
+    page_size_query_param = 'page[size]'
+    total_query_param = 'page[total]'
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = None
+
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return pagination._positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering of the results as (field, descending) pairs."""
+        ordering = ODMOrderingFilter().get_ordering(request, queryset, view) or ()
+        fields = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+        if '_id' not in [field for field, _ in fields]:
+            descending = fields[-1][1] if fields else False
+            fields.append(('_id', descending))
+        return fields
+
+    def decode_cursor(self, request):
+        """Return the direction and position encoded in the cursor of the
+        request, or those of the first page if there is no cursor.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return False, None
+        try:
+            cursor = json_util.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            reverse, position = bool(cursor['r']), cursor['p']
+            if position is not None and not (
+                isinstance(position, list) and len(position) == len(self.fields)
+            ):
+                raise ValueError('Cursor position does not match the ordering')
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, position
+
+    def encode_cursor(self, reverse, position):
+        cursor = base64.urlsafe_b64encode(json_util.dumps({'r': reverse, 'p': position}))
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_position(self, obj):
+        return [getattr(obj, field) for field, _ in self.fields]
+
+    def position_query(self, position, reverse):
+        """Return a query for the results after `position` in the ordering,
+        or before it if `reverse`.
+        """
+        clauses = []
+        for index, (field, descending) in enumerate(self.fields):
+            clause = Q(field, 'lt' if descending != reverse else 'gt', position[index])
+            for (prior, _), value in zip(self.fields[:index], position):
+                clause = Q(prior, 'eq', value) & clause
+            clauses.append(clause)
+        return functools.reduce(operator.or_, clauses)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.fields = self.get_ordering(request, queryset, view)
+        self.reverse, self.position = self.decode_cursor(request)
+
+        self.total = None
+        if request.query_params.get(self.total_query_param) in ('true', 'True', '1'):
+            self.total = queryset.count()
+
+        query = view.get_query_from_request()
+        if self.position is not None:
+            query = query & self.position_query(self.position, self.reverse)
+        sort = [
+            ('-' if descending != self.reverse else '') + field
+            for field, descending in self.fields
+        ]
+        results = list(queryset.schema.find(query).sort(*sort).limit(self.page_size + 1))
+
+        self.has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+        return self.page
+
+    def get_next_link(self):
+        # Reverse pages are reached from the page after them, or are the last
+        has_next = self.position is not None if self.reverse else self.has_more
+        if not (has_next and self.page):
+            return None
+        return self.encode_cursor(False, self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        has_previous = self.has_more if self.reverse else self.position is not None
+        if not (has_previous and self.page):
+            return None
+        return self.encode_cursor(True, self.get_position(self.page[0]))
+
+    def get_first_link(self):
+        if self.get_previous_link() is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return remove_query_param(url, self.cursor_query_param)
+
+    def get_last_link(self):
+        if self.get_next_link() is None:
+            return None
+        return self.encode_cursor(True, None)
+
+    def get_paginated_response(self, data):
+        response_dict = OrderedDict([
+            ('data', data),
+            ('links', OrderedDict([
+                ('first', self.get_first_link()),
+                ('last', self.get_last_link()),
+                ('prev', self.get_previous_link()),
+                ('next', self.get_next_link()),
+                ('meta', OrderedDict([
+                    ('total', self.total),
+                    ('per_page', self.page_size),
+                ]))
+            ])),
+        ])
+        return Response(response_dict)
@@ -2,6 +2,8 @@ import collections
 import re
 
 from rest_framework import serializers as ser
+from rest_framework.fields import SkipField
+from rest_framework.exceptions import ValidationError
 from website.util.sanitize import strip_html
 from api.base.utils import absolute_reverse, waterbutler_url_for
 
@@ -63,7 +65,21 @@ class LinksField(ser.Field):
         return obj
 
     def to_representation(self, obj):
-        ret = _rapply(self.links, _url_val, obj=obj, serializer=self.parent)
+        links = self.links
+        fieldset = self.parent.get_fieldset()
+        if fieldset is not None:
+            # Relationships are only resolved if requested, since their counts may be expensive
+            links = {
+                key: value for key, value in links.items()
+                if not isinstance(value, collections.Mapping) or key in fieldset
+            }
+        ret = _rapply(links, _url_val, obj=obj, serializer=self.parent)
+        # Link primary data to the related records side-loaded by the view, if any
+        context = self.parent.context
+        if context.get('included') is not None and not context.get('side_loaded'):
+            for name in self.parent.get_includes():
+                if name in ret:
+                    ret[name]['data'] = self.parent.get_linkage(obj, name)
         if hasattr(obj, 'get_absolute_url'):
             ret['self'] = obj.get_absolute_url()
         return ret
@@ -141,6 +157,24 @@ class WaterbutlerLink(Link):
         return waterbutler_url_for(obj['waterbutler_type'], obj['provider'], obj['path'], obj['node_id'], obj['cookie'], obj['args'])
 
 
+class Include(object):
+    """Relationship that clients can side-load with `include=`. Used in
+    conjunction with `JSONAPISerializer.includable`.
+
+    :param serializer_class: Serializer of the related records, or None for
+        the serializer declaring the relationship
+    :param keys: Name of a serializer method that returns the primary keys of
+        the records related to an object
+    :param load: Name of a serializer method that loads the related records
+        from a list of primary keys, in as few queries as possible
+    """
+
+    def __init__(self, serializer_class, keys, load):
+        self.serializer_class = serializer_class
+        self.keys = keys
+        self.load = load
+
+
 class JSONAPIListSerializer(ser.ListSerializer):
 
     def to_representation(self, data):
@@ -161,6 +195,80 @@ class JSONAPISerializer(ser.Serializer):
         kwargs['child'] = cls()
         return JSONAPIListSerializer(*args, **kwargs)
 
+    # Relationships that can be side-loaded, mapped to `Include` instances
+    includable = {}
+
+    def get_fieldset(self):
+        """Return the names of the fields requested for this type with
+        `fields[<type>]=`, or None if all fields are requested.
+        """
+        request = self.context.get('request')
+        if request is None:
+            return None
+        param = 'fields[{0}]'.format(self.Meta.type_)
+        if param not in request.query_params:
+            return None
+        return set(name.strip() for name in request.query_params[param].split(',') if name.strip())
+
+    def get_includes(self, strict=False):
+        """Return the names of the relationships requested with `include=`
+        that this serializer can side-load.
+
+        :param bool strict: Raise a `ValidationError` if other relationships
+            are requested
+        """
+        request = self.context.get('request')
+        if request is None or not request.query_params.get('include'):
+            return []
+        names = [name.strip() for name in request.query_params['include'].split(',') if name.strip()]
+        invalid = [name for name in names if name not in self.includable]
+        if strict and invalid:
+            raise ValidationError(detail='Cannot include {0}.'.format(', '.join(invalid)))
+        return [name for name in names if name in self.includable]
+
+    def get_linkage(self, obj, name):
+        """Return the resource identifiers of the records related to `obj` by
+        relationship `name` that are side-loaded in the response.
+        """
+        include = self.includable[name]
+        serializer_class = include.serializer_class or type(self)
+        type_ = serializer_class.Meta.type_
+        included = self.context['included']
+        return [
+            {'type': type_, 'id': key}
+            for key in getattr(self, include.keys)(obj)
+            if (type_, key) in included
+        ]
+
+    def get_included(self, objs):
+        """Serialize the records related to `objs` by the relationships
+        requested with `include=`, loading each relationship in one batch.
+        Records already serialized are skipped, and the keys of the records
+        included are added to `context['included']` so that primary data can
+        link to them.
+        """
+        type_ = self.Meta.type_
+        included = self.context.setdefault('included', set())
+        # Primary data is linked to but not repeated
+        included.update((type_, obj._id) for obj in objs)
+        ret = []
+        for name in self.get_includes(strict=True):
+            include = self.includable[name]
+            serializer_class = include.serializer_class or type(self)
+            type_ = serializer_class.Meta.type_
+            keys = []
+            for obj in objs:
+                for key in getattr(self, include.keys)(obj):
+                    if (type_, key) not in included and key not in keys:
+                        keys.append(key)
+            if not keys:
+                continue
+            serializer = serializer_class(context=dict(self.context, side_loaded=True))
+            for record in getattr(self, include.load)(keys):
+                included.add((type_, record._id))
+                ret.append(serializer.to_representation(record, envelope=None))
+        return ret
+
     # overrides Serializer
     def to_representation(self, obj, envelope='data'):
         """Serialize to final representation.
@@ -172,7 +280,22 @@ class JSONAPISerializer(ser.Serializer):
         meta = getattr(self, 'Meta', None)
         type_ = getattr(meta, 'type_', None)
         assert type_ is not None, 'Must define Meta.type_'
-        data = super(JSONAPISerializer, self).to_representation(obj)
+        data = collections.OrderedDict()
+        fieldset = self.get_fieldset()
+        for field in self.fields.values():
+            if field.write_only:
+                continue
+            # Computed fields are skipped rather than computed and discarded
+            if fieldset is not None and field.field_name not in fieldset and field.field_name not in ('id', 'links'):
+                continue
+            try:
+                attribute = field.get_attribute(obj)
+            except SkipField:
+                continue
+            if attribute is None:
+                data[field.field_name] = None
+            else:
+                data[field.field_name] = field.to_representation(attribute)
         data['type'] = type_
         if envelope:
             ret[envelope] = data
@@ -6,9 +6,11 @@ from rest_framework.reverse import reverse
 from api.base.exceptions import Gone
 from rest_framework.exceptions import NotFound
 from modularodm.exceptions import NoResultsFound
+from modularodm.storage.mongostorage import translate_query
 
 from website import util as website_util  # noqa
 from website import settings as website_settings
+from framework.mongo import database
 
 
 def absolute_reverse(view_name, query_kwargs=None, args=None, kwargs=None):
@@ -71,3 +73,57 @@ def waterbutler_url_for(request_type, provider, path, node_id, token, obj_args=N
 
     url.args.update(query)
     return url.url
+
+
+class KeyOrderedQuerySet(object):
+    """The records of `model_cls` with primary keys `keys` that match `query`,
+    in the order of `keys`. Slices load only their own records, in a single
+    query, so that pagination doesn't load the whole list.
+
+    :param each: Optional function called with each record as it is loaded
+    """
+
+    def __init__(self, model_cls, keys, query=None, each=None):
+        self.model_cls = model_cls
+        self.keys = list(keys)
+        self.query = query
+        self.each = each
+        self._matching = None
+
+    @property
+    def matching_keys(self):
+        if self._matching is None:
+            if self.query is None:
+                self._matching = self.keys
+            else:
+                query = Q('_id', 'in', self.keys) & self.query
+                self.model_cls._process_query(query)  # replace records with their keys
+                matched = set(
+                    doc['_id']
+                    for doc in database[self.model_cls._name].find(translate_query(query), {'_id': True})
+                )
+                self._matching = [key for key in self.keys if key in matched]
+        return self._matching
+
+    def count(self):
+        return len(self.matching_keys)
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1 or None][0]
+        keys = self.matching_keys[index]
+        records = {
+            record._id: record
+            for record in self.model_cls.find(Q('_id', 'in', keys))
+        }
+        results = [records[key] for key in keys if key in records]
+        if self.each:
+            for record in results:
+                self.each(record)
+        return results
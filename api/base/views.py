@@ -22,3 +22,51 @@ def root(request, format=None):
             'users': absolute_reverse('users:user-list'),
         }
     })
+
+
+
+class IncludeMixin(object):
+    """View mixin that side-loads the relationships requested with `include=`
+    into the `included` member of responses, as in JSON-API compound
+    documents. The records related to a page of results are loaded together
+    rather than once per resource.
+
+    Serializers declare the relationships they can side-load in `includable`.
+    """
+
+    def get_included(self, objs, context):
+        """Return the serialized records to side-load for `objs`, or None if
+        none were requested. Must run before the primary data is serialized
+        with the same `context`, so that it can link to them.
+        """
+        serializer = self.get_serializer_class()(context=context)
+        if not serializer.get_includes(strict=True):
+            return None
+        return serializer.get_included(objs)
+
+    # overrides ListModelMixin
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objs = list(page if page is not None else queryset)
+
+        context = self.get_serializer_context()
+        included = self.get_included(objs, context)
+        data = self.get_serializer_class()(objs, many=True, context=context).data
+        if page is None:
+            return Response(data)
+        response = self.get_paginated_response(data)
+        if included is not None:
+            response.data['included'] = included
+        return response
+
+    # overrides RetrieveModelMixin
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+
+        context = self.get_serializer_context()
+        included = self.get_included([instance], context)
+        response = Response(self.get_serializer_class()(instance, context=context).data)
+        if included is not None:
+            response.data['included'] = included
+        return response
@@ -1,9 +1,12 @@
+from modularodm import Q
 from rest_framework import serializers as ser
 
-from website.models import Node
+from website.models import Node, User
+from website.addons.osfstorage import usage
 from framework.auth.core import Auth
 from rest_framework import exceptions
-from api.base.serializers import JSONAPISerializer, LinksField, Link, WaterbutlerLink
+from api.base.serializers import JSONAPISerializer, LinksField, Link, WaterbutlerLink, Include
+from api.users.serializers import UserSerializer
 
 
 class NodeSerializer(JSONAPISerializer):
@@ -63,8 +66,15 @@ class NodeSerializer(JSONAPISerializer):
                                                             'public and private nodes. Administrators on a parent '
                                                             'node have implicit read permissions for all child nodes',
                               )
+    storage = ser.SerializerMethodField(help_text='Bytes stored in OSF Storage by the latest versions of the files '
+                                                  'of this node, and of this node and its components')
     # TODO: finish me
 
+    includable = {
+        'contributors': Include(UserSerializer, keys='get_contributor_keys', load='load_contributors'),
+        'children': Include(None, keys='get_child_keys', load='load_children'),
+    }
+
     class Meta:
         type_ = 'nodes'
 
@@ -83,20 +93,44 @@ class NodeSerializer(JSONAPISerializer):
 
     def get_node_count(self, obj):
         auth = self.get_user_auth(self.context['request'])
-        nodes = [node for node in obj.nodes if node.can_view(auth) and node.primary]
-        return len(nodes)
+        query = Q('_id', 'in', obj.nodes._to_primary_keys())
+        return Node.find_viewable(query, auth).count()
 
     def get_contrib_count(self, obj):
         return len(obj.contributors)
 
     def get_registration_count(self, obj):
         auth = self.get_user_auth(self.context['request'])
-        registrations = [node for node in obj.node__registrations if node.can_view(auth)]
-        return len(registrations)
+        query = Q('registered_from', 'eq', obj._id)
+        return Node.find_viewable(query, auth).count()
 
     def get_pointers_count(self, obj):
         return len(obj.nodes_pointer)
 
+    @staticmethod
+    def get_contributor_keys(obj):
+        return obj.contributors._to_primary_keys()
+
+    @staticmethod
+    def load_contributors(keys):
+        return User.find(Q('_id', 'in', keys))
+
+    @staticmethod
+    def get_child_keys(obj):
+        return obj.nodes._to_primary_keys()
+
+    def load_children(self, keys):
+        auth = self.get_user_auth(self.context['request'])
+        return Node.find_viewable(Q('_id', 'in', keys), auth)
+
+    @staticmethod
+    def get_storage(obj):
+        ret = {
+            'node': usage.get(obj._id),
+            'total': usage.subtree(obj),
+        }
+        return ret
+
     @staticmethod
     def get_properties(obj):
         ret = {
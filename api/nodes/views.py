@@ -5,12 +5,14 @@ from rest_framework import generics, permissions as drf_permissions
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
 from framework.auth.core import Auth
-from website.models import Node, Pointer
+from website.models import Node, Pointer, User
 from api.users.serializers import ContributorSerializer
-from api.base.filters import ODMFilterMixin, ListFilterMixin
-from api.base.utils import get_object_or_error, waterbutler_url_for
+from api.base.filters import ODMFilterMixin, query_params_to_fields
+from api.base.utils import get_object_or_error, waterbutler_url_for, KeyOrderedQuerySet
+from api.base.pagination import JSONAPICursorPagination
+from api.base.views import IncludeMixin
 from .serializers import NodeSerializer, NodeLinksSerializer, NodeFilesSerializer
-from .permissions import ContributorOrPublic, ReadOnlyIfRegistration, ContributorOrPublicForPointers
+from .permissions import ContributorOrPublic, ReadOnlyIfRegistration, ContributorOrPublicForPointers, get_user_auth
 
 
 class NodeMixin(object):
@@ -28,7 +30,7 @@ class NodeMixin(object):
         return obj
 
 
-class NodeList(generics.ListCreateAPIView, ODMFilterMixin):
+class NodeList(IncludeMixin, generics.ListCreateAPIView, ODMFilterMixin):
     """Projects and components.
 
     On the front end, nodes are considered 'projects' or 'components'. The difference between a project and a component
@@ -38,12 +40,16 @@ class NodeList(generics.ListCreateAPIView, ODMFilterMixin):
     project, and children nodes may have a category of project.
 
     By default, a GET will return a list of public nodes, sorted by date_modified. You can filter Nodes by their title,
-    description, and public fields.
+    description, and public fields. Pages are linked by cursor; pass `page[total]=true` to count all results.
+
+    Pass `fields[nodes]=title,children` to return only the named fields and relationships of each node, and
+    `include=contributors,children` to return the related users and nodes in the same response.
     """
     permission_classes = (
         drf_permissions.IsAuthenticatedOrReadOnly,
     )
     serializer_class = NodeSerializer
+    pagination_class = JSONAPICursorPagination
     ordering = ('-date_modified', )  # default ordering
 
     # overrides ODMFilterMixin
@@ -79,7 +85,7 @@ class NodeList(generics.ListCreateAPIView, ODMFilterMixin):
         serializer.save(creator=user)
 
 
-class NodeDetail(generics.RetrieveUpdateDestroyAPIView, NodeMixin):
+class NodeDetail(IncludeMixin, generics.RetrieveUpdateDestroyAPIView, NodeMixin):
     """Projects and component details.
 
     On the front end, nodes are considered 'projects' or 'components'. The difference between a project and a component
@@ -113,7 +119,7 @@ class NodeDetail(generics.RetrieveUpdateDestroyAPIView, NodeMixin):
         node.save()
 
 
-class NodeContributorsList(generics.ListAPIView, ListFilterMixin, NodeMixin):
+class NodeContributorsList(generics.ListAPIView, ODMFilterMixin, NodeMixin):
     """Contributors (users) for a node.
 
     Contributors are users who can make changes to the node or, in the case of private nodes,
@@ -129,21 +135,35 @@ class NodeContributorsList(generics.ListAPIView, ListFilterMixin, NodeMixin):
 
     serializer_class = ContributorSerializer
 
-    def get_default_queryset(self):
-        node = self.get_node()
-        visible_contributors = node.visible_contributor_ids
-        contributors = []
-        for contributor in node.contributors:
-            contributor.bibliographic = contributor._id in visible_contributors
-            contributors.append(contributor)
-        return contributors
+    # overrides FilterMixin
+    def is_filterable_field(self, key):
+        # Filters on fields of the node rather than the user are applied in get_queryset
+        if key.strip() in self.serializer_class.local_filterable:
+            return False
+        return super(NodeContributorsList, self).is_filterable_field(key)
 
     # overrides ListAPIView
     def get_queryset(self):
-        return self.get_queryset_from_request()
+        node = self.get_node()
+        visible_contributors = set(node.visible_contributor_ids)
+        contributor_ids = node.contributors._to_primary_keys()
+
+        bibliographic = query_params_to_fields(self.request.QUERY_PARAMS).get('bibliographic')
+        if bibliographic is not None:
+            bibliographic = self.convert_value(bibliographic, 'bibliographic')
+            contributor_ids = [
+                each for each in contributor_ids
+                if (each in visible_contributors) == bibliographic
+            ]
+
+        def set_bibliographic(contributor):
+            contributor.bibliographic = contributor._id in visible_contributors
 
+        param_query = self.query_params_to_odm_query(self.request.QUERY_PARAMS)
+        return KeyOrderedQuerySet(User, contributor_ids, query=param_query, each=set_bibliographic)
 
-class NodeRegistrationsList(generics.ListAPIView, NodeMixin):
+
+class NodeRegistrationsList(IncludeMixin, generics.ListAPIView, NodeMixin):
     """Registrations of the current node.
 
     Registrations are read-only snapshots of a project. This view lists all of the existing registrations
@@ -154,20 +174,15 @@ class NodeRegistrationsList(generics.ListAPIView, NodeMixin):
     )
 
     serializer_class = NodeSerializer
+    ordering = ('date_created', )  # default ordering
 
     # overrides ListAPIView
     def get_queryset(self):
-        nodes = self.get_node().node__registrations
-        user = self.request.user
-        if user.is_anonymous():
-            auth = Auth(None)
-        else:
-            auth = Auth(user)
-        registrations = [node for node in nodes if node.can_view(auth)]
-        return registrations
+        query = Q('registered_from', 'eq', self.get_node()._id)
+        return Node.find_viewable(query, get_user_auth(self.request))
 
 
-class NodeChildrenList(generics.ListCreateAPIView, NodeMixin):
+class NodeChildrenList(IncludeMixin, generics.ListCreateAPIView, NodeMixin):
     """Children of the current node.
 
     This will get the next level of child nodes for the selected node if the current user has read access for those
@@ -184,14 +199,11 @@ class NodeChildrenList(generics.ListCreateAPIView, NodeMixin):
 
     # overrides ListAPIView
     def get_queryset(self):
-        nodes = self.get_node().nodes
-        user = self.request.user
-        if user.is_anonymous():
-            auth = Auth(None)
-        else:
-            auth = Auth(user)
-        children = [node for node in nodes if node.can_view(auth) and node.primary]
-        return children
+        # Pointers are stored separately, so only primary children match
+        child_ids = self.get_node().nodes._to_primary_keys()
+        query = Node.viewable_query(Q('_id', 'in', child_ids), get_user_auth(self.request))
+        # Keep the order in which the children are stored on the node
+        return KeyOrderedQuerySet(Node, child_ids, query=query)
 
     # overrides ListCreateAPIView
     def perform_create(self, serializer):
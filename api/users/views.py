@@ -2,10 +2,12 @@ from rest_framework import generics, permissions as drf_permissions
 from modularodm import Q
 
 from website.models import User, Node
-from framework.auth.core import Auth
 from api.base.utils import get_object_or_error
 from api.base.filters import ODMFilterMixin
+from api.base.pagination import JSONAPICursorPagination
+from api.base.views import IncludeMixin
 from api.nodes.serializers import NodeSerializer
+from api.nodes.permissions import get_user_auth
 from .serializers import UserSerializer
 from .permissions import ReadOnlyOrCurrentUser
 from django.contrib.auth.models import AnonymousUser
@@ -51,6 +53,7 @@ class UserList(generics.ListAPIView, ODMFilterMixin):
     )
 
     serializer_class = UserSerializer
+    pagination_class = JSONAPICursorPagination
     ordering = ('-date_registered')
 
     # overrides ODMFilterMixin
@@ -86,7 +89,7 @@ class UserDetail(generics.RetrieveUpdateAPIView, UserMixin):
         return {'request': self.request}
 
 
-class UserNodes(generics.ListAPIView, UserMixin, ODMFilterMixin):
+class UserNodes(IncludeMixin, generics.ListAPIView, UserMixin, ODMFilterMixin):
     """Nodes belonging to a user.
     Return a list of nodes that the user contributes to. """
 
@@ -107,12 +110,5 @@ class UserNodes(generics.ListAPIView, UserMixin, ODMFilterMixin):
 
     # overrides ListAPIView
     def get_queryset(self):
-        current_user = self.request.user
-        if current_user.is_anonymous():
-            auth = Auth(None)
-        else:
-            auth = Auth(current_user)
         query = self.get_query_from_request()
-        raw_nodes = Node.find(self.get_default_odm_query() & query)
-        nodes = [each for each in raw_nodes if each.is_public or each.can_view(auth)]
-        return nodes
+        return Node.find_viewable(query, get_user_auth(self.request))
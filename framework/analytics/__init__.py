@@ -4,6 +4,8 @@
 import functools
 from datetime import datetime
 
+from pymongo.errors import DuplicateKeyError
+
 from framework.mongo import database
 from framework.sessions import session
 
@@ -72,20 +74,10 @@ def build_page(rex, kwargs):
         return None
 
 
-def update_counter(page, db=None):
-    """Update counters for page.
-
-    :param str page: Colon-delimited page key in analytics collection
-    :param db: MongoDB database or `None`
+def _counter_update(page, date):
+    """Build the update to the counters of `page`, and record the visit in the
+    session.
     """
-    db = db or database
-    collection = db['pagecounters']
-
-    date = datetime.utcnow()
-    date = date.strftime('%Y/%m/%d')
-
-    page = clean_page(page)
-
     d = {'$inc': {}}
 
     visited_by_date = session.data.get('visited_by_date')
@@ -114,9 +106,69 @@ def update_counter(page, db=None):
         visited.append(page)
         session.data['visited'] = visited
     d['$inc']['total'] = 1
+    return d
+
+
+def update_counter(page, db=None):
+    """Update counters for page.
+
+    :param str page: Colon-delimited page key in analytics collection
+    :param db: MongoDB database or `None`
+    """
+    db = db or database
+    collection = db['pagecounters']
+
+    date = datetime.utcnow()
+    date = date.strftime('%Y/%m/%d')
+
+    page = clean_page(page)
+
+    d = _counter_update(page, date)
     collection.update({'_id': page}, d, True, False)
 
 
+def update_counter_pages(pages, db=None):
+    """Update counters for many pages at once. Missing counters are created
+    with one insert, then pages whose counters get the same increments are
+    updated together.
+
+    :param list pages: Colon-delimited page keys in analytics collection
+    :param db: MongoDB database or `None`
+    """
+    db = db or database
+    collection = db['pagecounters']
+
+    date = datetime.utcnow()
+    date = date.strftime('%Y/%m/%d')
+
+    pages = [clean_page(page) for page in pages]
+    if not pages:
+        return
+
+    groups = {}
+    for page in pages:
+        d = _counter_update(page, date)
+        groups.setdefault(tuple(sorted(d['$inc'])), (d, []))[1].append(page)
+
+    existing = set(
+        each['_id'] for each in
+        collection.find({'_id': {'$in': pages}}, {'_id': True})
+    )
+    missing = [page for page in pages if page not in existing]
+    if missing:
+        try:
+            collection.insert(
+                [{'_id': page} for page in missing],
+                continue_on_error=True,
+                manipulate=False,
+            )
+        except DuplicateKeyError:
+            # Created by a concurrent request; the rest were still inserted
+            pass
+    for d, group in groups.values():
+        collection.update({'_id': {'$in': group}}, d, multi=True)
+
+
 def update_counters(rex, db=None):
     """Create a decorator that updates analytics in `pagecounters` when the
     decorated function is called. Note: call inner function before incrementing
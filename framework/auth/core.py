@@ -190,6 +190,9 @@ class User(GuidStoredObject, AddonModelMixin):
         'social',
     }
 
+    # The deep URL of a user depends only on its primary key
+    DEEP_URL_FIELDS = set()
+
     # TODO: Add SEARCH_UPDATE_NODE_FIELDS, for fields that should trigger a
     #   search update for all nodes to which the user is a contributor.
 
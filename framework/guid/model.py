@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
-import random
-
+from modularodm import Q
 from modularodm import fields
+from pymongo.errors import DuplicateKeyError
 
+from framework.mongo import database
 from framework.mongo import StoredObject
+from framework.guid import pool
+from framework.guid import resolutions
 
 from modularodm.storage.base import KeyExistsException
 
@@ -23,6 +26,18 @@ class Guid(StoredObject):
     def __repr__(self):
         return '<id:{0}, referent:({1}, {2})>'.format(self._id, self.referent._primary_key, self.referent._name)
 
+    def save(self, *args, **kwargs):
+        saved = super(Guid, self).save(*args, **kwargs)
+        if 'referent' in saved:
+            resolutions.invalidate([self._primary_key])
+        return saved
+
+    @classmethod
+    def remove_one(cls, which, rm=True):
+        guid = cls._which_to_obj(which)
+        super(Guid, cls).remove_one(guid, rm=rm)
+        resolutions.invalidate([guid._primary_key])
+
 
 class GuidStoredObject(StoredObject):
     """Subclass of `StoredObject` that provisions a `Guid` for each new instance
@@ -32,6 +47,10 @@ class GuidStoredObject(StoredObject):
     the key generated by the associated `Guid` will also be a string.
     """
 
+    # Fields other than the primary key on which `deep_url` depends, or None
+    # if it may depend on any field
+    DEEP_URL_FIELDS = None
+
     @property
     def deep_url(self):
         return None
@@ -55,32 +74,72 @@ class GuidStoredObject(StoredObject):
             )
             guid.save()
 
-        # Else create GUID optimistically
+        # Else claim an unused GUID, saving it with its referent
         else:
             while True:
-                # Create GUID
-                guid_id = ''.join(random.sample(ALPHABET, 5))
-
-                # Check GUID against blacklist
-                blacklist_guid = BlacklistGuid.load(guid_id)
-                if not blacklist_guid:
-                    try:
-                        guid = Guid(_id=guid_id)
-                        guid.save()
-                        break
-                    except KeyExistsException:
-                        pass
-
-            guid.referent = (guid._primary_key, self._name)
-            guid.save()
+                guid_id = pool.claim()
+                try:
+                    guid = Guid(_id=guid_id, referent=(guid_id, self._name))
+                    guid.save()
+                    break
+                except KeyExistsException:
+                    # Taken by a record created with this key since the pool
+                    # was filled
+                    pass
 
             # Set primary key to GUID key
             self._primary_key = guid._primary_key
 
+    @classmethod
+    def reserve_guids(cls, count, db=None):
+        """Create `count` GUIDs for new records of this schema at once, and
+        return their keys. Assign the keys to the records before saving them.
+        """
+        db = db or database
+        guid_ids = pool.claim_many(count, db=db)
+        if not guid_ids:
+            return []
+        try:
+            db[Guid._name].insert(
+                [{'_id': guid_id, 'referent': [guid_id, cls._name]} for guid_id in guid_ids],
+                continue_on_error=True,
+                manipulate=False,
+            )
+        except DuplicateKeyError:
+            # Replace keys taken by records created with them since the pool
+            # was filled
+            taken = [
+                doc['_id'] for doc in db[Guid._name].find({'_id': {'$in': guid_ids}})
+                if doc.get('referent') != [doc['_id'], cls._name]
+            ]
+            guid_ids = [each for each in guid_ids if each not in taken]
+            guid_ids.extend(cls.reserve_guids(len(taken), db=db))
+        # Load the new GUIDs into the cache, so that saving their records does
+        # not look each one up
+        list(Guid.find(Q('_id', 'in', guid_ids)))
+        return guid_ids
+
+    def _moves_deep_url(self, saved):
+        if self.DEEP_URL_FIELDS is None:
+            return bool(saved)
+        return bool(set(saved) & self.DEEP_URL_FIELDS)
+
     def save(self, *args, **kwargs):
         """Ensure GUID on save."""
-        self._ensure_guid()
-        return super(GuidStoredObject, self).save(*args, **kwargs)
+        stored_key = self._stored_key if self._is_loaded else None
+        # Records that are stored under an unchanged key already have a GUID
+        if not self._is_loaded or self._primary_key != self._stored_key:
+            self._ensure_guid()
+        saved = super(GuidStoredObject, self).save(*args, **kwargs)
+        if stored_key and (stored_key != self._primary_key or self._moves_deep_url(saved)):
+            resolutions.invalidate([stored_key])
+        return saved
+
+    @classmethod
+    def remove_one(cls, which, rm=True):
+        obj = cls._which_to_obj(which)
+        super(GuidStoredObject, cls).remove_one(obj, rm=rm)
+        resolutions.invalidate([obj._primary_key])
 
     def __str__(self):
         return str(self._id)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Pool of unused guids, generated in batches ahead of time so that a new
+record claims its guid with one atomic operation instead of guessing ids
+until it finds a free one. Ids are checked against the blacklist and the
+existing guids when they are added to the pool.
+
+    {
+        '_id': <guid>,
+        'claim': <token of the claimant, while being claimed in bulk>,
+    }
+"""
+
+import uuid
+import random
+
+from pymongo.errors import DuplicateKeyError
+
+from framework.mongo import database
+from website import settings
+
+
+COLLECTION = 'guidpool'
+
+
+def replenish(count=None, db=None):
+    """Add up to `count` new ids to the pool, leaving out ids that are
+    blacklisted, in use or already in the pool. Return the number added.
+    """
+    # Avoid circular imports
+    from framework.guid.model import ALPHABET, BlacklistGuid, Guid
+    db = db or database  # default to local proxy
+    count = count or settings.GUID_POOL_BATCH_SIZE
+
+    candidates = set(''.join(random.sample(ALPHABET, 5)) for _ in range(count))
+    query = {'_id': {'$in': list(candidates)}}
+    for collection in (BlacklistGuid._name, Guid._name, COLLECTION):
+        candidates.difference_update(
+            doc['_id'] for doc in db[collection].find(query, {'_id': True})
+        )
+    if not candidates:
+        return 0
+    try:
+        db[COLLECTION].insert(
+            [{'_id': each} for each in candidates],
+            continue_on_error=True,
+            manipulate=False,
+        )
+    except DuplicateKeyError:
+        # Added by a concurrent replenish; the rest were still inserted
+        pass
+    return len(candidates)
+
+
+def claim(db=None):
+    """Remove an id from the pool and return it, filling the pool first if
+    it is empty.
+    """
+    db = db or database
+    while True:
+        doc = db[COLLECTION].find_and_modify({'claim': None}, remove=True)
+        if doc is not None:
+            return doc['_id']
+        replenish(db=db)
+
+
+def claim_many(count, db=None):
+    """Remove `count` ids from the pool and return them. Ids are marked with
+    a token before they are removed, so that concurrent claimants never
+    receive the same id.
+    """
+    db = db or database
+    token = uuid.uuid4().hex
+    claimed = 0
+    while claimed < count:
+        needed = count - claimed
+        ids = [
+            doc['_id'] for doc in
+            db[COLLECTION].find({'claim': None}, {'_id': True}).limit(needed)
+        ]
+        if len(ids) < needed:
+            replenish(max(needed - len(ids), settings.GUID_POOL_BATCH_SIZE), db=db)
+        if ids:
+            db[COLLECTION].update(
+                {'_id': {'$in': ids}, 'claim': None},
+                {'$set': {'claim': token}},
+                multi=True,
+            )
+            claimed = db[COLLECTION].find({'claim': token}).count()
+    ids = [doc['_id'] for doc in db[COLLECTION].find({'claim': token}, {'_id': True})]
+    db[COLLECTION].remove({'claim': token})
+    return ids
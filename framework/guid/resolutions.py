@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Cache of what each GUID resolves to, so that resolving a GUID URL takes
+one lookup by primary key instead of loading the GUID and its referent and
+matching the referent's URL against the routing table. Entries are dropped
+when their referent is removed, re-keyed or changes in a way that may move
+its URL, and expire after ``settings.GUID_RESOLUTION_TTL`` seconds so that
+they do not outlive changes to the routes. A TTL index deletes expired
+entries.
+
+    {
+        '_id': <guid>,
+        'referent': [<referent key>, <referent schema name>],
+        'url': <deep URL of referent>,
+        'endpoint': <endpoint of deep URL for GET requests, or None>,
+        'view_kwargs': <view function arguments of deep URL>,
+        'date': <when the entry was cached>,
+    }
+"""
+
+import datetime
+
+from framework.mongo import database
+
+from website import settings
+
+
+COLLECTION = 'guidresolutions'
+
+
+def load(guid, db=None):
+    """Return the cached resolution of `guid`, or None."""
+    db = db or database  # default to local proxy
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(
+        seconds=settings.GUID_RESOLUTION_TTL
+    )
+    return db[COLLECTION].find_one({'_id': guid, 'date': {'$gt': cutoff}})
+
+
+def store(guid, referent, url, endpoint=None, view_kwargs=None, db=None):
+    """Cache the resolution of `guid` to `referent` at `url`, which is
+    served by view function `endpoint` with `view_kwargs`.
+    """
+    if not settings.GUID_RESOLUTION_TTL:
+        return
+    db = db or database
+    collection = db[COLLECTION]
+    collection.ensure_index('date', expireAfterSeconds=settings.GUID_RESOLUTION_TTL)
+    collection.update(
+        {'_id': guid},
+        {
+            'referent': [referent._primary_key, referent._name],
+            'url': url,
+            'endpoint': endpoint,
+            'view_kwargs': view_kwargs or {},
+            'date': datetime.datetime.utcnow(),
+        },
+        upsert=True,
+        manipulate=False,
+    )
+
+
+def invalidate(guids, db=None):
+    """Drop the cached resolutions of `guids`."""
+    db = db or database
+    guids = [each for each in guids if each]
+    if guids:
+        db[COLLECTION].remove({'_id': {'$in': guids}})
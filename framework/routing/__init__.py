@@ -262,8 +262,20 @@ def proxy_url(url):
 
     """
     # Get URL map, passing current request method; else method defaults to GET
-    match = app.url_map.bind('').match(url, method=request.method)
-    response = app.view_functions[match[0]](**match[1])
+    endpoint, view_kwargs = app.url_map.bind('').match(url, method=request.method)
+    return proxy_view(endpoint, view_kwargs)
+
+
+def proxy_view(endpoint, view_kwargs):
+    """Call Flask view function `endpoint` as `proxy_url` does, for callers
+    that have already matched the URL.
+
+    :param str endpoint: Name of view function
+    :param dict view_kwargs: Arguments matched from the URL
+    :return: Return value of view function, wrapped in Werkzeug Response
+
+    """
+    response = app.view_functions[endpoint](**view_kwargs)
     return make_response(response)
 
 
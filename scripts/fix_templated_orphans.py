@@ -14,6 +14,7 @@ from modularodm import Q
 from framework.auth import Auth
 
 from website.models import Node
+from website.project import log_index
 from website.app import init_app
 
 from nose.tools import *
@@ -28,7 +29,7 @@ logger.setLevel(logging.INFO)
 
 def find_candidate_parents(node):
     return Node.find(
-        Q('logs', 'eq', node.logs[0]._id) &
+        Q('_id', 'in', log_index.node_ids(node.logs[0]._id)) &
         Q('is_fork', 'eq', node.is_fork) &
         Q('is_registration', 'eq', node.is_registration)
     )
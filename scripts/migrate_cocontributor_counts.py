@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Rebuild the co-contributor counts used for "most in common" contributor
+suggestions from the contributor lists of all nodes.
+
+    python -m scripts.migrate_cocontributor_counts
+"""
+
+import logging
+
+from website import models
+from website.app import init_app
+from website.project import cocontributors
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def main():
+    init_app(routes=False)
+    nodes = models.Node.find()
+    logger.info('Rebuilding co-contributor counts from {0} nodes'.format(nodes.count()))
+    cocontributors.rebuild(nodes)
+    logger.info('Finished rebuilding co-contributor counts')
+
+
+if __name__ == '__main__':
+    main()
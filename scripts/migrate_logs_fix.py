@@ -2,7 +2,8 @@ import sys
 import logging
 
 from website.app import init_app
-from website.models import NodeLog
+from website.models import Node, NodeLog
+from website.project import log_index
 from scripts import utils as script_utils
 from modularodm import Q
 
@@ -17,7 +18,7 @@ def do_migration(records, dry=False):
         count = 0
         if not dry:
             log.should_hide = False
-            for node in log.node__logged:
+            for node in Node.find(Q('_id', 'in', log_index.node_ids(log._id))):
                 if node != log.node:
                     node.logs.remove(log)
                     count += 1
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Store the date of the most recent log of each node in the indexed
+`Node.date_modified` field, which replaces the property of the same name, and
+build the index used to page through nodes by that date. Nodes without logs
+get their creation date. Safe to run more than once.
+
+    python -m scripts.migrate_node_date_modified [dry]
+"""
+import sys
+import logging
+
+import pymongo
+
+from framework.mongo import database
+from scripts import utils as scripts_utils
+
+from website.app import init_app
+from website.models import Node
+from website.project import log_index
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def get_targets(db=None):
+    db = db or database
+    return db[Node._name].find({}, {'date_created': True}).sort('_id')
+
+
+def migrate_nodes(docs, dry=True, db=None):
+    """Set the `date_modified` of node documents `docs`.
+
+    :return int: Number of nodes updated
+    """
+    db = db or database
+    latest = log_index.latest_dates([doc['_id'] for doc in docs], db=db)
+    if not dry:
+        for doc in docs:
+            date = latest.get(doc['_id']) or doc.get('date_created')
+            db[Node._name].update(
+                {'_id': doc['_id']},
+                {'$set': {'date_modified': date}},
+            )
+    return len(docs)
+
+
+def ensure_indexes(db=None):
+    db = db or database
+    # Backs paging through nodes by `date_modified`, ties broken by key
+    db[Node._name].ensure_index([
+        ('date_modified', pymongo.DESCENDING),
+        ('_id', pymongo.DESCENDING),
+    ])
+
+
+def main(dry=True):
+    count = 0
+    batch = []
+    for doc in get_targets():
+        batch.append(doc)
+        if len(batch) == BATCH_SIZE:
+            count += migrate_nodes(batch, dry=dry)
+            batch = []
+    if batch:
+        count += migrate_nodes(batch, dry=dry)
+    if not dry:
+        ensure_indexes()
+    logger.info('Stored date_modified of {0} nodes'.format(count))
+
+
+if __name__ == '__main__':
+    dry = 'dry' in sys.argv
+    # Log to file
+    if not dry:
+        scripts_utils.add_file_logger(logger, __file__)
+    init_app(routes=False, set_backends=True)
+    main(dry=dry)
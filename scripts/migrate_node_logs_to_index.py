@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Move the log lists stored on node documents into the node log index
+(`website.project.log_index`) and remove them from the nodes. Safe to run
+more than once; logs already in the index are not added again.
+
+    python -m scripts.migrate_node_logs_to_index [dry]
+"""
+import sys
+import logging
+
+from framework.mongo import database
+from scripts import utils as scripts_utils
+
+from website.app import init_app
+from website.models import Node, NodeLog
+from website.project import log_index
+
+logger = logging.getLogger(__name__)
+
+
+def get_targets(db=None):
+    db = db or database
+    return db[Node._name].find({'logs': {'$exists': True}}, {'logs': True})
+
+
+def migrate_node(doc, dry=True, db=None):
+    """Add the logs listed on node document `doc` to the index.
+
+    :return int: Number of logs added
+    """
+    db = db or database
+    node_id = doc['_id']
+    indexed = set(log_index.log_ids(node_id, db=db))
+    log_ids = [
+        log_id for log_id in doc.get('logs') or []
+        if log_id and log_id not in indexed
+    ]
+    dates = {
+        log['_id']: log.get('date')
+        for log in db[NodeLog._name].find({'_id': {'$in': log_ids}}, {'date': True})
+    } if log_ids else {}
+    missing = [log_id for log_id in log_ids if log_id not in dates]
+    if missing:
+        logger.warn('Node {0} lists {1} missing logs'.format(node_id, len(missing)))
+    entries = [(log_id, dates[log_id]) for log_id in log_ids if log_id in dates]
+    if not dry:
+        log_index.extend(node_id, entries, db=db)
+        db[Node._name].update({'_id': node_id}, {'$unset': {'logs': True}})
+    return len(entries)
+
+
+def main(dry=True):
+    nodes, logs = 0, 0
+    for doc in get_targets():
+        logs += migrate_node(doc, dry=dry)
+        nodes += 1
+    logger.info('Moved {0} logs of {1} nodes to the log index'.format(logs, nodes))
+
+
+if __name__ == '__main__':
+    dry = 'dry' in sys.argv
+    # Log to file
+    if not dry:
+        scripts_utils.add_file_logger(logger, __file__)
+    init_app(routes=False, set_backends=True)
+    main(dry=dry)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Copy the sha256 of each OSF Storage file version out of its metadata into
+the indexed `sha256` field, and add it to the content-addressed blob index
+(`website.addons.osfstorage.blobs`). Safe to run more than once; versions that
+already have a `sha256` are skipped.
+
+    python -m scripts.migrate_osfstorage_content_hashes [dry]
+"""
+import sys
+import logging
+
+from framework.mongo import database
+from scripts import utils as scripts_utils
+
+from website.app import init_app
+from website.addons.osfstorage import blobs
+from website.addons.osfstorage.model import OsfStorageFileVersion
+
+logger = logging.getLogger(__name__)
+
+
+def get_targets(db=None):
+    db = db or database
+    return db[OsfStorageFileVersion._name].find(
+        {'metadata.sha256': {'$exists': True}, 'sha256': None},
+        {'metadata': True, 'location': True},
+    )
+
+
+def migrate_version(doc, dry=True, db=None):
+    db = db or database
+    metadata = doc['metadata']
+    sha256 = metadata['sha256']
+    if dry:
+        return
+    db[OsfStorageFileVersion._name].update(
+        {'_id': doc['_id']},
+        {'$set': {'sha256': sha256}},
+    )
+    blobs.reference(sha256, doc.get('location'), db=db)
+    if metadata.get('archive'):
+        blobs.record_archive(
+            sha256,
+            metadata.get('vault'),
+            metadata['archive'],
+            parity=metadata.get('parity'),
+            db=db,
+        )
+
+
+def main(dry=True):
+    count = 0
+    for doc in get_targets():
+        migrate_version(doc, dry=dry)
+        count += 1
+    logger.info('Indexed content hashes of {0} versions'.format(count))
+
+
+if __name__ == '__main__':
+    dry = 'dry' in sys.argv
+    # Log to file
+    if not dry:
+        scripts_utils.add_file_logger(logger, __file__)
+    init_app(routes=False, set_backends=True)
+    main(dry=dry)
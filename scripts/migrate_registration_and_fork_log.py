@@ -5,6 +5,7 @@ import logging
 from framework.transactions.context import TokuTransaction
 from website.app import init_app
 from website.models import NodeLog, Node
+from website.project import log_index
 from scripts import utils as script_utils
 from modularodm import Q
 
@@ -43,23 +44,25 @@ def get_parent(node):
 def do_migration(records, dry=False):
     for node in records:
         logs = list(NodeLog.find(Q('was_connected_to', 'contains', node)))
-        existing_logs = node.logs
+        existing_logs = list(node.logs)
         for log in logs:
-            if not log.node__logged:
+            node_ids = log_index.node_ids(log._id)
+            if not node_ids:
                 continue
-            log_node = log.node__logged[0]
+            log_node = Node.load(node_ids[0])
             # if the log_node is not contained in the node parent list then it doesn't belong to this node
             if log_node not in get_all_parents(node):
                 logger.info('Excluding log {} from list because it is not associated with node {}'.format(log, node))
                 logs.remove(log)
 
         with TokuTransaction():
-            node.logs = logs + existing_logs
             node.system_tags.append(SYSTEM_TAG)
             node_type = 'registration' if node.is_registration else 'fork'
             logger.info('Adding {} logs to {} {}'.format(len(logs), node_type, node))
             if not dry:
                 try:
+                    # Logs are written to the log index immediately
+                    node.logs = logs + existing_logs
                     node.save()
                 except Exception as err:
                     logger.error('Could not update logs for node {} due to error'.format(node._id))
@@ -68,14 +71,14 @@ def do_migration(records, dry=False):
 
 
 def get_targets():
-    return Node.find(
-        (
-            (Q('registered_from', 'ne', None) & Q('logs', 'eq', []))
-            | Q('forked_from', 'ne', None)
-        )
+    nodes = Node.find(
+        (Q('registered_from', 'ne', None) | Q('forked_from', 'ne', None))
         & Q('is_deleted', 'ne', True)
         & Q('system_tags', 'ne', SYSTEM_TAG)
     )
+    # Logs are kept in the log index, so registrations without logs cannot be
+    # found with a query
+    return [node for node in nodes if node.forked_from or not node.logs]
 
 
 def main():
@@ -4,15 +4,24 @@
 """Verify that all OSF Storage files have Glacier backups and parity files,
 creating any missing backups.
 
+Versions are audited in order of id by a pool of worker threads, one batch at
+a time. The id of the last version of each finished batch is saved, so that an
+interrupted audit resumes where it stopped; pass `restart` to start over.
+
+    python -m scripts.osfstorage.files_audit [dry] [restart]
+
 TODO: Add check against Glacier inventory
 Note: Must have par2 installed to run
 """
 
-from __future__ import division
-
 import os
-import math
+import hashlib
 import logging
+import datetime
+import functools
+import itertools
+import collections
+from multiprocessing.pool import ThreadPool
 
 import pyrax
 import progressbar
@@ -20,6 +29,8 @@ from modularodm import Q
 from boto.glacier.layer2 import Layer2
 from pyrax.exceptions import NoSuchObject
 
+from framework.mongo import database
+
 from website.app import init_app
 from website.addons.osfstorage import model
 
@@ -31,7 +42,10 @@ from scripts.osfstorage import settings as storage_settings
 container_primary = None
 container_parity = None
 vault = None
-audit_temp_path = None
+audit_temp_path = storage_settings.AUDIT_TEMP_PATH
+
+CHECKPOINT_COLLECTION = 'filesauditcheckpoints'
+CHECKPOINT_ID = 'files_audit'
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -63,27 +77,87 @@ def delete_temp_file(version):
         pass
 
 
+def stream_to_glacier(version):
+    """Copy a version from Cloud Files to Glacier without writing it to disk,
+    checking its sha256 on the way.
+
+    :return: Glacier archive id, or None if the object is missing or its
+        contents do not match its hash
+    """
+    key = version.location['object']
+    try:
+        obj = container_primary.get_object(key)
+        chunks = obj.fetch(chunk_size=storage_settings.AUDIT_CHUNK_SIZE)
+    except NoSuchObject as err:
+        logger.error('*** FILE NOT FOUND ***')
+        logger.exception(err)
+        logger.error(version.to_storage())
+        return None
+    digest = hashlib.sha256()
+    writer = vault.create_archive_writer(description=key)
+    for chunk in chunks:
+        digest.update(chunk)
+        writer.write(chunk)
+    writer.close()
+    glacier_id = writer.get_archive_id()
+    expected = version.metadata.get('sha256')
+    if expected and digest.hexdigest() != expected:
+        logger.error('*** HASH MISMATCH ***')
+        logger.error('Version {0} has sha256 {1}, but Cloud Files object {2} has {3}; '
+                     'discard Glacier archive {4}'.format(
+                         version._id, expected, key, digest.hexdigest(), glacier_id))
+        return None
+    return glacier_id
+
+
 def ensure_glacier(version, dry_run):
     if version.metadata.get('archive'):
         return
+    # Another version with the same contents may already be archived
+    if version._find_matching_archive(save=not dry_run):
+        return
     logger.warn('Glacier archive for version {0} not found'.format(version._id))
     if dry_run:
         return
-    file_path = download_from_cloudfiles(version)
-    if file_path:
+    file_path = os.path.join(audit_temp_path, version.location['object'])
+    if os.path.exists(file_path):
+        # Already downloaded to build parity files
         glacier_id = vault.upload_archive(file_path, description=version.location['object'])
+    else:
+        glacier_id = stream_to_glacier(version)
+    if glacier_id:
+        version.metadata['vault'] = storage_settings.GLACIER_VAULT
         version.metadata['archive'] = glacier_id
         version.save()
 
 
-def check_parity_files(version):
+def build_parity_index(container):
+    """List `container` once and return the names of the objects that have a
+    parity index file and at least one parity volume.
+    """
+    indexes, volumes = set(), set()
+    for obj in container.list_all():
+        name = getattr(obj, 'name', obj)
+        if not name.endswith('.par2'):
+            continue
+        base = name[:-len('.par2')]
+        if '.vol' in base:
+            volumes.add(base.rsplit('.vol', 1)[0])
+        else:
+            indexes.add(base)
+    return indexes & volumes
+
+
+def check_parity_files(version, parity_index=None):
+    if parity_index is not None:
+        return version.location['object'] in parity_index
     index = list(container_parity.list_all(prefix='{0}.par2'.format(version.location['object'])))
     vols = list(container_parity.list_all(prefix='{0}.vol'.format(version.location['object'])))
     return len(index) == 1 and len(vols) >= 1
 
 
-def ensure_parity(version, dry_run):
-    if check_parity_files(version):
+def ensure_parity(version, dry_run, parity_index=None):
+    if check_parity_files(version, parity_index):
         return
     logger.warn('Parity files for version {0} not found'.format(version._id))
     if dry_run:
@@ -98,40 +172,107 @@ def ensure_parity(version, dry_run):
             logger.error('Parity files for version {0} not found after update'.format(version._id))
 
 
-def ensure_backups(version, dry_run):
+def ensure_backups(version, dry_run, parity_index=None):
     if version.size == 0:
         return
+    # Build parity files first, so that a file downloaded for them is
+    # uploaded to Glacier from disk rather than fetched again
+    ensure_parity(version, dry_run, parity_index)
     ensure_glacier(version, dry_run)
-    ensure_parity(version, dry_run)
     delete_temp_file(version)
 
 
-def get_targets():
-    return model.OsfStorageFileVersion.find(
-        Q('status', 'ne', 'cached') &
-        Q('location.object', 'exists', True)
+def audit_versions(versions, dry_run, parity_index=None):
+    """Ensure backups of versions that share a Cloud Files object, one after
+    the other, so that they are not downloaded or archived more than once.
+    """
+    for version in versions:
+        try:
+            ensure_backups(version, dry_run, parity_index)
+        except Exception as err:
+            logger.error('Could not audit version {0}'.format(version._id))
+            logger.exception(err)
+    return len(versions)
+
+
+def load_checkpoint(db=None):
+    """Return the id of the last version audited by an unfinished audit, or
+    None.
+    """
+    db = db or database
+    checkpoint = db[CHECKPOINT_COLLECTION].find_one({'_id': CHECKPOINT_ID})
+    return checkpoint['last_id'] if checkpoint else None
+
+
+def save_checkpoint(last_id, db=None):
+    db = db or database
+    db[CHECKPOINT_COLLECTION].update(
+        {'_id': CHECKPOINT_ID},
+        {'$set': {'last_id': last_id, 'date': datetime.datetime.utcnow()}},
+        upsert=True,
     )
 
 
-def main(nworkers, worker_id, dry_run):
-    targets = get_targets()
-    maxval = math.ceil(targets.count() / nworkers)
-    progress_bar = progressbar.ProgressBar(maxval=maxval).start()
+def clear_checkpoint(db=None):
+    db = db or database
+    db[CHECKPOINT_COLLECTION].remove({'_id': CHECKPOINT_ID})
+
+
+def get_targets(start=None):
+    query = (
+        Q('status', 'ne', 'cached') &
+        Q('location.object', 'exists', True)
+    )
+    if start is not None:
+        query = query & Q('_id', 'gt', start)
+    return model.OsfStorageFileVersion.find(query).sort('_id')
+
+
+def iter_batches(targets, size):
+    targets = iter(targets)
+    while True:
+        batch = list(itertools.islice(targets, size))
+        if not batch:
+            return
+        yield batch
+
+
+def group_by_object(versions):
+    groups = collections.OrderedDict()
+    for version in versions:
+        groups.setdefault(version.location['object'], []).append(version)
+    return groups.values()
+
+
+def main(dry_run, restart=False):
+    parity_index = build_parity_index(container_parity)
+    start = None if restart else load_checkpoint()
+    if start is not None:
+        logger.info('Resuming audit after version {0}'.format(start))
+    targets = get_targets(start)
+    progress_bar = progressbar.ProgressBar(maxval=targets.count()).start()
+    pool = ThreadPool(storage_settings.AUDIT_WORKERS)
+    audit = functools.partial(audit_versions, dry_run=dry_run, parity_index=parity_index)
     idx = 0
-    for version in targets:
-        if hash(version._id) % nworkers == worker_id:
-            ensure_backups(version, dry_run)
-            idx += 1
-            if idx < maxval:
+    try:
+        for batch in iter_batches(targets, storage_settings.AUDIT_BATCH_SIZE):
+            for count in pool.imap_unordered(audit, group_by_object(batch)):
+                idx += count
                 progress_bar.update(idx)
+            if not dry_run:
+                save_checkpoint(batch[-1]._id)
+    finally:
+        pool.close()
+        pool.join()
     progress_bar.finish()
+    if not dry_run:
+        clear_checkpoint()
 
 
 if __name__ == '__main__':
     import sys
-    nworkers = int(sys.argv[1])
-    worker_id = int(sys.argv[2])
     dry_run = 'dry' in sys.argv
+    restart = 'restart' in sys.argv
 
     # Set up storage backends
     init_app(set_backends=True, routes=False)
@@ -156,13 +297,12 @@ if __name__ == '__main__':
 
         # Log to file
         if not dry_run:
-            scripts_utils.add_file_logger(logger, __file__, suffix=worker_id)
-            audit_temp_path = os.path.join(storage_settings.AUDIT_TEMP_PATH, str(worker_id))
+            scripts_utils.add_file_logger(logger, __file__)
             try:
                 os.makedirs(audit_temp_path)
             except OSError:
                 pass
-            main(nworkers, worker_id, dry_run=dry_run)
+            main(dry_run=dry_run, restart=restart)
     except Exception as err:
         logger.error('=== Unexpected Error ===')
         logger.exception(err)
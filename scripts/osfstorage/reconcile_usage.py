@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Rebuild the OSF Storage usage of every node from its file records (see
+`website.addons.osfstorage.usage`), logging nodes whose stored usage had
+drifted.
+
+    python -m scripts.osfstorage.reconcile_usage [dry]
+"""
+
+import sys
+import logging
+
+from modularodm import Q
+
+from website.app import init_app
+from website.addons.osfstorage import model
+from website.addons.osfstorage import usage
+
+from scripts import utils as scripts_utils
+
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def get_targets():
+    return model.OsfStorageNodeSettings.find(Q('owner', 'ne', None))
+
+
+def reconcile(node_settings, dry_run=True):
+    """Store the usage of the owner of `node_settings` as computed from its
+    file records.
+
+    :return bool: Whether the stored usage was wrong
+    """
+    node_id = node_settings.owner._id
+    stored = usage.get(node_id)
+    computed = usage.compute(node_settings)
+    if stored == computed:
+        return False
+    logger.warn('Node {0} has usage {1} but stores {2}'.format(node_id, computed, stored))
+    if not dry_run:
+        usage.store(node_id, computed)
+    return True
+
+
+def main(dry_run=True):
+    count, drifted = 0, 0
+    for node_settings in get_targets():
+        drifted += reconcile(node_settings, dry_run=dry_run)
+        count += 1
+    logger.info('Reconciled usage of {0} nodes, {1} of which had drifted'.format(count, drifted))
+
+
+if __name__ == '__main__':
+    dry_run = 'dry' in sys.argv
+    init_app(set_backends=True, routes=False)
+    if not dry_run:
+        scripts_utils.add_file_logger(logger, __file__)
+    main(dry_run=dry_run)
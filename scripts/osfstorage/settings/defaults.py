@@ -13,3 +13,10 @@ AWS_SECRET_KEY = 'changeme'
 AWS_SNS_ARN = 'sns_notification_id'
 
 AUDIT_TEMP_PATH = '/opt/data/files_audit'
+
+# Number of threads auditing versions
+AUDIT_WORKERS = 8
+# Number of versions audited between checkpoints
+AUDIT_BATCH_SIZE = 200
+# Size of the chunks in which files are copied from Cloud Files to Glacier
+AUDIT_CHUNK_SIZE = 1024 * 1024
@@ -8,6 +8,7 @@ from lxml import etree
 from website import settings
 from website.app import init_app
 from website.models import CitationStyle
+from website.citations import styles
 
 
 def main():
@@ -48,6 +49,8 @@ def main():
             style = CitationStyle(**fields)
             style.save()
 
+    styles.index.reset()
+
     return total
 
 
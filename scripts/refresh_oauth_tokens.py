@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""Refresh OAuth2 access tokens of all ExternalAccounts that are about to
+expire, then log token health per provider. Pass "dry" to only list the
+batches that would be refreshed.
+"""
+
+import sys
+import json
+import logging
+
+from scripts import utils as scripts_utils
+from website.app import init_app
+from website.oauth import refresh
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def main(dry_run):
+    batches = refresh.schedule(dry_run=dry_run)
+    logger.info('Scheduled {0} refresh batches'.format(len(batches)))
+    logger.info('Token metrics: {0}'.format(json.dumps(refresh.get_metrics())))
+
+
+if __name__ == '__main__':
+    init_app(set_backends=True, routes=False)
+    dry_run = 'dry' in sys.argv
+    # Log to file
+    if not dry_run:
+        scripts_utils.add_file_logger(logger, __file__)
+    main(dry_run=dry_run)
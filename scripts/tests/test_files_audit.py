@@ -1,13 +1,17 @@
 # -*- coding: utf-8 -*-
 import os
+import hashlib
 
 import mock
 from nose.tools import *  # noqa
 
 from tests.base import OsfTestCase
-from website.addons.osfstorage.tests.factories import FileVersionFactory
+from website.addons.osfstorage.tests.factories import FileVersionFactory, generic_location
 from scripts.osfstorage import settings as storage_settings
-from scripts.osfstorage.files_audit import ensure_parity, ensure_glacier, download_from_cloudfiles
+from scripts.osfstorage.files_audit import (
+    ensure_parity, ensure_glacier, download_from_cloudfiles, build_parity_index,
+    load_checkpoint, save_checkpoint, get_targets, main,
+)
 
 
 class TestFilesAudit(OsfTestCase):
@@ -29,10 +33,11 @@ class TestFilesAudit(OsfTestCase):
         mock_exists.return_value = True
         assert_false(mock_container.get_object.called)
 
-    @mock.patch('scripts.osfstorage.files_audit.download_from_cloudfiles')
+    @mock.patch('os.path.exists')
     @mock.patch('scripts.osfstorage.files_audit.vault')
-    def test_ensure_glacier(self, mock_vault, mock_download):
+    def test_ensure_glacier(self, mock_vault, mock_exists):
         glacier_id = 'iamarchived'
+        mock_exists.return_value = True
         mock_vault.upload_archive.return_value = glacier_id
         version = FileVersionFactory()
         ensure_glacier(version, dry_run=False)
@@ -41,6 +46,37 @@ class TestFilesAudit(OsfTestCase):
         version.reload()
         assert_equal(version.metadata['archive'], glacier_id)
 
+    @mock.patch('scripts.osfstorage.files_audit.container_primary')
+    @mock.patch('scripts.osfstorage.files_audit.vault')
+    def test_ensure_glacier_streams(self, mock_vault, mock_container):
+        mock_container.get_object.return_value.fetch.return_value = iter(['blue ', 'train'])
+        mock_writer = mock_vault.create_archive_writer.return_value
+        mock_writer.get_archive_id.return_value = 'iamarchived'
+        version = FileVersionFactory(metadata={'sha256': hashlib.sha256('blue train').hexdigest()})
+        ensure_glacier(version, dry_run=False)
+        mock_writer.write.assert_has_calls([mock.call('blue '), mock.call('train')])
+        assert_false(mock_vault.upload_archive.called)
+        version.reload()
+        assert_equal(version.metadata['archive'], 'iamarchived')
+
+    @mock.patch('scripts.osfstorage.files_audit.container_primary')
+    @mock.patch('scripts.osfstorage.files_audit.vault')
+    def test_ensure_glacier_streams_hash_mismatch(self, mock_vault, mock_container):
+        mock_container.get_object.return_value.fetch.return_value = iter(['corrupt'])
+        version = FileVersionFactory(metadata={'sha256': hashlib.sha256('blue train').hexdigest()})
+        ensure_glacier(version, dry_run=False)
+        version.reload()
+        assert_not_in('archive', version.metadata)
+
+    @mock.patch('scripts.osfstorage.files_audit.vault')
+    def test_ensure_glacier_matching_archive(self, mock_vault):
+        FileVersionFactory(metadata={'sha256': 'bebop', 'vault': 'the cloud', 'archive': 'erchiv'})
+        version = FileVersionFactory(metadata={'sha256': 'bebop'})
+        ensure_glacier(version, dry_run=False)
+        assert_false(mock_vault.create_archive_writer.called)
+        version.reload()
+        assert_equal(version.metadata['archive'], 'erchiv')
+
     @mock.patch('scripts.osfstorage.files_audit.download_from_cloudfiles')
     @mock.patch('scripts.osfstorage.files_audit.vault')
     def test_ensure_glacier_exists(self, mock_vault, mock_download):
@@ -70,3 +106,44 @@ class TestFilesAudit(OsfTestCase):
         ensure_parity(version, dry_run=False)
         assert_false(mock_download.called)
         assert_false(mock_container.create.called)
+
+    @mock.patch('scripts.osfstorage.files_audit.download_from_cloudfiles')
+    @mock.patch('scripts.osfstorage.files_audit.container_parity')
+    def test_ensure_parity_index(self, mock_container, mock_download):
+        objects = []
+        for name in ['06d80e.par2', '06d80e.vol0+1.par2', 'd077f2.par2']:
+            obj = mock.Mock()
+            obj.name = name
+            objects.append(obj)
+        mock_container.list_all.return_value = objects
+        parity_index = build_parity_index(mock_container)
+        assert_equal(parity_index, {'06d80e'})
+        version = FileVersionFactory(location=dict(generic_location, object='06d80e'))
+        ensure_parity(version, dry_run=False, parity_index=parity_index)
+        assert_false(mock_download.called)
+
+
+class TestFilesAuditCheckpoint(OsfTestCase):
+
+    def setUp(self):
+        super(TestFilesAuditCheckpoint, self).setUp()
+        self.versions = sorted([FileVersionFactory() for _ in range(3)], key=lambda version: version._id)
+
+    def test_resume_from_checkpoint(self):
+        assert_is_none(load_checkpoint())
+        save_checkpoint(self.versions[0]._id)
+        assert_equal(load_checkpoint(), self.versions[0]._id)
+        targets = [version._id for version in get_targets(load_checkpoint())]
+        assert_equal(targets, [version._id for version in self.versions[1:]])
+
+    @mock.patch('scripts.osfstorage.files_audit.container_parity')
+    @mock.patch('scripts.osfstorage.files_audit.ensure_backups')
+    def test_main_clears_checkpoint(self, mock_ensure_backups, mock_container):
+        mock_container.list_all.return_value = []
+        save_checkpoint(self.versions[0]._id)
+        main(dry_run=False)
+        audited = [each[0][0]._id for each in mock_ensure_backups.call_args_list]
+        assert_not_in(self.versions[0]._id, audited)
+        assert_in(self.versions[1]._id, audited)
+        assert_in(self.versions[2]._id, audited)
+        assert_is_none(load_checkpoint())
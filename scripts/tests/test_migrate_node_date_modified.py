@@ -0,0 +1,45 @@
+from nose.tools import *  # noqa
+
+from framework.mongo import database
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory
+
+from website.models import Node
+from scripts.migrate_node_date_modified import migrate_nodes
+
+
+class TestMigrateNodeDateModified(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateNodeDateModified, self).setUp()
+        self.node = ProjectFactory()
+        # Simulate a node saved before `date_modified` was stored
+        database[Node._name].update(
+            {'_id': self.node._id},
+            {'$unset': {'date_modified': True}},
+        )
+
+    def _docs(self):
+        return list(database[Node._name].find({'_id': self.node._id}, {'date_created': True}))
+
+    def _stored(self):
+        return database[Node._name].find_one({'_id': self.node._id}).get('date_modified')
+
+    def test_migrate_nodes(self):
+        latest = self.node.logs[-1].date
+        assert_equal(migrate_nodes(self._docs(), dry=False), 1)
+        assert_equal(self._stored(), latest)
+
+    def test_migrate_nodes_without_logs(self):
+        self.node.logs = []
+        database[Node._name].update(
+            {'_id': self.node._id},
+            {'$unset': {'date_modified': True}},
+        )
+        migrate_nodes(self._docs(), dry=False)
+        assert_equal(self._stored(), self._docs()[0]['date_created'])
+
+    def test_migrate_nodes_dry(self):
+        migrate_nodes(self._docs(), dry=True)
+        assert_is_none(self._stored())
@@ -0,0 +1,42 @@
+from nose.tools import *  # noqa
+
+from framework.mongo import database
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory, NodeLogFactory
+
+from website.models import Node
+from website.project import log_index
+from scripts.migrate_node_logs_to_index import get_targets, migrate_node
+
+
+class TestMigrateNodeLogsToIndex(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateNodeLogsToIndex, self).setUp()
+        self.project = ProjectFactory()
+        self.logs = [NodeLogFactory(), NodeLogFactory()]
+        # Simulate a node saved before logs moved to the index
+        log_index.remove(self.project._id)
+        database[Node._name].update(
+            {'_id': self.project._id},
+            {'$set': {'logs': [log._id for log in self.logs]}},
+        )
+
+    def _target(self):
+        return [doc for doc in get_targets() if doc['_id'] == self.project._id][0]
+
+    def test_migrate_node(self):
+        assert_equal(migrate_node(self._target(), dry=False), 2)
+        assert_equal(log_index.log_ids(self.project._id), [log._id for log in self.logs])
+        doc = database[Node._name].find_one({'_id': self.project._id})
+        assert_not_in('logs', doc)
+
+    def test_migrate_node_dry(self):
+        migrate_node(self._target(), dry=True)
+        assert_equal(log_index.count(self.project._id), 0)
+
+    def test_migrate_node_skips_indexed_logs(self):
+        log_index.append(self.project._id, self.logs[0]._id, self.logs[0].date)
+        assert_equal(migrate_node(self._target(), dry=False), 1)
+        assert_equal(log_index.count(self.project._id), 2)
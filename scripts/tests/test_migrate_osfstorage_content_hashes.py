@@ -0,0 +1,39 @@
+from nose.tools import *  # noqa
+
+from framework.mongo import database
+
+from tests.base import OsfTestCase
+
+from website.addons.osfstorage import blobs
+from website.addons.osfstorage.model import OsfStorageFileVersion
+from website.addons.osfstorage.tests import factories
+from scripts.migrate_osfstorage_content_hashes import get_targets, migrate_version
+
+
+class TestMigrateOsfStorageContentHashes(OsfTestCase):
+
+    def setUp(self):
+        super(TestMigrateOsfStorageContentHashes, self).setUp()
+        self.version = factories.FileVersionFactory(
+            metadata={'sha256': 'bebop', 'vault': 'the cloud', 'archive': 'erchiv'},
+        )
+        # Simulate a version saved before content hashes were indexed
+        database[OsfStorageFileVersion._name].update(
+            {'_id': self.version._id},
+            {'$unset': {'sha256': True}},
+        )
+        database[blobs.COLLECTION].remove()
+
+    def _target(self):
+        return [doc for doc in get_targets() if doc['_id'] == self.version._id][0]
+
+    def test_migrate_version(self):
+        migrate_version(self._target(), dry=False)
+        doc = database[OsfStorageFileVersion._name].find_one({'_id': self.version._id})
+        assert_equal(doc['sha256'], 'bebop')
+        assert_equal(blobs.load('bebop')['refcount'], 1)
+        assert_equal(blobs.find_archive('bebop'), ('the cloud', 'erchiv'))
+
+    def test_migrate_version_dry(self):
+        migrate_version(self._target(), dry=True)
+        assert_is_none(blobs.load('bebop'))
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from nose.tools import *  # noqa
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory
+
+from website.addons.osfstorage import usage
+from website.addons.osfstorage.tests.factories import generic_location
+from scripts.osfstorage.reconcile_usage import reconcile
+
+
+class TestReconcileUsage(OsfTestCase):
+
+    def setUp(self):
+        super(TestReconcileUsage, self).setUp()
+        self.project = ProjectFactory()
+        self.node_settings = self.project.get_addon('osfstorage')
+        record = self.node_settings.root_node.append_file('so-what.flac')
+        record.create_version(self.project.creator, generic_location, {'size': 1024})
+        usage.store(self.project._id, 7)
+
+    def test_reconcile(self):
+        assert_true(reconcile(self.node_settings, dry_run=False))
+        assert_equal(usage.get(self.project._id), 1024)
+        assert_false(reconcile(self.node_settings, dry_run=False))
+
+    def test_reconcile_dry(self):
+        assert_true(reconcile(self.node_settings, dry_run=True))
+        assert_equal(usage.get(self.project._id), 7)
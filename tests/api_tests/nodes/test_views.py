@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
+import json
 import mock
+import base64
 import urlparse
 from nose.tools import *  # flake8: noqa
 
+from framework.mongo import database
 from website.models import Node
+from website.addons.osfstorage import usage
 from framework.auth.core import Auth
 from website.util.sanitize import strip_html
 from api.base.settings.defaults import API_BASE
+from api.nodes.serializers import NodeSerializer
 from website.settings import API_DOMAIN
 
 from tests.base import ApiTestCase, fake
@@ -93,6 +98,155 @@ class TestNodeList(ApiTestCase):
         assert_not_in(self.private._id, ids)
 
 
+class TestNodeListPagination(ApiTestCase):
+
+    def setUp(self):
+        super(TestNodeListPagination, self).setUp()
+        Node.remove()
+        self.nodes = [ProjectFactory(is_public=True) for _ in range(5)]
+        self.url = '/{}nodes/?page[size]=2'.format(API_BASE)
+        self.expected = [
+            doc['_id'] for doc in
+            database[Node._name].find().sort([('date_modified', -1), ('_id', -1)])
+        ]
+
+    def test_pages_follow_date_modified(self):
+        ids = []
+        url = self.url
+        while url:
+            res = self.app.get(url)
+            assert_equal(res.status_code, 200)
+            ids.extend(each['id'] for each in res.json['data'])
+            url = res.json['links']['next']
+        assert_equal(ids, self.expected)
+
+    def test_first_page_links(self):
+        res = self.app.get(self.url)
+        links = res.json['links']
+        assert_is_none(links['first'])
+        assert_is_none(links['prev'])
+        assert_in('page%5Bcursor%5D', links['next'])
+        assert_in('page%5Bcursor%5D', links['last'])
+
+    def test_total_counted_on_request(self):
+        res = self.app.get(self.url)
+        assert_is_none(res.json['links']['meta']['total'])
+        res = self.app.get(self.url + '&page[total]=true')
+        assert_equal(res.json['links']['meta']['total'], 5)
+        assert_equal(res.json['links']['meta']['per_page'], 2)
+
+    def test_last_and_previous_pages(self):
+        res = self.app.get(self.app.get(self.url).json['links']['last'])
+        assert_equal([each['id'] for each in res.json['data']], self.expected[-2:])
+        assert_is_none(res.json['links']['next'])
+        res = self.app.get(res.json['links']['prev'])
+        assert_equal([each['id'] for each in res.json['data']], self.expected[1:3])
+        res = self.app.get(res.json['links']['prev'])
+        assert_equal([each['id'] for each in res.json['data']], self.expected[:1])
+        assert_is_none(res.json['links']['prev'])
+
+    def test_invalid_cursor(self):
+        res = self.app.get(self.url + '&page[cursor]=nonsense', expect_errors=True)
+        assert_equal(res.status_code, 404)
+
+    def test_cursor_position_not_a_list(self):
+        cursor = base64.urlsafe_b64encode(json.dumps({'r': 0, 'p': 5}))
+        res = self.app.get(self.url + '&page[cursor]=' + cursor, expect_errors=True)
+        assert_equal(res.status_code, 404)
+
+
+class TestNodeSparseFieldsets(ApiTestCase):
+
+    def setUp(self):
+        super(TestNodeSparseFieldsets, self).setUp()
+        self.user = AuthUserFactory()
+        self.project = ProjectFactory(title='Sparse', is_public=True, creator=self.user)
+        self.url = '/{}nodes/{}/'.format(API_BASE, self.project._id)
+
+    def test_only_requested_fields_returned(self):
+        res = self.app.get(self.url, {'fields[nodes]': 'title'})
+        data = res.json['data']
+        assert_equal(data['title'], 'Sparse')
+        assert_equal(data['id'], self.project._id)
+        assert_equal(data['type'], 'nodes')
+        assert_not_in('description', data)
+        assert_not_in('storage', data)
+        assert_not_in('children', data['links'])
+        assert_in('self', data['links'])
+
+    def test_counts_not_computed_unless_requested(self):
+        with mock.patch('api.nodes.serializers.NodeSerializer.get_registration_count') as mock_count:
+            res = self.app.get(self.url, {'fields[nodes]': 'title,children'})
+        assert_false(mock_count.called)
+        assert_equal(res.json['data']['links']['children']['count'], 0)
+
+    def test_storage_not_computed_unless_requested(self):
+        with mock.patch('api.nodes.serializers.usage.subtree') as mock_subtree:
+            self.app.get(self.url, {'fields[nodes]': 'title'})
+        assert_false(mock_subtree.called)
+
+    def test_fieldsets_of_other_types_ignored(self):
+        res = self.app.get(self.url, {'fields[users]': 'fullname'})
+        assert_in('description', res.json['data'])
+        assert_in('registrations', res.json['data']['links'])
+
+
+class TestNodeIncludes(ApiTestCase):
+
+    def setUp(self):
+        super(TestNodeIncludes, self).setUp()
+        self.user = AuthUserFactory()
+        self.contributor = UserFactory()
+        self.project = ProjectFactory(is_public=True, creator=self.user)
+        self.project.add_contributor(self.contributor, auth=Auth(self.user), save=True)
+        self.component = NodeFactory(parent=self.project, creator=self.user, is_public=True)
+        self.private_component = NodeFactory(parent=self.project)
+        self.url = '/{}nodes/{}/'.format(API_BASE, self.project._id)
+
+    def test_include_contributors(self):
+        res = self.app.get(self.url, {'include': 'contributors'})
+        included = {(each['type'], each['id']) for each in res.json['included']}
+        assert_equal(included, {('users', self.user._id), ('users', self.contributor._id)})
+        linkage = res.json['data']['links']['contributors']['data']
+        assert_equal(
+            [each['id'] for each in linkage],
+            [self.user._id, self.contributor._id],
+        )
+
+    def test_include_children_skips_hidden_children(self):
+        res = self.app.get(self.url, {'include': 'children'})
+        assert_equal([each['id'] for each in res.json['included']], [self.component._id])
+        assert_equal(
+            res.json['data']['links']['children']['data'],
+            [{'type': 'nodes', 'id': self.component._id}],
+        )
+
+    def test_include_on_list_loads_related_records_together(self):
+        ProjectFactory(is_public=True, creator=self.user)
+        url = '/{}nodes/'.format(API_BASE)
+        load = NodeSerializer.load_contributors
+        with mock.patch.object(NodeSerializer, 'load_contributors', wraps=load) as mock_load:
+            res = self.app.get(url, {'include': 'contributors'})
+        assert_equal(mock_load.call_count, 1)
+        # Contributors shared by several nodes are included once
+        ids = [each['id'] for each in res.json['included']]
+        assert_equal(len(ids), len(set(ids)))
+        assert_in(self.contributor._id, ids)
+
+    def test_no_included_member_without_include(self):
+        res = self.app.get(self.url)
+        assert_not_in('included', res.json)
+        assert_not_in('data', res.json['data']['links']['contributors'])
+
+    def test_invalid_include(self):
+        res = self.app.get(self.url, {'include': 'comments'}, expect_errors=True)
+        assert_equal(res.status_code, 400)
+
+    def test_include_with_sparse_fieldsets(self):
+        res = self.app.get(self.url, {'include': 'children', 'fields[nodes]': 'title'})
+        assert_equal(res.json['included'][0]['title'], self.component.title)
+        assert_not_in('description', res.json['included'][0])
+
 
 class TestNodeFiltering(ApiTestCase):
 
@@ -422,6 +576,13 @@ class TestNodeDetail(ApiTestCase):
         assert_equal(res.status_code, 200)
         assert_equal(res.json['data']['links']['parent']['self'], urlparse.urljoin(API_DOMAIN, self.public_url))
 
+    def test_node_storage(self):
+        public_component = NodeFactory(parent=self.public_project, creator=self.user, is_public=True)
+        usage.record(self.public_project._id, 1024)
+        usage.record(public_component._id, 256)
+        res = self.app.get(self.public_url)
+        assert_equal(res.json['data']['storage'], {'node': 1024, 'total': 1024 + 256})
+
 class TestNodeUpdate(ApiTestCase):
 
     def setUp(self):
@@ -734,6 +895,27 @@ class TestNodeContributorList(ApiTestCase):
         res = self.app.get(self.private_url, auth=self.user_two.auth, expect_errors=True)
         assert_equal(res.status_code, 403)
 
+    def test_contributor_list_pages_in_contributor_order(self):
+        contributors = [UserFactory() for _ in range(3)]
+        for contributor in reversed(contributors):
+            self.public_project.add_contributor(contributor)
+        self.public_project.save()
+        expected = self.public_project.contributors._to_primary_keys()
+
+        res = self.app.get(self.public_url, {'page[size]': 2})
+        assert_equal([each['id'] for each in res.json['data']], expected[:2])
+        res = self.app.get(res.json['links']['next'])
+        assert_equal([each['id'] for each in res.json['data']], expected[2:])
+
+    def test_contributor_list_filters_by_name_in_order(self):
+        first = UserFactory(fullname='Rosalind Franklin')
+        second = UserFactory(fullname='Rosalind Picard')
+        self.public_project.add_contributor(second)
+        self.public_project.add_contributor(first)
+        self.public_project.save()
+        res = self.app.get(self.public_url, {'filter[fullname]': 'rosalind'})
+        assert_equal([each['id'] for each in res.json['data']], [second._id, first._id])
+
 class TestNodeContributorFiltering(ApiTestCase):
 
     def setUp(self):
@@ -828,6 +1010,22 @@ class TestNodeRegistrationList(ApiTestCase):
         res = self.app.get(self.private_url, auth=self.user_two.auth, expect_errors=True)
         assert_equal(res.status_code, 403)
 
+    def test_registrations_list_excludes_private_registrations(self):
+        self.public_project.add_contributor(self.user_two, permissions=['read'], auth=Auth(self.user), save=True)
+        RegistrationFactory(creator=self.user, project=self.public_project)
+        res = self.app.get(self.public_url, auth=self.user_two.auth)
+        assert_equal(res.status_code, 200)
+        assert_equal(len(res.json['data']), 1)
+        assert_equal(res.json['data'][0]['id'], self.public_registration_project._id)
+
+    def test_registration_count_matches_visible_registrations(self):
+        RegistrationFactory(creator=self.user, project=self.public_project)
+        url = '/{}nodes/{}/'.format(API_BASE, self.public_project._id)
+        res = self.app.get(url)
+        assert_equal(res.json['data']['links']['registrations']['count'], 1)
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.json['data']['links']['registrations']['count'], 2)
+
 
 class TestNodeChildrenList(ApiTestCase):
     def setUp(self):
@@ -881,11 +1079,52 @@ class TestNodeChildrenList(ApiTestCase):
         res = self.app.get(self.private_project_url, auth=self.user_two.auth, expect_errors=True)
         assert_equal(res.status_code, 403)
 
+    def test_node_children_list_keeps_stored_order(self):
+        second = NodeFactory(parent=self.project, creator=self.user)
+        # Move the newer component before the older one
+        self.project.nodes.remove(second)
+        self.project.nodes.insert(0, second)
+        self.project.save()
+        res = self.app.get(self.private_project_url, auth=self.user.auth)
+        ids = [each['id'] for each in res.json['data']]
+        assert_equal(ids, [second._id, self.component._id])
+
     def test_node_children_list_does_not_include_unauthorized_projects(self):
         private_component = NodeFactory(parent=self.project)
         res = self.app.get(self.private_project_url, auth=self.user.auth)
         assert_equal(len(res.json['data']), 1)
 
+    def test_node_children_list_includes_children_of_admin_parent(self):
+        admin = AuthUserFactory()
+        project = ProjectFactory(creator=admin)
+        component = NodeFactory(parent=project)
+        component.add_contributor(admin, permissions=['read'], auth=Auth(component.creator), save=True)
+        # The admin isn't a contributor to the grandchild, but administers its grandparent
+        grandchild = NodeFactory(parent=component)
+        url = '/{}nodes/{}/children/'.format(API_BASE, component._id)
+        res = self.app.get(url, auth=admin.auth)
+        assert_equal(res.status_code, 200)
+        assert_equal([each['id'] for each in res.json['data']], [grandchild._id])
+
+    def test_node_children_list_skips_children_of_deleted_admin_parent(self):
+        admin = AuthUserFactory()
+        project = ProjectFactory(creator=admin)
+        component = NodeFactory(parent=project)
+        grandchild = NodeFactory(parent=component)
+        component.add_contributor(admin, permissions=['read'], auth=Auth(component.creator), save=True)
+        project.is_deleted = True
+        project.save()
+        url = '/{}nodes/{}/children/'.format(API_BASE, component._id)
+        res = self.app.get(url, auth=admin.auth)
+        assert_equal(res.status_code, 200)
+        assert_equal(len(res.json['data']), 0)
+
+    def test_node_children_count_matches_visible_children(self):
+        NodeFactory(parent=self.project)
+        url = '/{}nodes/{}/'.format(API_BASE, self.project._id)
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.json['data']['links']['children']['count'], 1)
+
 
 class TestNodeChildCreate(ApiTestCase):
 
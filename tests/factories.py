@@ -469,6 +469,7 @@ class MockOAuth2Provider(ExternalProvider):
 
     auth_url_base = "https://mock2.com/auth"
     callback_url = "https://mock2.com/callback"
+    auto_refresh_url = "https://mock2.com/callback"
 
     def handle_callback(self, response):
         return {
@@ -143,3 +143,23 @@ class TestUpdateCounters(UpdateCountersTestCase):
         assert_equal(count, (1, 2))
         count = analytics.get_basic_counters('download:{0}:{1}'.format(self.node, fid2), db=self.db)
         assert_equal(count, (1, 1))
+
+    def test_update_counter_pages(self):
+        pages = [
+            'download:{0}:{1}'.format(self.node, self.fid),
+            'download:{0}:{1}:{2}'.format(self.node, self.fid, self.vid),
+        ]
+        analytics.update_counter_pages(pages, db=self.db)
+        for page in pages:
+            assert_equal(analytics.get_basic_counters(page, db=self.db), (1, 1))
+
+        # Repeat visits in the same session are not unique
+        analytics.update_counter_pages(pages, db=self.db)
+        for page in pages:
+            assert_equal(analytics.get_basic_counters(page, db=self.db), (1, 2))
+
+    def test_update_counter_pages_existing_counter(self):
+        page = 'download:{0}:{1}'.format(self.node, self.fid)
+        self.db['pagecounters'].update({'_id': page}, {'$inc': {'total': 5, 'unique': 3}}, True, False)
+        analytics.update_counter_pages([page], db=self.db)
+        assert_equal(analytics.get_basic_counters(page, db=self.db), (4, 6))
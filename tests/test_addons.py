@@ -14,17 +14,18 @@ from framework.auth import signing
 from framework.auth.core import Auth
 from framework.exceptions import HTTPError
 from framework.sessions.model import Session
-from framework.mongo import set_up_storage
+from framework.mongo import database, set_up_storage
 
 from website import settings
-from website.util import api_url_for, rubeus
+from website.util import api_url_for, rubeus, waterbutler_grants
 from website.addons.base import exceptions, GuidFile
+from website.project import log_buffer
 from website.project import new_private_link
 from website.project.views.node import _view_project as serialize_node
 from website.addons.base import AddonConfig, AddonNodeSettingsBase, views
 from website.addons.github.model import AddonGitHubOauthSettings
 from tests.base import OsfTestCase
-from tests.factories import AuthUserFactory, ProjectFactory
+from tests.factories import AuthUserFactory, PrivateLinkFactory, ProjectFactory
 from website.addons.github.exceptions import ApiError
 
 
@@ -167,6 +168,56 @@ class TestAddonAuth(OsfTestCase):
         res = test_app.get(url, expect_errors=True)
         assert_equal(res.status_code, 403)
 
+    def test_auth_returns_signed_grant(self):
+        res = self.test_app.get(self.build_url())
+        grant = res.json['grant']
+        assert_true(
+            signing.default_signer.verify_message(grant['signature'], grant['payload'])
+        )
+        payload = signing.unserialize_payload(grant['payload'])
+        assert_equal(payload['user'], self.user._id)
+        assert_equal(payload['node'], self.node._id)
+        assert_equal(payload['action'], 'read')
+
+    def test_auth_no_grant_for_view_only_links(self):
+        link = PrivateLinkFactory()
+        link.nodes.append(self.node)
+        link.save()
+        res = self.test_app.get(self.build_url(cookie=None, view_only=link.key))
+        assert_equal(res.status_code, 200)
+        assert_not_in('grant', res.json)
+
+    def test_auth_grants_expire_from_database(self):
+        self.test_app.get(self.build_url())
+        indexes = database[waterbutler_grants.COLLECTION].index_information()
+        ttls = [
+            index['expireAfterSeconds'] for index in indexes.values()
+            if index['key'] == [('date', 1)]
+        ]
+        assert_equal(ttls, [settings.WATERBUTLER_GRANT_TTL])
+
+    def test_auth_grant_cached(self):
+        first = self.test_app.get(self.build_url())
+        with mock.patch('website.addons.base.views.Node.load') as mock_load:
+            second = self.test_app.get(self.build_url(action='metadata'))
+        assert_false(mock_load.called)
+        assert_equal(first.json['credentials'], second.json['credentials'])
+
+    def test_auth_grant_not_shared_across_action_classes(self):
+        self.test_app.get(self.build_url())
+        with mock.patch('website.addons.base.views.Node.load') as mock_load:
+            mock_load.return_value = self.node
+            self.test_app.get(self.build_url(action='upload'))
+        assert_true(mock_load.called)
+
+    def test_auth_grant_invalidated_on_privacy_change(self):
+        self.node.set_privacy('public', auth=self.auth_obj)
+        res = self.test_app.get(self.build_url(cookie=None))
+        assert_equal(res.status_code, 200)
+        self.node.set_privacy('private', auth=self.auth_obj)
+        res = self.test_app.get(self.build_url(cookie=None), expect_errors=True)
+        assert_equal(res.status_code, 401)
+
 
 class TestAddonLogs(OsfTestCase):
 
@@ -226,6 +277,26 @@ class TestAddonLogs(OsfTestCase):
         self.node.reload()
         assert_equal(len(self.node.logs), nlogs + 1)
 
+    @mock.patch('website.project.log_buffer.schedule_flush')
+    def test_add_logs_buffered(self, mock_schedule):
+        url = self.node.api_url_for('create_waterbutler_log')
+        nlogs = len(self.node.logs)
+        for path in ('pizza', 'pasta'):
+            payload = self.build_payload(metadata={'path': path})
+            self.test_app.put_json(url, payload, headers={'Content-Type': 'application/json'})
+        mock_schedule.assert_called_once_with(self.node._id)
+        self.node.reload()
+        assert_equal(len(self.node.logs), nlogs)
+
+        assert_equal(log_buffer.flush(self.node._id), 2)
+        self.node.reload()
+        assert_equal(len(self.node.logs), nlogs + 2)
+        assert_equal(
+            [log.params['path'] for log in self.node.logs[-2:]],
+            ['pizza', 'pasta'],
+        )
+        assert_equal(log_buffer.flush(self.node._id), 0)
+
     def test_add_log_missing_args(self):
         path = 'pizza'
         url = self.node.api_url_for('create_waterbutler_log')
@@ -215,6 +215,37 @@ class TestArchiverTasks(ArchiverTestCase):
         assert_true(self.dst.archiving)
         mock_chord.assert_called_with(chain_sig)
 
+    @use_fake_addons
+    @mock.patch('celery.chord')
+    @mock.patch('website.archiver.tasks.archive_nodes.s')
+    def test_archive_tree(self, mock_archive_nodes, mock_chord):
+        factories.NodeFactory(creator=self.user, parent=self.src)
+        reg = factories.RegistrationFactory(project=self.src, user=self.user)
+        for node in reg.node_and_primary_descendants():
+            archiver_utils.before_archive(node, self.user)
+        job_pks = [node.archive_job._id for node in reg.node_and_primary_descendants()]
+        with mock.patch.object(settings, 'ARCHIVER_MAX_CONCURRENCY', 2):
+            archive_tree(job_pk=reg.archive_job._id)
+        targets = [
+            (target.name, job_pk)
+            for job_pk in job_pks
+            for target in ArchiveJob.load(job_pk).target_addons
+        ]
+        mock_chord.assert_called_with(celery.group(
+            stat_addons.si(targets=targets[index::2]) for index in range(2)
+        ))
+        mock_archive_nodes.assert_called_with(job_pks=job_pks)
+
+    @use_fake_addons
+    @mock.patch('website.archiver.tasks.archive_node.delay')
+    def test_archive_nodes(self, mock_archive_node):
+        result = stat_addon('dropbox', self.archive_job._id)
+        archive_nodes([[(self.archive_job._id, result)], []], job_pks=[self.archive_job._id, 'other'])
+        mock_archive_node.assert_has_calls([
+            call([result], job_pk=self.archive_job._id),
+            call([], job_pk='other'),
+        ])
+
     @use_fake_addons
     def test_stat_addon(self):
         res = stat_addon('dropbox', self.archive_job._id)
@@ -419,17 +450,15 @@ class TestArchiverUtils(ArchiverTestCase):
 
 class TestArchiverListeners(ArchiverTestCase):
 
-    @mock.patch('celery.chain')
+    @mock.patch('framework.tasks.handlers.enqueue_task')
     @mock.patch('website.archiver.utils.before_archive')
-    def test_after_register(self, mock_before_archive, mock_chain):
-        mock_chain.return_value = celery.chain()
+    def test_after_register(self, mock_before_archive, mock_enqueue):
         listeners.after_register(self.src, self.dst, self.user)
         mock_before_archive.assert_called_with(self.dst, self.user)
-        archive_signature = archive.si(job_pk=self.archive_job._id)
-        mock_chain.assert_called_with(archive_signature)
+        mock_enqueue.assert_called_with(archive_tree.si(job_pk=self.archive_job._id))
 
-    @mock.patch('celery.chain')
-    def test_after_register_archive_runs_only_for_root(self, mock_chain):
+    @mock.patch('framework.tasks.handlers.enqueue_task')
+    def test_after_register_archive_runs_only_for_root(self, mock_enqueue):
         proj = factories.ProjectFactory()
         c1 = factories.ProjectFactory(parent=proj)
         c2 = factories.ProjectFactory(parent=c1)
@@ -437,26 +466,27 @@ class TestArchiverListeners(ArchiverTestCase):
         rc1 = reg.nodes[0]
         rc2 = rc1.nodes[0]
         listeners.after_register(c1, rc1, self.user)
-        mock_chain.assert_not_called()
+        mock_enqueue.assert_not_called()
         listeners.after_register(c2, rc2, self.user)
-        mock_chain.assert_not_called()
+        mock_enqueue.assert_not_called()
         listeners.after_register(proj, reg, self.user)
-        archive_sigs = [archive.si(**kwargs) for kwargs in [dict(job_pk=n.archive_job._id,) for n in [reg, rc1, rc2]]]
-        mock_chain.assert_called_with(*archive_sigs)
+        assert_true(all(n.archive_job for n in [reg, rc1, rc2]))
+        mock_enqueue.assert_called_once_with(archive_tree.si(job_pk=reg.archive_job._id))
 
-    @mock.patch('celery.chain')
-    def test_after_register_does_not_archive_pointers(self, mock_chain):
+    @mock.patch('framework.tasks.handlers.enqueue_task')
+    def test_after_register_does_not_archive_pointers(self, mock_enqueue):
         proj = factories.ProjectFactory(creator=self.user)
         c1 = factories.ProjectFactory(creator=self.user, parent=proj)
         other = factories.ProjectFactory(creator=self.user)
-        reg = factories.RegistrationFactory(project=proj)
-        r1 = reg.nodes[0]
         proj.add_pointer(other, auth=Auth(self.user))
-        listeners.after_register(c1, r1, self.user)
+        reg = factories.RegistrationFactory(project=proj)
         listeners.after_register(proj, reg, self.user)
 
-        archive_sigs = [archive.si(**kwargs) for kwargs in [dict(job_pk=n.archive_job._id,) for n in [reg, r1]]]
-        mock_chain.assert_called_with(*archive_sigs)
+        archived = ArchiveJob.find(Q('src_node', 'in', [proj._id, c1._id, other._id]))
+        assert_equal(
+            sorted(job.src_node._id for job in archived),
+            sorted([proj._id, c1._id]),
+        )
 
     def test_archive_callback_pending(self):
         for addon in ['osfstorage', 'dropbox']:
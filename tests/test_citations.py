@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import mock
 import datetime
 from nose.tools import *  # noqa
 
@@ -7,7 +8,9 @@ from scripts import parse_citation_styles
 from framework.auth.core import Auth
 from website.util import api_url_for
 from website.citations.utils import datetime_to_csl
-from website.models import Node, User
+from website.citations import formatting
+from website.citations.styles import StyleIndex
+from website.models import Node, User, CitationStyle
 from flask import redirect
 
 from tests.base import OsfTestCase
@@ -115,6 +118,58 @@ class CitationsUserTestCase(OsfTestCase):
         )
 
 
+class StyleIndexTestCase(OsfTestCase):
+    def setUp(self):
+        super(StyleIndexTestCase, self).setUp()
+        for _id, title, short_title in [
+            ('apa', 'American Psychological Association 6th edition', 'APA'),
+            ('apa-annotated', 'American Psychological Association (annotated)', None),
+            ('american-sociological-association', 'American Sociological Association', 'ASA'),
+            ('chicago-author-date', 'Chicago Manual of Style (author-date)', None),
+            ('harvard-cite-them-right', 'Cite Them Right - Harvard', None),
+        ]:
+            CitationStyle(_id=_id, title=title, short_title=short_title).save()
+        self.index = StyleIndex()
+
+    def tearDown(self):
+        super(StyleIndexTestCase, self).tearDown()
+        CitationStyle.remove()
+
+    def _ids(self, *args, **kwargs):
+        return [style['id'] for style in self.index.search(*args, **kwargs)]
+
+    def test_search_all(self):
+        assert_equal(len(self._ids()), 5)
+
+    def test_exact_match_ranked_first(self):
+        assert_equal(self._ids('apa'), ['apa', 'apa-annotated'])
+
+    def test_word_prefixes(self):
+        assert_equal(
+            self._ids('amer psych'),
+            ['apa-annotated', 'apa'],
+        )
+
+    def test_substring_fallback(self):
+        assert_equal(self._ids('arvar'), ['harvard-cite-them-right'])
+
+    def test_limit(self):
+        assert_equal(len(self._ids('american', limit=2)), 2)
+
+    def test_search_does_not_query_after_load(self):
+        self.index.search('apa')
+        with mock.patch('website.citations.styles.CitationStyle.find') as mock_find:
+            self.index.search('chicago')
+            assert_false(mock_find.called)
+
+    def test_reset(self):
+        self.index.search('apa')
+        CitationStyle(_id='mla', title='Modern Language Association').save()
+        assert_equal(self._ids('mla'), [])
+        self.index.reset()
+        assert_equal(self._ids('mla'), ['mla'])
+
+
 class CitationsViewsTestCase(OsfTestCase):
     @classmethod
     def setUpClass(cls):
@@ -163,3 +218,61 @@ class CitationsViewsTestCase(OsfTestCase):
         response = self.app.get("/api/v1" + "/project/" + node._id + "/citation/", auto_follow=True, auth=user.auth)
         assert_true(response.json)
 
+
+@mock.patch('website.citations.formatting.get_style')
+@mock.patch('website.citations.formatting.render_csl')
+class CitationsFormattingTestCase(OsfTestCase):
+    def setUp(self):
+        super(CitationsFormattingTestCase, self).setUp()
+        self.user = AuthUserFactory()
+        self.node = ProjectFactory(creator=self.user, is_public=True)
+
+    def test_render_node_citation_cached(self, mock_render, mock_style):
+        mock_render.return_value = 'Citation'
+        assert_equal(formatting.render_node_citation(self.node, 'apa'), 'Citation')
+        assert_equal(formatting.render_node_citation(self.node, 'apa'), 'Citation')
+        assert_equal(mock_render.call_count, 1)
+        mock_render.assert_called_with(self.node.csl, 'apa', 'text')
+
+    def test_render_node_citation_rerendered_after_change(self, mock_render, mock_style):
+        mock_render.return_value = 'Citation'
+        formatting.render_node_citation(self.node, 'apa')
+        self.node.set_title('New title', auth=Auth(self.user), save=True)
+        formatting.render_node_citation(self.node, 'apa')
+        assert_equal(mock_render.call_count, 2)
+
+    def test_render_node_citations_batch(self, mock_render, mock_style):
+        mock_render.side_effect = lambda csl, style, fmt: csl['title']
+        other = ProjectFactory(creator=self.user, title='Other')
+        formatting.render_node_citation(self.node, 'apa')
+        mock_render.reset_mock()
+        citations = formatting.render_node_citations([self.node, other], 'apa')
+        assert_equal(
+            citations,
+            {self.node._id: self.node.title, other._id: 'Other'},
+        )
+        assert_equal(mock_render.call_count, 1)
+
+    def test_formatted_citation_view(self, mock_render, mock_style):
+        mock_render.return_value = 'Citation'
+        url = api_url_for('node_citation_formatted', pid=self.node._id, style='apa')
+        res = self.app.get(url)
+        assert_equal(res.json['citation'], 'Citation')
+
+    def test_formatted_citation_view_unknown_style(self, mock_render, mock_style):
+        mock_style.side_effect = ValueError('Unknown citation style')
+        url = api_url_for('node_citation_formatted', pid=self.node._id, style='nope')
+        res = self.app.get(url, expect_errors=True)
+        assert_equal(res.status_code, 400)
+
+    def test_render_citations_view_skips_private_nodes(self, mock_render, mock_style):
+        mock_render.return_value = 'Citation'
+        private = ProjectFactory(is_public=False)
+        url = api_url_for(
+            'render_citations',
+            nodes=','.join([self.node._id, private._id]),
+            style='apa',
+        )
+        res = self.app.get(url)
+        assert_equal(res.json['citations'], {self.node._id: 'Citation'})
+
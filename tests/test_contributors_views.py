@@ -2,12 +2,15 @@
 
 from nose.tools import *  # noqa; PEP8 asserts
 
-from tests.factories import ProjectFactory, NodeFactory, AuthUserFactory
+from tests.factories import (
+    ProjectFactory, NodeFactory, AuthUserFactory, RegistrationFactory
+)
 from tests.base import OsfTestCase, fake
 
 from framework.auth.decorators import Auth
 
 from website.profile import utils
+from website.project import cocontributors
 
 
 class TestContributorUtils(OsfTestCase):
@@ -173,3 +176,63 @@ class TestContributorViews(OsfTestCase):
         res = self.app.get(url, auth=self.user.auth)
         project.reload()
         assert_equal(len(res.json['contributors']), 4)
+
+
+class TestCoContributorCounts(OsfTestCase):
+
+    def setUp(self):
+        super(TestCoContributorCounts, self).setUp()
+        self.user = AuthUserFactory()
+        self.auth = Auth(user=self.user)
+        self.project = ProjectFactory(creator=self.user)
+
+    def test_add_contributor_increments_counts(self):
+        contrib = AuthUserFactory()
+        self.project.add_contributor(contrib, auth=self.auth, save=True)
+        assert_equal(cocontributors.get_counts(self.user._id), {contrib._id: 1})
+        assert_equal(cocontributors.get_counts(contrib._id), {self.user._id: 1})
+
+    def test_add_contributors_counts_pairs_within_batch(self):
+        contrib_1, contrib_2 = AuthUserFactory(), AuthUserFactory()
+        self.project.add_contributors(
+            [
+                {'user': contrib_1, 'permissions': ['read'], 'visible': True},
+                {'user': contrib_2, 'permissions': ['read'], 'visible': True},
+            ],
+            auth=self.auth,
+            save=True,
+        )
+        assert_equal(
+            cocontributors.get_counts(contrib_1._id),
+            {self.user._id: 1, contrib_2._id: 1},
+        )
+
+    def test_remove_contributor_decrements_counts(self):
+        contrib = AuthUserFactory()
+        self.project.add_contributor(contrib, auth=self.auth, save=True)
+        self.project.remove_contributor(contrib, auth=self.auth)
+        assert_equal(cocontributors.get_counts(self.user._id), {})
+        assert_equal(cocontributors.get_counts(contrib._id), {})
+
+    def test_new_node_with_contributors_counted_on_first_save(self):
+        contrib = AuthUserFactory()
+        node = NodeFactory(creator=self.user, parent=self.project)
+        node.add_contributor(contrib, auth=self.auth, save=True)
+        registration = RegistrationFactory(project=node, user=self.user)
+        assert_in(contrib, registration.contributors)
+        assert_equal(cocontributors.get_counts(contrib._id), {self.user._id: 2})
+
+    def test_most_common_excludes_and_orders(self):
+        contrib_1, contrib_2 = AuthUserFactory(), AuthUserFactory()
+        self.project.add_contributor(contrib_1, auth=self.auth, save=True)
+        self.project.add_contributor(contrib_2, auth=self.auth, save=True)
+        project_2 = ProjectFactory(creator=self.user)
+        project_2.add_contributor(contrib_2, auth=self.auth, save=True)
+        assert_equal(
+            cocontributors.most_common(self.user._id),
+            [(contrib_2._id, 2), (contrib_1._id, 1)],
+        )
+        assert_equal(
+            cocontributors.most_common(self.user._id, exclude=[contrib_2._id]),
+            [(contrib_1._id, 1)],
+        )
@@ -540,6 +540,26 @@ class TestAddContributor(SearchTestCase):
         contribs = search.search_contributor(self.name4.split(' ')[0][:-1])
         assert_equal(len(contribs['users']), 0)
 
+    def test_search_results_built_from_index(self):
+        with mock.patch('framework.auth.core.User.load') as mock_load:
+            contribs = search.search_contributor(self.name1)
+        assert_false(mock_load.called)
+        result = contribs['users'][0]
+        assert_equal(result['id'], self.user._id)
+        assert_equal(result['profile_url'], self.user.profile_url)
+        assert_in('secure.gravatar.com', result['gravatar_url'])
+
+    def test_search_excludes_user_ids(self):
+        contribs = search.search_contributor(self.name1, exclude=[self.user._id])
+        assert_equal(len(contribs['users']), 0)
+
+    def test_search_cache_cleared_on_user_update(self):
+        contribs = search.search_contributor('Freddie5')
+        assert_equal(len(contribs['users']), 0)
+        UserFactory(fullname='Freddie5 Mercury5')
+        contribs = search.search_contributor('Freddie5')
+        assert_equal(len(contribs['users']), 1)
+
 @requires_search
 class TestProjectSearchResults(SearchTestCase):
     def setUp(self):
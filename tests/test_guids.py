@@ -4,16 +4,21 @@ import mock
 from nose.tools import *  # noqa
 
 from tests.base import OsfTestCase
-from tests.factories import NodeFactory
+from tests.factories import NodeFactory, ProjectFactory, NodeWikiFactory
 
 from modularodm import Q
 from modularodm import fields
 from modularodm.storage.mongostorage import MongoStorage
 
+from framework.auth import Auth
 from framework.mongo import database
+from framework.guid import pool
+from framework.guid import resolutions
 from framework.guid.model import GuidStoredObject
 
 from website import models
+from website import settings
+from website.addons.wiki.model import NodeWikiPage
 
 
 class TestGuidStoredObject(OsfTestCase):
@@ -33,6 +38,84 @@ class TestGuidStoredObject(OsfTestCase):
         assert_equal(guids[0]._id, fake_guid._id)
 
 
+class TestGuidPool(OsfTestCase):
+
+    def setUp(self):
+        super(TestGuidPool, self).setUp()
+        self.db[pool.COLLECTION].remove()
+
+    def test_replenish(self):
+        assert_equal(pool.replenish(50), self.db[pool.COLLECTION].count())
+        assert_true(self.db[pool.COLLECTION].count() > 0)
+
+    @mock.patch('framework.guid.pool.random.sample')
+    def test_replenish_skips_blacklisted_and_used(self, mock_sample):
+        mock_sample.side_effect = [list('abcde'), list('fghjk'), list('mnpqr')]
+        models.BlacklistGuid(_id='abcde').save()
+        node = NodeFactory()
+        models.Guid(_id='fghjk', referent=node).save()
+        assert_equal(pool.replenish(3), 1)
+        assert_equal(
+            [doc['_id'] for doc in self.db[pool.COLLECTION].find()],
+            ['mnpqr'],
+        )
+
+    def test_claim(self):
+        pool.replenish(2)
+        claimed = set([pool.claim(), pool.claim()])
+        assert_equal(len(claimed), 2)
+        assert_equal(self.db[pool.COLLECTION].count(), 0)
+        # Refills an empty pool
+        assert_true(pool.claim())
+
+    def test_claim_many(self):
+        pool.replenish(10)
+        claimed = pool.claim_many(25)
+        assert_equal(len(claimed), 25)
+        assert_equal(len(set(claimed)), 25)
+        assert_equal(self.db[pool.COLLECTION].find({'_id': {'$in': claimed}}).count(), 0)
+
+    def test_new_record_saves_guid_with_referent(self):
+        node = NodeFactory()
+        guid = models.Guid.load(node._id)
+        assert_equal(guid.referent, node)
+        assert_equal(
+            self.db[models.Guid._name].find_one({'_id': node._id})['referent'],
+            [node._id, 'node'],
+        )
+
+    def test_saving_stored_record_skips_guid(self):
+        node = NodeFactory()
+        with mock.patch.object(node, '_ensure_guid') as mock_ensure:
+            node.title = 'Changed'
+            node.save()
+        assert_false(mock_ensure.called)
+
+    def test_reserve_guids(self):
+        guid_ids = models.Node.reserve_guids(3)
+        assert_equal(len(set(guid_ids)), 3)
+        for guid_id in guid_ids:
+            assert_equal(
+                self.db[models.Guid._name].find_one({'_id': guid_id})['referent'],
+                [guid_id, 'node'],
+            )
+        node = NodeFactory.build()
+        node._primary_key = guid_ids[0]
+        node.save()
+        assert_equal(models.Guid.load(guid_ids[0]).referent, node)
+
+    def test_registration_reserves_guids(self):
+        project = ProjectFactory()
+        NodeFactory(parent=project, creator=project.creator)
+        with mock.patch.object(models.Node, 'reserve_guids', wraps=models.Node.reserve_guids) as mock_reserve:
+            registration = project.register_node(
+                None, Auth(project.creator), '', None,
+            )
+        mock_reserve.assert_called_once_with(2)
+        assert_equal(models.Guid.load(registration._id).referent, registration)
+        assert_equal(models.Guid.load(registration.nodes[0]._id).referent, registration.nodes[0])
+
+
 class TestResolveGuid(OsfTestCase):
 
     def setUp(self):
@@ -63,3 +146,77 @@ class TestResolveGuid(OsfTestCase):
             expect_errors=True,
         )
         assert_equal(res.status_code, 404)
+
+
+class TestGuidResolutionCache(OsfTestCase):
+
+    def setUp(self):
+        super(TestGuidResolutionCache, self).setUp()
+        self.node = NodeFactory()
+        self.url = self.node.web_url_for('view_project', _guid=True)
+
+    def test_resolution_cached(self):
+        res = self.app.get(self.url, auth=self.node.creator.auth)
+        assert_equal(res.status_code, 200)
+        resolution = resolutions.load(self.node._id)
+        assert_equal(resolution['referent'], [self.node._id, 'node'])
+        assert_equal(resolution['url'], '/project/{0}/'.format(self.node._id))
+        assert_true(resolution['endpoint'].endswith('__view_project'))
+        assert_equal(resolution['view_kwargs'], {'pid': self.node._id})
+
+    def test_resolutions_expire_from_database(self):
+        self.app.get(self.url, auth=self.node.creator.auth)
+        indexes = database[resolutions.COLLECTION].index_information()
+        ttls = [
+            index['expireAfterSeconds'] for index in indexes.values()
+            if index['key'] == [('date', 1)]
+        ]
+        assert_equal(ttls, [settings.GUID_RESOLUTION_TTL])
+
+    def test_cached_resolution_skips_lookups(self):
+        res_first = self.app.get(self.url, auth=self.node.creator.auth)
+        with mock.patch('website.views.Guid') as mock_guid:
+            with mock.patch('website.views.proxy_url') as mock_proxy_url:
+                res = self.app.get(self.url, auth=self.node.creator.auth)
+        assert_false(mock_guid.load.called)
+        assert_false(mock_proxy_url.called)
+        assert_equal(res.text, res_first.text)
+
+    def test_resolve_with_suffix(self):
+        self.app.get(self.url, auth=self.node.creator.auth)
+        res_guid = self.app.get(self.node.web_url_for('node_setting', _guid=True), auth=self.node.creator.auth)
+        res_full = self.app.get(self.node.web_url_for('node_setting'), auth=self.node.creator.auth)
+        assert_equal(res_guid.text, res_full.text)
+
+    def test_saving_node_keeps_resolution(self):
+        self.app.get(self.url, auth=self.node.creator.auth)
+        self.node.title = 'Renamed'
+        self.node.save()
+        assert_is_not_none(resolutions.load(self.node._id))
+
+    def test_moving_wiki_page_drops_resolution(self):
+        wiki = NodeWikiFactory(node=self.node)
+        resolutions.store(wiki._id, wiki, wiki.deep_url)
+        wiki.page_name = 'moved'
+        wiki.save()
+        assert_is_none(resolutions.load(wiki._id))
+
+    def test_changing_referent_drops_resolution(self):
+        self.app.get(self.url, auth=self.node.creator.auth)
+        guid = models.Guid.load(self.node._id)
+        guid.referent = None
+        guid.save()
+        assert_is_none(resolutions.load(self.node._id))
+        res = self.app.get(self.url, auth=self.node.creator.auth, expect_errors=True)
+        assert_equal(res.status_code, 404)
+
+    def test_removing_referent_drops_resolution(self):
+        wiki = NodeWikiFactory(node=self.node)
+        resolutions.store(wiki._id, wiki, wiki.deep_url)
+        NodeWikiPage.remove_one(wiki)
+        assert_is_none(resolutions.load(wiki._id))
+
+    def test_lower_case_redirect(self):
+        res = self.app.get('/{0}/'.format(self.node._id.upper()), auth=self.node.creator.auth)
+        assert_equal(res.status_code, 302)
+        assert_in('/{0}/'.format(self.node._id), res.location)
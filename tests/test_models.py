@@ -25,10 +25,12 @@ from framework.auth.exceptions import ChangePasswordError, ExpiredTokenError
 from framework.auth.utils import impute_names_model
 from framework.auth.signals import user_merged
 from framework.tasks import handlers
+from framework.mongo import database
 from framework.bcrypt import check_password_hash
 from website import filters, language, settings, mailchimp_utils
 from website.exceptions import NodeStateError
 from website.profile.utils import serialize_user
+from website.project import log_index
 from website.project.signals import contributor_added
 from website.project.model import (
     Comment, Node, NodeLog, Pointer, ensure_schemas, has_anonymous_link,
@@ -1906,6 +1908,20 @@ class TestAddonCallbacks(OsfTestCase):
                 self.node, user2, self.consolidate_auth
             )
 
+    def test_remove_contributors_callback(self):
+
+        user2 = UserFactory()
+        user3 = UserFactory()
+        self.node.add_contributor(contributor=user2, auth=self.consolidate_auth)
+        self.node.add_contributor(contributor=user3, auth=self.consolidate_auth)
+        self.node.remove_contributors([user2, user3], auth=self.consolidate_auth)
+        for addon in self.node.addons:
+            callback = addon.after_remove_contributor
+            callback.assert_has_calls([
+                mock.call(self.node, user2, self.consolidate_auth),
+                mock.call(self.node, user3, self.consolidate_auth),
+            ])
+
     def test_set_privacy_callback(self):
 
         self.node.set_privacy('public', self.consolidate_auth)
@@ -1930,7 +1946,7 @@ class TestAddonCallbacks(OsfTestCase):
                 self.node, fork, self.user
             )
 
-    @mock.patch('website.archiver.tasks.archive.si')
+    @mock.patch('website.archiver.tasks.archive_tree.si')
     def test_register_callback(self, mock_archive):
         registration = self.node.register_node(
             None, self.consolidate_auth, '', '',
@@ -2102,6 +2118,44 @@ class TestProject(OsfTestCase):
         assert_not_in(user2._id, self.project.permissions)
         assert_equal(self.project.logs[-1].action, 'contributor_removed')
 
+    def test_remove_contributors(self):
+        user2 = UserFactory()
+        user3 = UserFactory()
+        self.project.add_contributors(
+            [
+                {'user': user2, 'permissions': ['read', 'write'], 'visible': True},
+                {'user': user3, 'permissions': ['read'], 'visible': False},
+            ],
+            auth=self.consolidate_auth,
+            save=True,
+        )
+        n_logs = len(self.project.logs)
+        assert_true(self.project.remove_contributors(
+            [user2, user3], auth=self.consolidate_auth, save=True
+        ))
+        self.project.reload()
+        assert_not_in(user2, self.project.contributors)
+        assert_not_in(user3, self.project.contributors)
+        assert_not_in(user2._id, self.project.permissions)
+        assert_not_in(user2._id, self.project.visible_contributor_ids)
+        assert_equal(len(self.project.logs), n_logs + 1)
+        assert_equal(self.project.logs[-1].action, 'contributor_removed')
+        assert_equal(
+            self.project.logs[-1].params['contributors'],
+            [user2._id, user3._id]
+        )
+
+    def test_remove_contributors_cannot_remove_all_admins(self):
+        user2 = UserFactory()
+        self.project.add_contributor(contributor=user2, permissions=['read', 'write'], auth=self.consolidate_auth)
+        self.project.save()
+        assert_false(self.project.remove_contributors(
+            [self.user], auth=self.consolidate_auth, save=True
+        ))
+        self.project.reload()
+        assert_in(self.user, self.project.contributors)
+        assert_in(self.user._id, self.project.permissions)
+
     def test_manage_contributors_cannot_remove_last_admin_contributor(self):
         user2 = UserFactory()
         self.project.add_contributor(contributor=user2, permissions=['read', 'write'], auth=self.consolidate_auth)
@@ -2470,7 +2524,7 @@ class TestProject(OsfTestCase):
         project = ProjectFactory()
         assert_false(project.is_fork_of(self.project))
 
-    @mock.patch('website.archiver.tasks.archive.si')
+    @mock.patch('website.archiver.tasks.archive_tree.si')
     def test_is_registration_of(self, mock_archive):
         project = ProjectFactory()
         reg1 = project.register_node(None, Auth(user=project.creator), '', None)
@@ -2478,7 +2532,7 @@ class TestProject(OsfTestCase):
         assert_true(reg1.is_registration_of(project))
         assert_true(reg2.is_registration_of(project))
 
-    @mock.patch('website.archiver.tasks.archive.si')
+    @mock.patch('website.archiver.tasks.archive_tree.si')
     def test_is_registration_of_false(self, mock_archive):
         project = ProjectFactory()
         to_reg = ProjectFactory()
@@ -2491,7 +2545,7 @@ class TestProject(OsfTestCase):
         with assert_raises(PermissionsError):
             project.register_node(None, Auth(user=user), '', None)
 
-    @mock.patch('website.archiver.tasks.archive.si')
+    @mock.patch('website.archiver.tasks.archive_tree.si')
     def test_admin_can_register_private_children(self, mock_archive):
         user = UserFactory()
         project = ProjectFactory(creator=user)
@@ -2558,10 +2612,40 @@ class TestProject(OsfTestCase):
         assert_not_in(user2._id, self.project.visible_contributor_ids)
         assert_equal(self.project.permissions[user1._id], ['read', 'write', 'admin'])
         assert_equal(self.project.permissions[user2._id], ['read', 'write'])
+
+    def test_add_contributors_single_log_and_recently_added(self):
+        users = [UserFactory() for _ in range(3)]
+        n_logs = len(self.project.logs)
+        added = self.project.add_contributors(
+            [
+                {'user': user, 'permissions': ['read', 'write'], 'visible': True}
+                for user in users
+            ],
+            auth=self.consolidate_auth,
+            save=True,
+        )
+        assert_equal(added, users)
+        assert_equal(len(self.project.logs), n_logs + 1)
         assert_equal(
-            self.project.logs[-1].params['contributors'],
-            [user1._id, user2._id]
+            self.project.visible_contributor_ids,
+            [self.user._id] + [user._id for user in users]
         )
+        assert_equal(self.user.recently_added[:3], list(reversed(users)))
+
+    def test_add_contributors_skips_existing_contributors(self):
+        user = UserFactory()
+        self.project.add_contributor(user, permissions=['read'], auth=self.consolidate_auth)
+        self.project.save()
+        n_logs = len(self.project.logs)
+        added = self.project.add_contributors(
+            [{'user': user, 'permissions': ['read', 'write'], 'visible': True}],
+            auth=self.consolidate_auth,
+            save=True,
+        )
+        assert_equal(added, [])
+        assert_equal(len(self.project.contributors), 2)
+        assert_equal(len(self.project.logs), n_logs)
+        assert_equal(self.project.permissions[user._id], ['read', 'write'])
 
     def test_set_privacy(self):
         self.project.set_privacy('public', auth=self.consolidate_auth)
@@ -2651,6 +2735,44 @@ class TestProject(OsfTestCase):
         assert_equal(self.project.date_modified, self.project.logs[-1].date)
         assert_not_equal(self.project.date_modified, self.project.date_created)
 
+    def test_date_modified_stored_without_save(self):
+        log = NodeLogFactory()
+        self.project.logs.append(log)
+        doc = database[Node._name].find_one({'_id': self.project._id})
+        assert_equal(doc['date_modified'], self.project.date_modified)
+
+    def test_date_modified_not_moved_back_by_older_log(self):
+        self.project.logs.append(NodeLogFactory())
+        date_modified = self.project.date_modified
+        self.project.logs.append(NodeLogFactory(date=date_modified - datetime.timedelta(days=1)))
+        assert_equal(self.project.date_modified, date_modified)
+
+    def test_logs_not_stored_on_node(self):
+        self.project.logs.append(NodeLogFactory())
+        self.project.save()
+        doc = database[Node._name].find_one({'_id': self.project._id})
+        assert_not_in('logs', doc)
+        assert_equal(len(self.project.logs), log_index.count(self.project._id))
+
+    def test_logs_ordered_by_date(self):
+        n_logs = len(self.project.logs)
+        older = NodeLogFactory(date=self.project.date_created - datetime.timedelta(days=1))
+        newer = NodeLogFactory()
+        self.project.logs.append(newer)
+        self.project.logs.append(older)
+        assert_equal(self.project.logs[0], older)
+        assert_equal(self.project.logs[-1], newer)
+        assert_equal(len(self.project.logs), n_logs + 2)
+        assert_in(older, self.project.logs)
+
+    def test_logs_assignment_replaces_logs(self):
+        log = NodeLogFactory()
+        self.project.logs = [log]
+        assert_equal(list(self.project.logs), [log])
+        other = ProjectFactory()
+        other.logs = self.project.logs
+        assert_equal(list(other.logs), [log])
+
     def test_replace_contributor(self):
         contrib = UserFactory()
         self.project.add_contributor(contrib, auth=Auth(self.project.creator))
@@ -3197,6 +3319,28 @@ class TestRegisterNode(OsfTestCase):
             assert_not_in(node, self.project.nodes)
             assert_true(node.is_registration)
 
+    @mock.patch('website.project.model.project_signals.after_create_registration.send')
+    def test_nodes_registered_in_one_pass(self, mock_send):
+        component = NodeFactory(creator=self.user, parent=self.project)
+        subproject = ProjectFactory(creator=self.user, parent=self.project)
+        subproject_component = NodeFactory(creator=self.user, parent=subproject)
+
+        with mock.patch.object(Node, 'save', autospec=True, side_effect=Node.save) as mock_save:
+            registration = self.project.register_node(None, self.consolidate_auth, 'Template1', 'Some words')
+
+        registrations = list(registration.node_and_primary_descendants())
+        assert_equal(
+            [node.registered_from for node in registrations],
+            [self.project, component, subproject, subproject_component],
+        )
+        assert_equal(registration.nodes[1].nodes[0], registrations[-1])
+        # Each registration is saved once
+        saved = [each[0][0] for each in mock_save.call_args_list]
+        for node in registrations:
+            assert_equal(saved.count(node), 1)
+        # Archiving is started once, for the whole tree
+        mock_send.assert_called_once_with(self.project, dst=registration, user=self.user)
+
     def test_private_contributor_registration(self):
 
         # Create some nodes
@@ -3470,7 +3614,7 @@ class TestPointer(OsfTestCase):
         registered = self.pointer.fork_node()
         self._assert_clone(self.pointer, registered)
 
-    @mock.patch('website.archiver.tasks.archive.si')
+    @mock.patch('website.archiver.tasks.archive_tree.si')
     def test_register_with_pointer_to_registration(self, mock_archive):
         pointee = RegistrationFactory()
         project = ProjectFactory()
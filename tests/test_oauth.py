@@ -3,7 +3,9 @@ import logging
 import json
 import time
 import urlparse
+import datetime
 
+import mock
 import httpretty
 from nose.tools import *  # noqa
 
@@ -16,6 +18,8 @@ from website.oauth.models import (
     OAUTH1,
     OAUTH2,
 )
+from website.oauth import refresh
+from website.addons.citations import library
 from website.util import api_url_for, web_url_for
 
 from tests.base import OsfTestCase
@@ -135,6 +139,25 @@ class TestExternalAccount(OsfTestCase):
         # External account is still in the database
         assert_equal(ExternalAccount.find().count(), 1)
 
+    def test_disconnect_clears_citation_library(self):
+        external_account = ExternalAccountFactory(
+            provider='mock2',
+            provider_id='mock_provider_id',
+            provider_name='Mock Provider',
+        )
+        self.user.external_accounts.append(external_account)
+        self.user.save()
+        library.save_sync(external_account._id, 1, folders=[], items=[('A', {'id': 'A'}, [])])
+
+        self.app.delete(
+            api_url_for('oauth_disconnect',
+                        external_account_id=external_account._id),
+            auth=self.user.auth
+        )
+
+        assert_is_none(library.get_state(external_account._id))
+        assert_equal(library.get_citations(external_account._id), [])
+
     def test_disconnect_with_multiple_connected(self):
         # Disconnect an account connected to multiple users from one user
         external_account = ExternalAccountFactory(
@@ -502,3 +525,110 @@ class TestExternalProviderOAuth2(OsfTestCase):
             ExternalAccount.find().count(),
             1
         )
+
+
+class TestTokenRefresh(OsfTestCase):
+
+    def setUp(self):
+        super(TestTokenRefresh, self).setUp()
+        self.now = datetime.datetime.utcnow()
+        self.account = ExternalAccountFactory(
+            oauth_key='old_access_token',
+            refresh_token='old_refresh_token',
+            expires_at=self.now + datetime.timedelta(minutes=5),
+        )
+        self.provider = MockOAuth2Provider()
+        self.provider.account = self.account
+
+    def tearDown(self):
+        ExternalAccount._clear_caches()
+        ExternalAccount.remove()
+        super(TestTokenRefresh, self).tearDown()
+
+    def test_needs_refresh(self):
+        assert_true(self.provider.needs_refresh())
+        assert_false(self.provider.needs_refresh(leeway=0))
+
+    @httpretty.activate
+    def test_refresh_oauth_key(self):
+        _prepare_mock_oauth2_handshake_response()
+        assert_true(self.provider.refresh_oauth_key(force=True))
+        self.account.reload()
+        assert_equal(self.account.oauth_key, 'mock_access_token')
+        assert_equal(self.account.refresh_token, 'mock_refresh_token')
+        assert_greater(self.account.expires_at, self.now + datetime.timedelta(minutes=30))
+        assert_is_not_none(self.account.date_last_refreshed)
+
+    def test_refresh_oauth_key_not_expired(self):
+        # Token is still valid, so no request is made
+        assert_false(self.provider.refresh_oauth_key())
+
+    def test_get_targets(self):
+        ExternalAccountFactory(
+            refresh_token='refresh',
+            expires_at=self.now + datetime.timedelta(days=1),
+        )
+        ExternalAccountFactory(
+            refresh_token='refresh',
+            expires_at=self.now,
+            refresh_failures=1,
+            date_refresh_retry=self.now + datetime.timedelta(hours=1),
+        )
+        ExternalAccountFactory(
+            refresh_token='refresh',
+            expires_at=self.now,
+            refresh_failures=refresh.settings.OAUTH_REFRESH_MAX_FAILURES,
+        )
+        assert_equal(list(refresh.get_targets(self.now)), [self.account])
+
+    @httpretty.activate
+    def test_refresh_account_failure_backs_off(self):
+        _prepare_mock_500_error()
+        assert_equal(refresh.refresh_account(self.account), refresh.FAILED)
+        self.account.reload()
+        assert_equal(self.account.refresh_failures, 1)
+        assert_greater(self.account.date_refresh_retry, self.now)
+        assert_not_in(self.account, list(refresh.get_targets()))
+
+    @httpretty.activate
+    def test_refresh_account_success_resets_failures(self):
+        _prepare_mock_oauth2_handshake_response()
+        self.account.refresh_failures = 2
+        self.account.save()
+        assert_equal(refresh.refresh_account(self.account), refresh.REFRESHED)
+        self.account.reload()
+        assert_equal(self.account.refresh_failures, 0)
+        assert_is_none(self.account.date_refresh_retry)
+
+    def test_backoff(self):
+        with mock.patch.object(refresh.settings, 'OAUTH_REFRESH_BACKOFF', 60):
+            with mock.patch.object(refresh.settings, 'OAUTH_REFRESH_MAX_BACKOFF', 200):
+                assert_equal(
+                    [refresh.backoff(failures) for failures in range(1, 5)],
+                    [60, 120, 200, 200],
+                )
+
+    def test_partition(self):
+        accounts = [self.account] + [
+            ExternalAccountFactory(refresh_token='refresh', expires_at=self.now)
+            for _ in range(4)
+        ]
+        with mock.patch.object(refresh.settings, 'OAUTH_REFRESH_CONCURRENCY', {'mock2': 2}):
+            batches = refresh.partition(accounts)
+        assert_equal(len(batches), 2)
+        assert_equal(
+            sorted(sum([account_ids for _, account_ids in batches], [])),
+            sorted(account._id for account in accounts),
+        )
+
+    @httpretty.activate
+    def test_schedule(self):
+        _prepare_mock_oauth2_handshake_response()
+        with mock.patch.object(refresh.settings, 'USE_CELERY', False):
+            refresh.schedule()
+        self.account.reload()
+        assert_equal(self.account.oauth_key, 'mock_access_token')
+        metrics = refresh.get_metrics()
+        assert_equal(metrics['mock2']['refreshed_last_day'], 1)
+        assert_equal(metrics['mock2']['expiring'], 0)
+
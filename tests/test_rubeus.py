@@ -422,6 +422,51 @@ class TestSerializingEmptyDashboard(OsfTestCase):
             assert_valid_hgrid_smart_folder(node)
 
 
+class TestSmartFolderCounts(OsfTestCase):
+
+    def setUp(self):
+        super(TestSmartFolderCounts, self).setUp()
+        self.dash = DashboardFactory()
+        self.user = self.dash.creator
+        self.auth = AuthFactory(user=self.user)
+
+    def _counts(self):
+        return {
+            node['node_id']: node['childrenCount']
+            for node in rubeus.to_project_hgrid(self.dash, self.auth)
+            if node.get('isSmartFolder')
+        }
+
+    def test_counts_are_cached(self):
+        ProjectFactory(creator=self.user)
+        assert_equal(self._counts()[ALL_MY_PROJECTS_ID], 1)
+        with mock.patch.object(rubeus.NodeProjectCollector, '_count_all_projects') as mock_count:
+            assert_equal(self._counts()[ALL_MY_PROJECTS_ID], 1)
+        assert_false(mock_count.called)
+
+    def test_counts_updated_on_node_creation_and_deletion(self):
+        assert_equal(self._counts()[ALL_MY_PROJECTS_ID], 0)
+        project = ProjectFactory(creator=self.user)
+        assert_equal(self._counts()[ALL_MY_PROJECTS_ID], 1)
+        project.remove_node(self.auth)
+        assert_equal(self._counts()[ALL_MY_PROJECTS_ID], 0)
+
+    def test_counts_updated_on_registration(self):
+        project = ProjectFactory(creator=self.user)
+        assert_equal(self._counts()[ALL_MY_REGISTRATIONS_ID], 0)
+        RegistrationFactory(project=project, user=self.user)
+        assert_equal(self._counts()[ALL_MY_REGISTRATIONS_ID], 1)
+
+    def test_counts_updated_on_contributor_changes(self):
+        other = UserFactory()
+        project = ProjectFactory(creator=other)
+        assert_equal(self._counts()[ALL_MY_PROJECTS_ID], 0)
+        project.add_contributor(self.user, auth=AuthFactory(user=other), save=True)
+        assert_equal(self._counts()[ALL_MY_PROJECTS_ID], 1)
+        project.remove_contributor(self.user, auth=AuthFactory(user=other))
+        assert_equal(self._counts()[ALL_MY_PROJECTS_ID], 0)
+
+
 class TestSerializingPopulatedDashboard(OsfTestCase):
 
 
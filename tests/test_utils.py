@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 import os
 import mock
+import zipfile
 import unittest
+from cStringIO import StringIO
 from flask import Flask
 from nose.tools import *  # noqa (PEP8 asserts)
 import datetime
@@ -15,6 +17,7 @@ from website.routes import process_rules, OsfWebRenderer
 from website import settings
 from website.util import paths
 from website.util.mimetype import get_mimetype
+from website.util.zipstream import zip_stream
 from website.util import web_url_for, api_url_for, is_json_request, waterbutler_url_for, conjunct, api_v2_url
 from website.project import utils as project_utils
 
@@ -336,3 +339,30 @@ class TestProjectUtils(OsfTestCase):
             self.set_registered_date(reg, tdiff)
         regs = [r for r in project_utils.recent_public_registrations(7)]
         assert_equal(len(regs), 7)
+
+
+class TestZipStream(unittest.TestCase):
+
+    def test_zip_stream(self):
+        date = datetime.datetime(2015, 6, 1, 12, 30, 10)
+        members = [
+            (u'data/magíc.txt', date, iter(['hello ', '', 'world'])),
+            ('empty.txt', None, iter([])),
+            ('big.bin', date, (os.urandom(1024) * 4 for _ in range(64))),
+        ]
+
+        stream = zip_stream(members)
+        archive = zipfile.ZipFile(StringIO(''.join(stream)))
+
+        assert_is_none(archive.testzip())
+        assert_equal(archive.namelist(), [u'data/magíc.txt', 'empty.txt', 'big.bin'])
+        assert_equal(archive.read(u'data/magíc.txt'), 'hello world')
+        assert_equal(archive.read('empty.txt'), '')
+        assert_equal(len(archive.read('big.bin')), 64 * 4096)
+        assert_equal(archive.getinfo(u'data/magíc.txt').date_time, (2015, 6, 1, 12, 30, 10))
+
+    def test_zip_stream_stored(self):
+        stream = zip_stream([('a.txt', None, ['abc'])], compression=zipfile.ZIP_STORED)
+        archive = zipfile.ZipFile(StringIO(''.join(stream)))
+        assert_equal(archive.getinfo('a.txt').compress_type, zipfile.ZIP_STORED)
+        assert_equal(archive.read('a.txt'), 'abc')
@@ -24,6 +24,7 @@ from framework.auth import User, Auth
 from framework.auth.utils import impute_names_model
 from framework.auth.exceptions import InvalidTokenError
 from framework.tasks import handlers
+from framework.utils import iso8601format
 
 from website import mailchimp_utils
 from website.views import _rescale_ratio
@@ -546,7 +547,7 @@ class TestProjectViews(OsfTestCase):
         assert_equal("tag_removed", self.project.logs[-1].action)
         assert_equal("foo'ta#@%#%^&g?", self.project.logs[-1].params['tag'])
 
-    @mock.patch('website.archiver.tasks.archive.si')
+    @mock.patch('website.archiver.tasks.archive_tree.si')
     def test_register_template_page(self, mock_archive):
         url = "/api/v1/project/{0}/register/Replication_Recipe_(Brandt_et_al.,_2013):_Post-Completion/".format(
             self.project._primary_key)
@@ -560,7 +561,7 @@ class TestProjectViews(OsfTestCase):
         reg = Node.load(self.project.node__registrations[-1])
         assert_true(reg.is_registration)
 
-    @mock.patch('website.archiver.tasks.archive.si')
+    @mock.patch('website.archiver.tasks.archive_tree.si')
     def test_register_template_with_embargo_creates_embargo(self, mock_archive):
         url = "/api/v1/project/{0}/register/Replication_Recipe_(Brandt_et_al.,_2013):_Post-Completion/".format(
             self.project._primary_key)
@@ -602,7 +603,7 @@ class TestProjectViews(OsfTestCase):
 
 
     # Regression test for https://github.com/CenterForOpenScience/osf.io/issues/1478
-    @mock.patch('website.archiver.tasks.archive.si')
+    @mock.patch('website.archiver.tasks.archive_tree.si')
     def test_registered_projects_contributions(self, mock_archive):
         # register a project
         self.project.register_node(None, Auth(user=self.project.creator), '', None)
@@ -1900,7 +1901,7 @@ class TestAddingContributorViews(OsfTestCase):
         project.use_as_template(auth=Auth(project.creator))
         assert_false(send_mail.called)
 
-    @mock.patch('website.archiver.tasks.archive.si')
+    @mock.patch('website.archiver.tasks.archive_tree.si')
     @mock.patch('website.mails.send_mail')
     def test_registering_project_does_not_send_contributor_added_email(self, send_mail, mock_archive):
         project = ProjectFactory()
@@ -4131,6 +4132,40 @@ class TestDashboardViews(OsfTestCase):
         res = self.app.get(url, auth=self.creator.auth, expect_errors=True)
         assert_equal(res.status_code, 400)
 
+    def test_get_dashboard_nodes_summary_fields(self):
+        project = ProjectFactory(creator=self.creator)
+        project.set_title('Renamed', auth=Auth(self.creator), save=True)
+        other = ProjectFactory(creator=self.creator)
+
+        url = api_url_for('get_dashboard_nodes')
+        res = self.app.get(url, auth=self.creator.auth)
+        nodes = {node['id']: node for node in res.json['nodes']}
+
+        assert_equal(nodes[project._id]['title'], 'Renamed')
+        assert_equal(nodes[project._id]['url'], project.url)
+        assert_equal(nodes[project._id]['api_url'], project.api_url)
+        assert_equal(nodes[project._id]['permissions'], 'admin')
+        assert_equal(
+            nodes[project._id]['date_modified'],
+            iso8601format(project.date_modified),
+        )
+        assert_equal(
+            res.json['rescale_ratio'],
+            float(max(len(project.logs), len(other.logs))),
+        )
+
+    def test_get_dashboard_nodes_excludes_deleted_and_registrations(self):
+        project = ProjectFactory(creator=self.creator)
+        deleted = ProjectFactory(creator=self.creator, is_deleted=True)
+        RegistrationFactory(project=project)
+
+        url = api_url_for('get_dashboard_nodes')
+        res = self.app.get(url, auth=self.creator.auth)
+        ids = [node['id'] for node in res.json['nodes']]
+        assert_in(project._id, ids)
+        assert_not_in(deleted._id, ids)
+        assert_equal(len(ids), 1)
+
     def test_registered_components_with_are_accessible_from_dashboard(self):
         project = ProjectFactory(creator=self.creator, public=False)
         component = NodeFactory(creator=self.creator, parent=project)
@@ -27,6 +27,7 @@ from website import settings
 from website.addons.base import exceptions
 from website.addons.base import serializer
 from website.project.model import Node
+from website.util import waterbutler_grants
 from website.util import waterbutler_url_for
 
 from website.oauth.signals import oauth_complete
@@ -687,6 +688,13 @@ class AddonNodeSettingsBase(AddonSettingsBase):
         """Whether the node has added credentials for this addon."""
         return False
 
+    def save(self, *args, **kwargs):
+        saved_fields = super(AddonNodeSettingsBase, self).save(*args, **kwargs)
+        # Cached WaterButler grants include this add-on's credentials
+        if saved_fields and self.owner:
+            waterbutler_grants.invalidate([self.owner._id])
+        return saved_fields
+
     def to_json(self, user):
         ret = super(AddonNodeSettingsBase, self).to_json(user)
         ret.update({
@@ -742,6 +750,22 @@ class AddonNodeSettingsBase(AddonSettingsBase):
         """
         pass
 
+    def after_remove_contributors(self, node, removed, auth=None):
+        """Called once per bulk removal with every removed user. Defaults to
+        invoking `after_remove_contributor` for each user; add-ons that can
+        handle the whole batch at once should override this.
+
+        :param Node node:
+        :param list removed: Removed User objects
+        :returns: List of alert messages
+        """
+        messages = []
+        for user in removed:
+            message = self.after_remove_contributor(node, user, auth)
+            if message:
+                messages.append(message)
+        return messages
+
     def before_make_public(self, node):
         """
 
@@ -878,6 +902,16 @@ class StorageAddonBase(object):
             name = name + ": {folder}".format(folder=folder_name)
         return name
 
+    def _get_stat_target(self, target_name, user, version=None):
+        """Collect metadata about the files of this addon for the archiver
+
+        :return: AggregateStatResult or StatResult, or None if there are no files
+        """
+        # Avoid circular imports
+        from website.archiver.utils import aggregate_file_tree_metadata
+        file_tree = self._get_file_tree(user=user, version=version)
+        return aggregate_file_tree_metadata(target_name, file_tree, user)
+
     def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None):
         kwargs = dict(
             provider=self.config.short_name,
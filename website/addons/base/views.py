@@ -12,6 +12,7 @@ from flask import make_response
 from modularodm.exceptions import NoResultsFound
 
 from framework.auth import Auth
+from framework.auth import signing
 from framework.sessions import session
 from framework.sentry import log_exception
 from framework.exceptions import HTTPError
@@ -20,9 +21,11 @@ from framework.auth.decorators import must_be_logged_in, must_be_signed
 from website import mails
 from website import settings
 from website.project import decorators
+from website.project import log_buffer
 from website.addons.base import exceptions
 from website.models import User, Node, NodeLog
 from website.util import rubeus
+from website.util import waterbutler_grants
 from website.profile.utils import get_gravatar
 from website.project.decorators import must_be_valid_project, must_be_contributor_or_public
 from website.project.utils import serialize_node
@@ -144,6 +147,57 @@ def restrict_addrs(*addrs):
 restrict_waterbutler = restrict_addrs(*settings.WATERBUTLER_ADDRS)
 
 
+def buffer_logs(func):
+    """Buffer logs added to the requested node, so that the logs of a bulk
+    upload, which arrive one file at a time, are added to the node in batches.
+    See `website.project.log_buffer`.
+    """
+    @functools.wraps(func)
+    def wrapped(*args, **kwargs):
+        node = kwargs['node'] or kwargs['project']
+        with log_buffer.buffering(node._id):
+            return func(*args, **kwargs)
+    return wrapped
+
+
+def action_class(action):
+    """Group WaterButler actions that require the same access, e.g. all
+    actions that read a file.
+    """
+    permission = permission_map.get(action, None)
+    if permission is None:
+        raise HTTPError(httplib.BAD_REQUEST)
+    # `check_access` also consults the write permissions of parents for these
+    if action in ('copyfrom', 'copyto'):
+        return action
+    return permission
+
+
+def sign_grant(user, node_id, provider_name, action):
+    """Sign the access being granted, so that WaterButler can repeat the
+    action for ``settings.WATERBUTLER_GRANT_TTL`` seconds without calling
+    back. Signed with the secret WaterButler already uses to sign callbacks.
+    """
+    return signing.sign_data(
+        signing.default_signer,
+        {
+            'user': user._id if user else None,
+            'node': node_id,
+            'provider': provider_name,
+            'action': action_class(action),
+        },
+        ttl=settings.WATERBUTLER_GRANT_TTL,
+    )
+
+
+def _lineage(node):
+    node_ids = []
+    while node:
+        node_ids.append(node._id)
+        node = node.parent_node
+    return node_ids
+
+
 @restrict_waterbutler
 def get_auth(**kwargs):
     try:
@@ -163,6 +217,21 @@ def get_auth(**kwargs):
     else:
         user = None
 
+    # Access through view-only links is not cached, since disabling a link
+    # does not change the node
+    grant_key = None
+    if not view_only:
+        grant_key = waterbutler_grants.grant_key(
+            user._id if user else None,
+            node_id,
+            provider_name,
+            action_class(action),
+        )
+        response = waterbutler_grants.load(grant_key)
+        if response is not None:
+            response['grant'] = sign_grant(user, node_id, provider_name, action)
+            return response
+
     node = Node.load(node_id)
     if not node:
         raise HTTPError(httplib.NOT_FOUND)
@@ -175,20 +244,26 @@ def get_auth(**kwargs):
 
     try:
         credentials = provider_settings.serialize_waterbutler_credentials()
-        settings = provider_settings.serialize_waterbutler_settings()
+        waterbutler_settings = provider_settings.serialize_waterbutler_settings()
     except exceptions.AddonError:
         log_exception()
         raise HTTPError(httplib.BAD_REQUEST)
 
-    return {
+    response = {
         'auth': make_auth(user),
         'credentials': credentials,
-        'settings': settings,
+        'settings': waterbutler_settings,
         'callback_url': node.api_url_for(
             ('create_waterbutler_log' if not node.is_registration else 'registration_callbacks'),
             _absolute=True,
         ),
     }
+    # Grants carry no link key, so access through view-only links must keep
+    # calling back; otherwise anyone could reuse the grant until it expires
+    if grant_key:
+        waterbutler_grants.store(grant_key, _lineage(node), response)
+        response['grant'] = sign_grant(user, node_id, provider_name, action)
+    return response
 
 
 LOG_ACTION_MAP = {
@@ -204,6 +279,7 @@ LOG_ACTION_MAP = {
 @must_be_signed
 @restrict_waterbutler
 @must_be_valid_project
+@buffer_logs
 def create_waterbutler_log(payload, **kwargs):
     try:
         auth = payload['auth']
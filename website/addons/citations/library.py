@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Local copy of the citation libraries of linked Zotero and Mendeley
+accounts. Citation lists and widgets are served from this copy; providers
+bring it up to date incrementally in a background task (see
+`website.addons.citations.tasks`), so page views do not translate into
+requests to the remote API.
+
+One state document is kept per external account:
+
+    {
+        '_id': <ExternalAccount._id>,
+        'version': <provider-specific marker of the last sync>,
+        'date_checked': <when a sync was last scheduled or completed>,
+        'folders': [<raw folder JSON from the provider>, ...],
+    }
+
+and one document per citation:
+
+    {
+        '_id': '<ExternalAccount._id>:<remote id>',
+        'account': <ExternalAccount._id>,
+        'csl': <CSL-JSON>,
+        'folders': [<remote folder id>, ...],
+    }
+"""
+
+import datetime
+
+from pymongo.errors import DuplicateKeyError
+
+from framework.mongo import database
+
+from website import settings
+
+
+STATE_COLLECTION = 'citationlibraries'
+ITEM_COLLECTION = 'citationlibraryitems'
+
+
+def _item_id(account_id, remote_id):
+    return '{0}:{1}'.format(account_id, remote_id)
+
+
+def get_state(account_id, db=None):
+    """Return the sync state of an account's library, or None if it has never
+    been synced.
+    """
+    db = db or database  # default to local proxy
+    # Claims create the document before the first sync completes
+    return db[STATE_COLLECTION].find_one({'_id': account_id, 'version': {'$exists': True}})
+
+
+def claim_refresh(account_id, db=None):
+    """Mark a library as being refreshed if it has never been checked, or if
+    its last check is older than ``settings.CITATION_LIBRARY_SYNC_INTERVAL``.
+    Returns True if the caller should schedule the sync, so that concurrent
+    requests schedule it only once and failing syncs are retried no more
+    often than that.
+    """
+    db = db or database
+    now = datetime.datetime.utcnow()
+    cutoff = now - datetime.timedelta(seconds=settings.CITATION_LIBRARY_SYNC_INTERVAL)
+    try:
+        db[STATE_COLLECTION].update(
+            {'_id': account_id, 'date_checked': {'$lt': cutoff}},
+            {'$set': {'date_checked': now}},
+            upsert=True,
+            manipulate=False,
+        )
+    except DuplicateKeyError:
+        # The document exists and was checked recently
+        return False
+    return True
+
+
+def save_sync(account_id, version, folders=None, items=None, removed=None, db=None):
+    """Record the result of a sync.
+
+    :param str account_id: ExternalAccount primary key
+    :param version: Marker to pass to the provider on the next sync
+    :param list folders: Complete list of raw folder JSON; None to keep the
+        stored folders
+    :param list items: (remote id, CSL-JSON, folder ids) tuples for new or
+        changed citations
+    :param list removed: Remote ids of deleted citations
+    """
+    db = db or database
+    collection = db[ITEM_COLLECTION]
+    collection.ensure_index('account')
+    for remote_id, csl, folder_ids in items or []:
+        collection.update(
+            {'_id': _item_id(account_id, remote_id)},
+            {'account': account_id, 'csl': csl, 'folders': list(folder_ids)},
+            upsert=True,
+            manipulate=False,
+        )
+    if removed:
+        collection.remove({
+            '_id': {'$in': [_item_id(account_id, each) for each in removed]},
+        })
+    update = {
+        'version': version,
+        'date_checked': datetime.datetime.utcnow(),
+    }
+    if folders is not None:
+        update['folders'] = folders
+    db[STATE_COLLECTION].update(
+        {'_id': account_id},
+        {'$set': update},
+        upsert=True,
+        manipulate=False,
+    )
+
+
+def set_folder_items(account_id, folder_id, remote_ids, db=None):
+    """Replace the membership of folder `folder_id`, for providers that do not
+    report folders on each citation.
+    """
+    db = db or database
+    collection = db[ITEM_COLLECTION]
+    item_ids = [_item_id(account_id, each) for each in remote_ids]
+    collection.update(
+        {'account': account_id, 'folders': folder_id, '_id': {'$nin': item_ids}},
+        {'$pull': {'folders': folder_id}},
+        multi=True,
+        manipulate=False,
+    )
+    if item_ids:
+        collection.update(
+            {'_id': {'$in': item_ids}},
+            {'$addToSet': {'folders': folder_id}},
+            multi=True,
+            manipulate=False,
+        )
+
+
+def get_citations(account_id, folder_id=None, db=None):
+    """Return the CSL-JSON of every citation in the library, or in a folder."""
+    db = db or database
+    query = {'account': account_id}
+    if folder_id is not None:
+        query['folders'] = folder_id
+    return [each['csl'] for each in db[ITEM_COLLECTION].find(query, {'csl': True})]
+
+
+def clear(account_id, db=None):
+    """Drop the local copy of an account's library."""
+    db = db or database
+    db[ITEM_COLLECTION].remove({'account': account_id})
+    db[STATE_COLLECTION].remove({'_id': account_id})
+
+
+def load_state(provider, db=None):
+    """Return the sync state of the library of `provider.account`, scheduling
+    a background sync if it has never been synced or is due for a refresh.
+
+    :param ExternalProvider provider: Provider with an account, implementing
+        `sync_library`
+    :return: State document, or None if there is no local copy yet
+    """
+    # Avoid circular imports
+    from website.addons.citations import tasks
+    account_id = provider.account._id
+    state = get_state(account_id, db=db)
+    if claim_refresh(account_id, db=db):
+        tasks.sync_library(provider.short_name, account_id)
+    return state
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from framework.tasks import app
+from framework.tasks.handlers import queued_task
+from framework.transactions.context import transaction
+
+from website.oauth.utils import PROVIDER_LOOKUP
+
+
+logger = logging.getLogger(__name__)
+
+
+@queued_task
+@app.task
+@transaction()
+def sync_library(provider_name, account_id):
+    """Bring the local copy of an external account's citation library up to
+    date. Failures are logged rather than retried; the next request that finds
+    the library stale schedules another sync.
+    """
+    # Avoid circular imports
+    from website.oauth.models import ExternalAccount
+    account = ExternalAccount.load(account_id)
+    if account is None:
+        return
+    provider = PROVIDER_LOOKUP[provider_name]()
+    provider.account = account
+    try:
+        provider.sync_library()
+    except Exception:
+        logger.exception(
+            'Could not sync {0} library for account {1}'.format(provider_name, account_id)
+        )
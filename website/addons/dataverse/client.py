@@ -1,3 +1,4 @@
+import weakref
 import httplib as http
 
 from dataverse import Connection
@@ -5,12 +6,51 @@ from dataverse.exceptions import ConnectionError, UnauthorizedError, OperationFa
 
 from framework.exceptions import HTTPError
 
+from website.util.cache import TTLCache
+from website.addons.dataverse import settings
+
+
+# Open connections by (host, token); creating one makes a request to the host
+_connections = TTLCache(settings.CONNECTION_TTL, settings.CONNECTION_POOL_SIZE)
+
+# Read results by the connection or dataverse they were read from
+_responses = weakref.WeakKeyDictionary()
+
+
+def _cached(owner, key, fetch):
+    """Return the result of `fetch()` for `owner`, reusing it for
+    ``settings.RESPONSE_CACHE_TTL`` seconds.
+    """
+    if owner not in _responses:
+        _responses[owner] = TTLCache(settings.RESPONSE_CACHE_TTL)
+    cache = _responses[owner]
+    value = cache.get(key)
+    if value is None:
+        value = fetch()
+        cache.set(key, value)
+    return value
+
+
+def _invalidate(*owners):
+    for owner in owners:
+        if owner is not None:
+            _responses.pop(owner, None)
+
+
+def clear_caches():
+    _connections.clear()
+    _responses.clear()
+
 
 def _connect(host, token):
-    try:
-        return Connection(host, token)
-    except ConnectionError:
-        return None
+    connection = _connections.get((host, token))
+    if connection is None:
+        try:
+            connection = Connection(host, token)
+        except ConnectionError:
+            return None
+        _connections.set((host, token), connection)
+    return connection
 
 
 def connect_from_settings(node_settings):
@@ -53,6 +93,8 @@ def publish_dataverse(dataverse):
         dataverse.publish()
     except OperationFailedError:
         raise HTTPError(http.BAD_REQUEST)
+    finally:
+        _invalidate(dataverse, getattr(dataverse, 'connection', None))
 
 
 def publish_dataset(dataset):
@@ -73,12 +115,14 @@ def publish_dataset(dataset):
         dataset.publish()
     except OperationFailedError:
         raise HTTPError(http.BAD_REQUEST)
+    finally:
+        _invalidate(dataset.dataverse)
 
 
 def get_datasets(dataverse):
     if dataverse is None:
         return []
-    return dataverse.get_datasets()
+    return _cached(dataverse, 'datasets', dataverse.get_datasets)
 
 
 def get_dataset(dataverse, doi):
@@ -104,10 +148,13 @@ def get_dataset(dataverse, doi):
 def get_dataverses(connection):
     if connection is None:
         return []
-    return connection.get_dataverses()
+    return _cached(connection, 'dataverses', connection.get_dataverses)
 
 
 def get_dataverse(connection, alias):
     if connection is None:
         return
-    return connection.get_dataverse(alias)
+    return _cached(
+        connection, ('dataverse', alias),
+        lambda: connection.get_dataverse(alias),
+    )
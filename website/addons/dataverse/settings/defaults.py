@@ -3,3 +3,10 @@ DEFAULT_HOSTS = [
     'dataverse-demo.iq.harvard.edu',    # Harvard DEMO server
     'apitest.dataverse.org',            # Dataverse TEST server
 ]
+
+# Seconds to reuse an open connection per (host, token), and how many to keep
+CONNECTION_TTL = 60 * 30
+CONNECTION_POOL_SIZE = 500
+
+# Seconds to reuse lists of dataverses and datasets read through a connection
+RESPONSE_CACHE_TTL = 60
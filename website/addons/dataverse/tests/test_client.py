@@ -8,9 +8,10 @@ from dataverse.exceptions import UnauthorizedError
 from framework.exceptions import HTTPError
 from website.addons.dataverse.tests.utils import DataverseAddonTestCase
 from website.addons.dataverse.tests.utils import create_external_account
+from website.addons.dataverse import client
 from website.addons.dataverse.client import (
-    _connect, get_files, publish_dataset, get_datasets, get_dataset,
-    get_dataverses, get_dataverse, connect_from_settings, connect_or_401,
+    _connect, get_files, publish_dataset, publish_dataverse, get_datasets,
+    get_dataset, get_dataverses, get_dataverse, connect_from_settings, connect_or_401,
     connect_from_settings_or_401,
 )
 from website.addons.dataverse.model import AddonDataverseNodeSettings
@@ -21,6 +22,7 @@ class TestClient(DataverseAddonTestCase):
     def setUp(self):
 
         super(TestClient, self).setUp()
+        client.clear_caches()
 
         self.host = 'some.host.url'
         self.token = 'some-fancy-api-token-which-is-long'
@@ -42,6 +44,15 @@ class TestClient(DataverseAddonTestCase):
         mock_connection.assert_called_once_with(self.host, self.token)
         assert_true(c)
 
+    @mock.patch('website.addons.dataverse.client.Connection')
+    def test_connect_reuses_connection(self, mock_connection):
+        mock_connection.return_value = mock.create_autospec(Connection)
+        first = _connect(self.host, self.token)
+        second = _connect(self.host, self.token)
+
+        mock_connection.assert_called_once_with(self.host, self.token)
+        assert_is(first, second)
+
     @mock.patch('website.addons.dataverse.client.Connection')
     def test_connect_fail(self, mock_connection):
         mock_connection.side_effect = UnauthorizedError()
@@ -199,6 +210,24 @@ class TestClient(DataverseAddonTestCase):
         assert_in(unpublished_dv, dvs)
         assert_equal(len(dvs), 2)
 
+    def test_get_dataverses_cached(self):
+        self.mock_connection.get_dataverses.return_value = [self.mock_dataverse]
+
+        get_dataverses(self.mock_connection)
+        dvs = get_dataverses(self.mock_connection)
+
+        self.mock_connection.get_dataverses.assert_called_once_with()
+        assert_equal(dvs, [self.mock_dataverse])
+
+    def test_publish_dataverse_clears_cache(self):
+        self.mock_connection.get_dataverses.return_value = [self.mock_dataverse]
+        get_dataverses(self.mock_connection)
+
+        publish_dataverse(self.mock_dataverse)
+        get_dataverses(self.mock_connection)
+
+        assert_equal(self.mock_connection.get_dataverses.call_count, 2)
+
     def test_get_dataverse(self):
         type(self.mock_dataverse).is_published = mock.PropertyMock(return_value=True)
         self.mock_connection.get_dataverse.return_value = self.mock_dataverse
@@ -1,14 +1,49 @@
 import os
+import copy
 import json
 
 import requests
 from requests_oauthlib import OAuth1Session
 
+from website.util.cache import TTLCache
 from website.util.sanitize import escape_html
 
 from . import settings as figshare_settings
 
 
+# Sessions by credentials, so that connections to figshare are kept alive
+# across requests instead of being opened for every client
+_sessions = TTLCache(figshare_settings.SESSION_TTL, figshare_settings.SESSION_POOL_SIZE)
+
+# Escaped results of GET requests by (credentials, url, arguments)
+_responses = TTLCache(figshare_settings.RESPONSE_CACHE_TTL, figshare_settings.RESPONSE_CACHE_SIZE)
+
+ANONYMOUS = None
+
+
+def _get_session(credentials):
+    session = _sessions.get(credentials)
+    if session is None:
+        if credentials is ANONYMOUS:
+            session = requests.Session()
+        else:
+            client_token, client_secret, owner_token, owner_secret = credentials
+            session = OAuth1Session(
+                client_token,
+                client_secret=client_secret,
+                resource_owner_key=owner_token,
+                resource_owner_secret=owner_secret,
+                signature_type='auth_header'
+            )
+        _sessions.set(credentials, session)
+    return session
+
+
+def clear_caches():
+    _sessions.clear()
+    _responses.clear()
+
+
 def _get_project_url(node_settings, project, *args):
     return os.path.join(node_settings.api_url, 'projects', str(project), *args)
 
@@ -17,20 +52,14 @@ class Figshare(object):
     def __init__(self, client_token=None, client_secret=None, owner_token=None, owner_secret=None):
         # if no OAuth
         if owner_token is None:
-            self.session = requests
+            self.credentials = ANONYMOUS
         else:
             self.client_token = client_token
             self.client_secret = client_secret
             self.owner_token = owner_token
             self.owner_secret = owner_secret
-
-            self.session = OAuth1Session(
-                client_token,
-                client_secret=client_secret,
-                resource_owner_key=owner_token,
-                resource_owner_secret=owner_secret,
-                signature_type='auth_header'
-            )
+            self.credentials = (client_token, client_secret, owner_token, owner_secret)
+        self.session = _get_session(self.credentials)
         self.last_error = None
 
     @classmethod
@@ -51,6 +80,14 @@ class Figshare(object):
         return e
 
     def _send(self, url, method='get', output='json', cache=True, **kwargs):
+        cache = cache and method.lower() == 'get' and output == 'json'
+        if cache:
+            key = (self.credentials, url, repr(sorted(kwargs.items())))
+            cached = _responses.get(key)
+            if cached is not None:
+                # Callers modify the results they are given
+                return copy.deepcopy(cached)
+
         func = getattr(self.session, method.lower())
 
         # Send request
@@ -65,7 +102,10 @@ class Figshare(object):
                 rv = getattr(req, output)
                 if callable(rv):
                     rv = rv()
-            return escape_html(rv)
+            rv = escape_html(rv)
+            if cache:
+                _responses.set(key, copy.deepcopy(rv))
+            return rv
         else:
             self.last_error = req.status_code
             return False
@@ -80,6 +120,9 @@ class Figshare(object):
 
         func = getattr(self.session, method.lower())
 
+        # Writes may change anything this account can read
+        _responses.clear(match=lambda key: key[0] == self.credentials)
+
         req = None
 
         headers = {}
@@ -131,7 +174,7 @@ class Figshare(object):
         return articles, 200
 
     def article_is_public(self, article):
-        res = requests.get(os.path.join(figshare_settings.API_URL, 'articles', str(article)))
+        res = _get_session(ANONYMOUS).get(os.path.join(figshare_settings.API_URL, 'articles', str(article)))
         if res.status_code == 200:
             data = json.loads(res.content)
             if data['count'] == 0:
@@ -5,3 +5,11 @@ API_URL = 'http://api.figshare.com/v1/'
 API_OAUTH_URL = API_URL + 'my_data/'
 
 MAX_RENDER_SIZE = 1000
+
+# Seconds to keep an HTTP session per figshare account, and how many to keep
+SESSION_TTL = 60 * 30
+SESSION_POOL_SIZE = 500
+
+# Seconds to reuse the response to a GET request made with the same account
+RESPONSE_CACHE_TTL = 60
+RESPONSE_CACHE_SIZE = 2000
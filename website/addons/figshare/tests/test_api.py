@@ -1,17 +1,19 @@
 # -*- coding: utf-8 -*-
 import os
 
+import mock
 from nose.tools import *  # noqa (PEP8 asserts)
 from tests.base import OsfTestCase
 from tests.factories import NodeFactory
 
 from framework.auth.core import Auth
-from website.addons.figshare.api import _get_project_url, Figshare
+from website.addons.figshare.api import _get_project_url, clear_caches, Figshare
 
 class TestFigshareAPIWrapper(OsfTestCase):
 
     def setUp(self):
         OsfTestCase.setUp(self)
+        clear_caches()
         self.node = NodeFactory()
         self.node.add_addon('figshare', auth=Auth(self.node.creator))
         self.node.save()
@@ -22,3 +24,35 @@ class TestFigshareAPIWrapper(OsfTestCase):
         url = _get_project_url(self.node_settings, 123)
         expected = os.path.join(self.node_settings.api_url, 'projects', '123')
         assert_equal(url, expected)
+
+    def test_sessions_shared_per_credentials(self):
+        assert_is(Figshare().session, self.client.session)
+        first = Figshare('client', 'secret', 'owner', 'owner-secret')
+        second = Figshare('client', 'secret', 'owner', 'owner-secret')
+        other = Figshare('client', 'secret', 'other', 'other-secret')
+        assert_is(first.session, second.session)
+        assert_is_not(first.session, other.session)
+        assert_is_not(first.session, self.client.session)
+
+    def _mock_get(self, client, body):
+        response = mock.Mock(status_code=200)
+        response.json.return_value = body
+        return mock.patch.object(client.session, 'get', return_value=response)
+
+    def test_send_caches_get_requests(self):
+        with self._mock_get(self.client, {'title': 'Ralph'}) as mock_get:
+            first = self.client._send('http://api.figshare.com/v1/articles/1')
+            first['title'] = 'Changed'
+            second = self.client._send('http://api.figshare.com/v1/articles/1')
+        assert_equal(mock_get.call_count, 1)
+        assert_equal(second, {'title': 'Ralph'})
+
+    def test_send_cache_is_per_account(self):
+        other = Figshare('client', 'secret', 'owner', 'owner-secret')
+        url = 'http://api.figshare.com/v1/my_data/articles'
+        with self._mock_get(self.client, {'items': []}):
+            self.client._send(url)
+        with self._mock_get(other, {'items': [{'id': 1}]}) as mock_get:
+            res = other._send(url)
+        assert_equal(mock_get.call_count, 1)
+        assert_equal(res, {'items': [{'id': 1}]})
@@ -4,7 +4,10 @@ import itertools
 import github3
 import cachecontrol
 from requests.adapters import HTTPAdapter
+from github3.repos import Repository
+from github3.repos.branch import Branch
 
+from website.addons.github import cache
 from website.addons.github import settings as github_settings
 from website.addons.github.exceptions import NotFoundError
 
@@ -58,8 +61,12 @@ class GitHub(object):
         :return: Dict of repo information
             See http://developer.github.com/v3/repos/#get
         """
+        data = cache.load('repo', user, repo, self.access_token)
+        if data is not None:
+            return Repository(data, self.gh3)
         rv = self.gh3.repository(user, repo)
         if rv:
+            cache.store('repo', user, repo, self.access_token, rv.to_json())
             return rv
         raise NotFoundError
 
@@ -89,9 +96,19 @@ class GitHub(object):
         :return: List of branch dicts
             http://developer.github.com/v3/repos/#list-branches
         """
+        data = cache.load('branches', user, repo, self.access_token)
+        if data is None:
+            data = [
+                each.to_json()
+                for each in self.repo(user, repo).iter_branches() or []
+            ]
+            cache.store('branches', user, repo, self.access_token, data)
+        branches = [Branch(each, self.gh3) for each in data]
         if branch:
-            return [self.repo(user, repo).branch(branch)]
-        return self.repo(user, repo).iter_branches() or []
+            matches = [each for each in branches if each.name == branch]
+            # Fall back to a live lookup for branches pushed since caching
+            return matches or [self.repo(user, repo).branch(branch)]
+        return branches
 
     # TODO: Test
     def starball(self, user, repo, archive='tar', ref='master'):
@@ -119,7 +136,9 @@ class GitHub(object):
         :param bool private: Make repo private; see
             http://developer.github.com/v3/repos/#edit
         """
-        return self.repo(user, repo).edit(repo, private=private)
+        rv = self.repo(user, repo).edit(repo, private=private)
+        cache.invalidate(user, repo)
+        return rv
 
     #########
     # Hooks #
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Persistent cache of GitHub repo metadata (privacy, default branch,
+collaborator permissions and branch heads). Entries are keyed by repo and by
+the access token used to fetch them, since the `permissions` GitHub returns
+depend on the authenticated user. Entries expire after
+``github_settings.REPO_CACHE_TTL`` seconds, when a TTL index deletes them,
+and are dropped for all tokens by `invalidate` when a hook callback reports a
+push to the repo.
+"""
+
+import hashlib
+import datetime
+
+from framework.mongo import database
+
+from website.addons.github import settings as github_settings
+
+
+COLLECTION = 'githubrepocache'
+
+
+def _full_name(user, repo):
+    return '{0}/{1}'.format(user, repo).lower()
+
+
+def _key(kind, user, repo, access_token):
+    token = hashlib.sha1(access_token).hexdigest() if access_token else 'anonymous'
+    return ':'.join([kind, token, _full_name(user, repo)])
+
+
+def load(kind, user, repo, access_token, db=None):
+    """Return cached data of type `kind` ('repo' or 'branches'), or None if
+    missing or expired.
+    """
+    if not github_settings.REPO_CACHE_TTL:
+        return None
+    db = db or database  # default to local proxy
+    entry = db[COLLECTION].find_one({'_id': _key(kind, user, repo, access_token)})
+    if entry is None:
+        return None
+    age = datetime.datetime.utcnow() - entry['date']
+    if age > datetime.timedelta(seconds=github_settings.REPO_CACHE_TTL):
+        return None
+    return entry['data']
+
+
+def store(kind, user, repo, access_token, data, db=None):
+    if not github_settings.REPO_CACHE_TTL:
+        return
+    db = db or database
+    collection = db[COLLECTION]
+    collection.ensure_index('full_name')
+    collection.ensure_index('date', expireAfterSeconds=github_settings.REPO_CACHE_TTL)
+    collection.update(
+        {'_id': _key(kind, user, repo, access_token)},
+        {
+            'full_name': _full_name(user, repo),
+            'date': datetime.datetime.utcnow(),
+            'data': data,
+        },
+        upsert=True,
+        manipulate=False,
+    )
+
+
+def invalidate(user, repo, db=None):
+    """Drop every cached entry for a repo, regardless of token."""
+    db = db or database
+    db[COLLECTION].remove({'full_name': _full_name(user, repo)})
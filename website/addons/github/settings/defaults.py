@@ -16,3 +16,7 @@ HOOK_CONTENT_TYPE = 'json'
 MAX_RENDER_SIZE = None
 
 CACHE = False
+
+# Seconds to keep repo metadata and branch lists fetched from GitHub; entries
+# are also dropped when a hook callback reports a push. Disabled if 0
+REPO_CACHE_TTL = 300
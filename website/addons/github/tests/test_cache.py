@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import mock
+from nose.tools import *  # noqa (PEP8 asserts)
+
+from github3.repos import Repository
+from github3.repos.branch import Branch
+
+from tests.base import OsfTestCase
+
+from framework.mongo import database
+
+from website.addons.github import cache
+from website.addons.github import settings as github_settings
+from website.addons.github.api import GitHub
+
+
+class TestRepoCache(OsfTestCase):
+
+    def setUp(self):
+        super(TestRepoCache, self).setUp()
+        self.github = GitHub(access_token='12345abc', token_type='bearer')
+        self.repo_json = {
+            'name': 'cow-problems-app',
+            'owner': {'login': 'fred'},
+            'private': False,
+            'default_branch': 'master',
+        }
+        self.branch_json = [
+            {'name': 'master', 'commit': {'sha': 'abc123', 'url': ''}},
+            {'name': 'develop', 'commit': {'sha': 'def456', 'url': ''}},
+        ]
+
+    @mock.patch('github3.GitHub.repository')
+    def test_repo_served_from_cache(self, mock_repository):
+        mock_repository.return_value = Repository.from_json(self.repo_json)
+        self.github.repo('fred', 'cow-problems-app')
+        repo = self.github.repo('fred', 'cow-problems-app')
+        assert_equal(mock_repository.call_count, 1)
+        assert_false(repo.private)
+        assert_equal(repo.default_branch, 'master')
+
+    @mock.patch('github3.GitHub.repository')
+    def test_repo_cache_depends_on_token(self, mock_repository):
+        mock_repository.return_value = Repository.from_json(self.repo_json)
+        self.github.repo('fred', 'cow-problems-app')
+        GitHub(access_token='other', token_type='bearer').repo('fred', 'cow-problems-app')
+        assert_equal(mock_repository.call_count, 2)
+
+    @mock.patch('github3.GitHub.repository')
+    def test_invalidate(self, mock_repository):
+        mock_repository.return_value = Repository.from_json(self.repo_json)
+        self.github.repo('fred', 'cow-problems-app')
+        cache.invalidate('Fred', 'Cow-Problems-App')
+        self.github.repo('fred', 'cow-problems-app')
+        assert_equal(mock_repository.call_count, 2)
+
+    @mock.patch('github3.GitHub.repository')
+    def test_entries_expire_from_database(self, mock_repository):
+        mock_repository.return_value = Repository.from_json(self.repo_json)
+        self.github.repo('fred', 'cow-problems-app')
+        indexes = database[cache.COLLECTION].index_information()
+        ttls = [
+            index['expireAfterSeconds'] for index in indexes.values()
+            if index['key'] == [('date', 1)]
+        ]
+        assert_equal(ttls, [github_settings.REPO_CACHE_TTL])
+
+    @mock.patch('website.addons.github.api.GitHub.repo')
+    def test_branches_served_from_cache(self, mock_repo):
+        mock_repo.return_value.iter_branches.return_value = [
+            Branch.from_json(each) for each in self.branch_json
+        ]
+        self.github.branches('fred', 'cow-problems-app')
+        branches = self.github.branches('fred', 'cow-problems-app')
+        assert_equal(mock_repo.return_value.iter_branches.call_count, 1)
+        assert_equal(
+            [(each.name, each.commit.sha) for each in branches],
+            [('master', 'abc123'), ('develop', 'def456')],
+        )
+
+    @mock.patch('website.addons.github.api.GitHub.repo')
+    def test_single_branch_from_cache(self, mock_repo):
+        mock_repo.return_value.iter_branches.return_value = [
+            Branch.from_json(each) for each in self.branch_json
+        ]
+        branches = self.github.branches('fred', 'cow-problems-app', branch='develop')
+        assert_equal([each.name for each in branches], ['develop'])
+        assert_false(mock_repo.return_value.branch.called)
+
+    @mock.patch('website.addons.github.settings.REPO_CACHE_TTL', 0)
+    @mock.patch('github3.GitHub.repository')
+    def test_cache_disabled(self, mock_repository):
+        mock_repository.return_value = Repository.from_json(self.repo_json)
+        self.github.repo('fred', 'cow-problems-app')
+        self.github.repo('fred', 'cow-problems-app')
+        assert_equal(mock_repository.call_count, 2)
@@ -250,6 +250,15 @@ class TestGithubViews(OsfTestCase):
             sha='b08dbb5b6fcd74a592e5281c9d28e2020a1db4ce',
         )
 
+    @mock.patch('website.addons.github.views.hooks.cache.invalidate')
+    @mock.patch('website.addons.github.views.hooks.utils.verify_hook_signature')
+    def test_hook_callback_invalidates_repo_cache(self, mock_verify, mock_invalidate):
+        url = "/api/v1/project/{0}/github/hook/".format(self.project._id)
+        self.app.post_json(url, {"test": True, "commits": []}).maybe_follow()
+        mock_invalidate.assert_called_once_with(
+            self.node_settings.user, self.node_settings.repo,
+        )
+
     @mock.patch('website.addons.github.views.hooks.utils.verify_hook_signature')
     def test_hook_callback_modify_file_not_thro_osf(self, mock_verify):
         url = "/api/v1/project/{0}/github/hook/".format(self.project._id)
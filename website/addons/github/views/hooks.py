@@ -10,6 +10,7 @@ from website.project.decorators import must_be_valid_project
 from website.project.decorators import must_not_be_registration
 from website.project.decorators import must_have_addon
 
+from website.addons.github import cache
 from website.addons.github import utils
 
 
@@ -77,6 +78,9 @@ def github_hook_callback(node_addon, **kwargs):
         request.headers,
     )
 
+    # Branch heads and repo metadata may have changed
+    cache.invalidate(node_addon.user, node_addon.repo)
+
     node = kwargs['node'] or kwargs['project']
 
     payload = request.json
@@ -521,7 +521,7 @@ class TestNodeSettingsCallbacks(OsfTestCase):
         assert_true(self.node_settings.folder_path is None)
         assert_true(self.node_settings.user_settings is None)
 
-    @mock.patch('website.archiver.tasks.archive.si')
+    @mock.patch('website.archiver.tasks.archive_tree.si')
     def test_does_not_get_copied_to_registrations(self, mock_archive):
         registration = self.project.register_node(
             schema=None,
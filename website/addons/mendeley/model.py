@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 
 import time
+import datetime
 
 import mendeley
+from mendeley.models.folders import Folder
 from modularodm import fields
 
 from website.addons.base import AddonOAuthNodeSettingsBase
 from website.addons.base import AddonOAuthUserSettingsBase
+from website.addons.citations import library
 from website.addons.citations.utils import serialize_folder
 from website.addons.mendeley import serializer
 from website.addons.mendeley import settings
@@ -24,6 +27,7 @@ class Mendeley(ExternalProvider):
 
     auth_url_base = 'https://api.mendeley.com/oauth/authorize'
     callback_url = 'https://api.mendeley.com/oauth/token'
+    auto_refresh_url = callback_url
     default_scopes = ['all']
 
     _client = None
@@ -64,6 +68,9 @@ class Mendeley(ExternalProvider):
     def client(self):
         """An API session with Mendeley"""
         if not self._client:
+            # Usually a no-op; tokens are refreshed ahead of expiry by
+            # website.oauth.refresh
+            self.refresh_oauth_key()
             self._client = self._get_client({
                 'access_token': self.account.oauth_key,
                 'refresh_token': self.account.refresh_token,
@@ -75,7 +82,11 @@ class Mendeley(ExternalProvider):
     def citation_lists(self, extract_folder):
         """List of CitationList objects, derived from Mendeley folders"""
 
-        folders = self._get_folders()
+        state = library.load_state(self)
+        if state is not None:
+            folders = [Folder(self.client, each) for each in state['folders']]
+        else:
+            folders = self._get_folders()
         # TODO: Verify OAuth access to each folder
         all_documents = serialize_folder(
             'All Documents',
@@ -93,6 +104,12 @@ class Mendeley(ExternalProvider):
         :param str list_id: ID for a Mendeley folder. Optional.
         :return CitationList: CitationList for the folder, or for all documents
         """
+        if library.load_state(self) is not None:
+            return library.get_citations(
+                self.account._id,
+                folder_id=None if list_id == 'ROOT' else list_id,
+            )
+
         if list_id == 'ROOT':
             folder = None
         else:
@@ -103,9 +120,53 @@ class Mendeley(ExternalProvider):
         return self._citations_for_mendeley_user()
 
     def _folder_metadata(self, folder_id):
+        state = library.get_state(self.account._id)
+        if state is not None:
+            for each in state['folders']:
+                if each['id'] == folder_id:
+                    return Folder(self.client, each)
         folder = self.client.folders.get(folder_id)
         return folder
 
+    def sync_library(self):
+        """Update the local copy of the user's library with the documents
+        modified or deleted since the last sync. Folder membership is not
+        reported on documents, so it is listed again for every folder.
+        """
+        account_id = self.account._id
+        state = library.get_state(account_id)
+        since = state.get('version') if state else None
+        version = datetime.datetime.utcnow().isoformat() + 'Z'
+
+        if since:
+            documents = self.client.documents.iter(page_size=500, modified_since=since)
+            removed = [
+                document.id
+                for document in self.client.documents.iter(page_size=500, deleted_since=since)
+            ]
+        else:
+            documents = self.client.documents.iter(page_size=500)
+            removed = []
+        items = [
+            (document.id, self._citation_for_mendeley_document(document), [])
+            for document in documents
+        ]
+
+        folders = self._get_folders()
+        library.save_sync(
+            account_id,
+            version,
+            folders=[folder.json for folder in folders],
+            items=items,
+            removed=removed,
+        )
+        for folder in folders:
+            library.set_folder_items(
+                account_id,
+                folder.json['id'],
+                [document.id for document in folder.documents.iter(page_size=500)],
+            )
+
     def _citations_for_mendeley_folder(self, folder):
 
         document_ids = [
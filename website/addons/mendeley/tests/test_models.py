@@ -14,6 +14,7 @@ from website.addons.mendeley.tests.factories import (
     ExternalAccountFactory,
 )
 from website.addons.mendeley.provider import MendeleyCitationsProvider
+from website.addons.citations import library
 
 import datetime
 
@@ -52,7 +53,7 @@ class MendeleyProviderTestCase(OsfTestCase):
     def test_client_not_cached(self, mock_get_client):
         # The first call to .client returns a new client
         mock_account = mock.Mock()
-        mock_account.expires_at = datetime.datetime.now()
+        mock_account.expires_at = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
         self.provider.account = mock_account
         self.provider.client
         mock_get_client.assert_called
@@ -73,12 +74,55 @@ class MendeleyProviderTestCase(OsfTestCase):
         mock_list.items = mock_folders
         mock_client.folders.list.return_value = mock_list
         self.provider._client = mock_client
-        mock_account = mock.Mock()
+        mock_account = mock.Mock(_id='fake_account_id')
         self.provider.account = mock_account
         res = self.provider.citation_lists(MendeleyCitationsProvider()._extract_folder)
         assert_equal(res[1]['name'], mock_folders[0].name)
         assert_equal(res[1]['id'], mock_folders[0].json['id'])
 
+    def test_sync_library(self):
+        mock_client = mock.Mock()
+        document = mock.Mock(id='doc1', json={'id': 'doc1', 'title': 'Cloud Computing', 'type': 'journal'})
+        mock_client.documents.iter.return_value = [document]
+        folder = mock.Mock(json={'id': 'abc123', 'name': 'somename'})
+        folder.documents.iter.return_value = [mock.Mock(id='doc1')]
+        mock_client.folders.list.return_value = mock.Mock(items=[folder])
+        self.provider._client = mock_client
+        self.provider.account = mock.Mock(_id='fake_account_id')
+
+        self.provider.sync_library()
+
+        state = library.get_state('fake_account_id')
+        assert_equal(state['folders'], [{'id': 'abc123', 'name': 'somename'}])
+        citations = library.get_citations('fake_account_id', folder_id='abc123')
+        assert_equal(len(citations), 1)
+        assert_equal(citations[0]['title'], 'Cloud Computing')
+        assert_equal(citations[0]['type'], 'article-journal')
+
+    def test_sync_library_incremental(self):
+        library.save_sync(
+            'fake_account_id', '2015-01-01T00:00:00Z',
+            folders=[],
+            items=[('doc1', {'id': 'doc1'}, []), ('doc2', {'id': 'doc2'}, [])],
+        )
+        mock_client = mock.Mock()
+
+        def iter_documents(page_size=None, modified_since=None, deleted_since=None):
+            if deleted_since:
+                return [mock.Mock(id='doc1')]
+            return []
+        mock_client.documents.iter.side_effect = iter_documents
+        mock_client.folders.list.return_value = mock.Mock(items=[])
+        self.provider._client = mock_client
+        self.provider.account = mock.Mock(_id='fake_account_id')
+
+        self.provider.sync_library()
+
+        mock_client.documents.iter.assert_any_call(
+            page_size=500, modified_since='2015-01-01T00:00:00Z',
+        )
+        assert_equal(library.get_citations('fake_account_id'), [{'id': 'doc2'}])
+
 class MendeleyNodeSettingsTestCase(OsfTestCase):
 
     def setUp(self):
@@ -11,6 +11,7 @@ MODELS = [
     model.OsfStorageFileVersion,
     model.OsfStorageNodeSettings,
     model.OsfStorageTrashedFileNode,
+    model.OsfStorageCopyJob,
 ]
 NODE_SETTINGS_MODEL = model.OsfStorageNodeSettings
 
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Content-addressed index of the file contents stored by OSF Storage, keyed
+by sha256. Versions with the same contents share one entry, so that finding an
+existing archive of an upload is a single lookup by primary key rather than a
+search of every version.
+
+    {
+        '_id': <sha256>,
+        'location': <location of the first version with these contents>,
+        'vault': <archive vault, once archived>,
+        'archive': <archive id, once archived>,
+        'parity': <parity metadata reported by the upload service, if any>,
+        'refcount': <number of versions with these contents>,
+    }
+"""
+
+from framework.mongo import database
+
+
+COLLECTION = 'osfstorageblobs'
+
+
+def load(sha256, db=None):
+    """Return the entry for contents `sha256`, or None."""
+    db = db or database  # default to local proxy
+    return db[COLLECTION].find_one({'_id': sha256})
+
+
+def reference(sha256, location, db=None):
+    """Record that a new version has contents `sha256`."""
+    db = db or database
+    db[COLLECTION].update(
+        {'_id': sha256},
+        {
+            '$inc': {'refcount': 1},
+            '$setOnInsert': {'location': location},
+        },
+        upsert=True,
+        manipulate=False,
+    )
+
+
+def record_archive(sha256, vault, archive, parity=None, db=None):
+    """Record where contents `sha256` are archived."""
+    db = db or database
+    update = {'vault': vault, 'archive': archive}
+    if parity is not None:
+        update['parity'] = parity
+    db[COLLECTION].update(
+        {'_id': sha256},
+        {'$set': update},
+        upsert=True,
+        manipulate=False,
+    )
+
+
+def find_archive(sha256, db=None):
+    """Return the (vault, archive) of contents `sha256`, or None if they have
+    not been archived.
+    """
+    blob = load(sha256, db=db)
+    if blob and blob.get('vault') and blob.get('archive'):
+        return blob['vault'], blob['archive']
+    return None
@@ -33,3 +33,6 @@ class MissingFieldError(OsfStorageError):
 
 class InvalidPath(OsfStorageError):
     pass
+
+class DownloadError(OsfStorageError):
+    pass
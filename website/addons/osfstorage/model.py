@@ -3,6 +3,7 @@ from __future__ import unicode_literals
 import os
 import bson
 import logging
+import datetime
 
 import furl
 
@@ -16,6 +17,8 @@ from framework.mongo.utils import unique_on
 from framework.analytics import get_basic_counters
 
 from website.addons.base import AddonNodeSettingsBase, GuidFile, StorageAddonBase
+from website.addons.osfstorage import blobs
+from website.addons.osfstorage import usage
 from website.addons.osfstorage import utils
 from website.addons.osfstorage import errors
 from website.addons.osfstorage import settings
@@ -57,16 +60,41 @@ class OsfStorageNodeSettings(StorageAddonBase, AddonNodeSettingsBase):
         return OsfStorageGuidFile.get_or_create(self.owner, path)
 
     def after_fork(self, node, fork, user, save=True):
+        # Avoid circular imports
+        from website.addons.osfstorage import tasks
         clone = self.clone()
         clone.owner = fork
         clone.save()
         if not self.root_node:
             self.on_add()
 
-        clone.root_node = utils.copy_files(self.root_node, clone)
+        root = self.root_node.clone()
+        root.node_settings = clone
+        root.save()
+        clone.root_node = root
         clone.save()
 
-        return clone, None
+        usage.record(fork._id, usage.get(node._id))
+
+        total = utils.count_files(self)
+        if total <= settings.FORK_INLINE_COPY_LIMIT:
+            utils.copy_file_tree(self.root_node, root, clone)
+            return clone, None
+
+        job = OsfStorageCopyJob(source=self, destination=clone, total=total)
+        job.save()
+        tasks.copy_file_tree(job._id)
+        message = (
+            'The {0} files and folders of this project are being copied to your '
+            'fork; they will appear once copying has finished.'
+        ).format(total)
+        return clone, message
+
+    @property
+    def copy_job(self):
+        """The most recent background copy of files into this node, if any."""
+        jobs = OsfStorageCopyJob.find(Q('destination', 'eq', self)).sort('-date_created')
+        return jobs[0] if jobs.count() else None
 
     def after_register(self, node, registration, user, save=True):
         clone = self.clone()
@@ -76,6 +104,22 @@ class OsfStorageNodeSettings(StorageAddonBase, AddonNodeSettingsBase):
 
         return clone, None
 
+    def _get_stat_target(self, target_name, user, version=None):
+        # Use the stored usage rather than walking the file tree
+        if not self.root_node or not utils.count_files(self):
+            return None
+        disk_usage = usage.get(self.owner._id, default=None)
+        if disk_usage is None:
+            # Not recorded since usage tracking began; add up the file records
+            disk_usage = usage.compute(self)
+        # Avoid circular imports
+        from website.archiver import StatResult
+        return StatResult(
+            target_id=self._id,
+            target_name=target_name,
+            disk_usage=disk_usage,
+        )
+
     def serialize_waterbutler_settings(self):
         return dict(settings.WATERBUTLER_SETTINGS, **{
             'nid': self.owner._id,
@@ -304,6 +348,9 @@ class OsfStorageFileNode(StoredObject):
         self.versions.append(version)
         self.save()
 
+        previous_size = (latest_version.size or 0) if latest_version else 0
+        usage.record(self.node._id, (version.size or 0) - previous_size)
+
         return version
 
     @utils.must_be('file')
@@ -315,6 +362,9 @@ class OsfStorageFileNode(StoredObject):
         raise errors.VersionNotFoundError
 
     def delete(self, recurse=True):
+        if self.is_file:
+            usage.record(self.node._id, -self.tree_size())
+
         trashed = OsfStorageTrashedFileNode()
         trashed._id = self._id
         trashed.name = self.name
@@ -358,15 +408,32 @@ class OsfStorageFileNode(StoredObject):
         })
         return data
 
+    def tree_size(self):
+        """Return the size of the latest version of this file, or of the
+        latest versions of the files under this folder.
+        """
+        if self.is_folder:
+            return sum(child.tree_size() for child in self.children)
+        version = self.get_version()
+        return (version.size or 0) if version else 0
+
     def copy_under(self, destination_parent, name=None):
-        return utils.copy_files(self, destination_parent.node_settings, destination_parent, name=name)
+        cloned = utils.copy_files(self, destination_parent.node_settings, destination_parent, name=name)
+        usage.record(destination_parent.node._id, self.tree_size())
+        return cloned
 
     def move_under(self, destination_parent, name=None):
+        source_node = self.node
+        size = self.tree_size() if destination_parent.node != source_node else 0
+
         self.name = name or self.name
         self.parent = destination_parent
         self._update_node_settings(save=True)
         # Trust _update_node_settings to save us
 
+        usage.record(source_node._id, -size)
+        usage.record(destination_parent.node._id, size)
+
         return self
 
     def _update_node_settings(self, recursive=True, save=True):
@@ -422,6 +489,23 @@ class OsfStorageFileVersion(StoredObject):
     # this date may be earlier than the date of upload if the file already
     # exists on the backend
     date_modified = fields.DateTimeField()
+    # Hash of the file contents, copied out of `metadata`
+    sha256 = fields.StringField(index=True)
+
+    def save(self, *args, **kwargs):
+        self.sha256 = self.metadata.get('sha256', self.sha256)
+        saved_fields = super(OsfStorageFileVersion, self).save(*args, **kwargs)
+        if self.sha256:
+            if 'sha256' in saved_fields:
+                blobs.reference(self.sha256, self.location)
+            if 'metadata' in saved_fields and self.metadata.get('archive'):
+                blobs.record_archive(
+                    self.sha256,
+                    self.metadata.get('vault'),
+                    self.metadata['archive'],
+                    parity=self.metadata.get('parity'),
+                )
+        return saved_fields
 
     @property
     def location_hash(self):
@@ -435,6 +519,7 @@ class OsfStorageFileVersion(StoredObject):
         return self.location_hash == other.location_hash
 
     def update_metadata(self, metadata):
+        old_size = self.size
         self.metadata.update(metadata)
         # metadata has no defined structure so only attempt to set attributes
         # If its are not in this callback it'll be in the next
@@ -445,9 +530,11 @@ class OsfStorageFileVersion(StoredObject):
             # Incorrect version
             self.date_modified = parse_date(self.metadata['modified'], ignoretz=True)
         self.save()
+        if self.size != old_size:
+            usage.version_resized(self, (self.size or 0) - (old_size or 0))
 
     def _find_matching_archive(self, save=True):
-        """Find another version with the same sha256 as this file.
+        """Find an archive of the contents of this version in the blob index.
         If found copy its vault name and glacier id, no need to create additional backups.
         returns True if found otherwise false
         """
@@ -458,20 +545,10 @@ class OsfStorageFileVersion(StoredObject):
             # Shouldn't ever happen, but we already have an archive
             return True  # We've found ourself
 
-        qs = self.__class__.find(
-            Q('_id', 'ne', self._id) &
-            Q('metadata.vault', 'ne', None) &
-            Q('metadata.archive', 'ne', None) &
-            Q('metadata.sha256', 'eq', self.metadata['sha256'])
-        ).limit(1)
-        if qs.count() < 1:
-            return False
-        other = qs[0]
-        try:
-            self.metadata['vault'] = other.metadata['vault']
-            self.metadata['archive'] = other.metadata['archive']
-        except KeyError:
+        found = blobs.find_archive(self.metadata['sha256'])
+        if found is None:
             return False
+        self.metadata['vault'], self.metadata['archive'] = found
         if save:
             self.save()
         return True
@@ -542,3 +619,67 @@ class OsfStorageTrashedFileNode(StoredObject):
     parent = fields.ForeignField('OsfStorageFileNode', index=True)
     versions = fields.ForeignField('OsfStorageFileVersion', list=True)
     node_settings = fields.ForeignField('OsfStorageNodeSettings', required=True, index=True)
+
+
+class OsfStorageCopyJob(StoredObject):
+    """Progress of copying a file tree into a fork in the background. Only
+    created for trees larger than ``settings.FORK_INLINE_COPY_LIMIT``.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCESS = 'success'
+    FAILURE = 'failure'
+
+    _id = fields.StringField(primary=True, default=lambda: str(bson.ObjectId()))
+    source = fields.ForeignField('OsfStorageNodeSettings', required=True)
+    destination = fields.ForeignField('OsfStorageNodeSettings', required=True, index=True)
+    status = fields.StringField(default=PENDING)
+    # Number of file and folder records to copy, and copied so far
+    total = fields.IntegerField(default=0)
+    copied = fields.IntegerField(default=0)
+    error = fields.StringField()
+    date_created = fields.DateTimeField(auto_now_add=datetime.datetime.utcnow)
+    date_completed = fields.DateTimeField()
+
+    @property
+    def done(self):
+        return self.status in (self.SUCCESS, self.FAILURE)
+
+    def _progress(self, count):
+        self.copied += count
+        self.save()
+
+    def serialize(self):
+        return {
+            'id': self._id,
+            'status': self.status,
+            'total': self.total,
+            'copied': self.copied,
+        }
+
+    def run(self):
+        """Copy the contents of the source root folder into the destination
+        root folder, recording progress after each batch. Rerunning a failed
+        job resumes the copy where it stopped.
+        """
+        self.status = self.RUNNING
+        self.error = None
+        self.date_completed = None
+        self.copied = utils.count_files(self.destination)
+        self.save()
+        try:
+            utils.copy_file_tree(
+                self.source.root_node,
+                self.destination.root_node,
+                self.destination,
+                callback=self._progress,
+            )
+        except Exception as error:
+            self.status = self.FAILURE
+            self.error = repr(error)
+            self.date_completed = datetime.datetime.utcnow()
+            self.save()
+            raise
+        self.status = self.SUCCESS
+        self.date_completed = datetime.datetime.utcnow()
+        self.save()
@@ -23,6 +23,26 @@ api_routes = {
             json_renderer,
         ),
 
+        Rule(
+            [
+                '/project/<pid>/osfstorage/copy_job/',
+                '/project/<pid>/node/<nid>/osfstorage/copy_job/',
+            ],
+            'get',
+            views.osfstorage_get_copy_job,
+            json_renderer,
+        ),
+
+        Rule(
+            [
+                '/project/<pid>/osfstorage/copy_job/retry/',
+                '/project/<pid>/node/<nid>/osfstorage/copy_job/retry/',
+            ],
+            'post',
+            views.osfstorage_retry_copy_job,
+            json_renderer,
+        ),
+
         Rule(
             [
                 '/project/<pid>/osfstorage/<fid>/',
@@ -43,6 +63,18 @@ api_routes = {
             json_renderer,
         ),
 
+        Rule(
+            [
+                '/project/<pid>/osfstorage/zip/',
+                '/project/<pid>/node/<nid>/osfstorage/zip/',
+                '/project/<pid>/osfstorage/<fid>/zip/',
+                '/project/<pid>/node/<nid>/osfstorage/<fid>/zip/',
+            ],
+            'get',
+            views.osfstorage_download_zip,
+            json_renderer,
+        ),
+
         Rule(
             [
                 '/project/<pid>/osfstorage/<fid>/revisions/',
@@ -19,3 +19,13 @@ WATERBUTLER_SETTINGS = {
 WATERBUTLER_RESOURCE = 'folder'
 
 DISK_SAVING_MODE = settings.DISK_SAVING_MODE
+
+# Forks of nodes with more file and folder records than this copy their files
+# in a background task
+FORK_INLINE_COPY_LIMIT = 500
+
+# Maximum number of file records inserted at once when copying a file tree
+COPY_BATCH_SIZE = 500
+
+# Bytes read at a time from storage when streaming a folder as a zip archive
+ZIP_CHUNK_SIZE = 64 * 1024
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+from framework.tasks import app
+from framework.tasks.handlers import queued_task
+
+from website.addons.osfstorage import model
+
+
+@queued_task
+@app.task
+def copy_file_tree(job_id):
+    """Run a background copy of files into a fork. Not run in a transaction,
+    so that the progress of the job is visible while it runs. Failed jobs may
+    be queued again to resume copying.
+    """
+    job = model.OsfStorageCopyJob.load(job_id)
+    if job is None or job.status == job.SUCCESS:
+        return
+    job.run()
@@ -1,11 +1,12 @@
 # encoding: utf-8
 
+import bson
 import mock
 import unittest
 from nose.tools import *  # noqa
 
 from tests.base import OsfTestCase
-from tests.factories import ProjectFactory
+from tests.factories import NodeFactory, ProjectFactory
 
 from website.addons.osfstorage.tests import factories
 from website.addons.osfstorage.tests.utils import StorageTestCase
@@ -15,8 +16,13 @@ import datetime
 from modularodm import exceptions as modm_errors
 
 
+from framework.mongo import database
+
+from website.addons.osfstorage import blobs
+from website.addons.osfstorage import usage
 from website.addons.osfstorage import utils
 from website.addons.osfstorage import model
+from website.addons.osfstorage import tasks
 from website.addons.osfstorage import settings
 
 
@@ -395,6 +401,142 @@ class TestNodeSettingsModel(StorageTestCase):
         assert_equal(cloned_record.versions, record.versions)
         assert_true(fork_node_settings.root_node)
 
+    def test_after_fork_copies_nested_folders(self):
+        folder = self.node_settings.root_node.append_folder('Tiny Dancer')
+        folder.append_file('Levon')
+
+        fork = self.project.fork_node(self.auth_obj)
+        fork_node_settings = fork.get_addon('osfstorage')
+        fork_node_settings.reload()
+
+        cloned_folder = fork_node_settings.root_node.find_child_by_name('Tiny Dancer', kind='folder')
+        cloned_file = cloned_folder.find_child_by_name('Levon')
+        assert_not_equal(cloned_folder._id, folder._id)
+        assert_equal(cloned_file.node_settings, fork_node_settings)
+        assert_is_none(fork_node_settings.copy_job)
+
+    @mock.patch('website.addons.osfstorage.settings.FORK_INLINE_COPY_LIMIT', 1)
+    def test_after_fork_copies_large_trees_in_background(self):
+        self.node_settings.root_node.append_file('Daniel')
+        self.node_settings.root_node.append_file('Rocket Man')
+
+        fork = self.project.fork_node(self.auth_obj)
+        fork_node_settings = fork.get_addon('osfstorage')
+        fork_node_settings.reload()
+
+        job = fork_node_settings.copy_job
+        assert_equal(job.status, model.OsfStorageCopyJob.SUCCESS)
+        assert_equal(job.total, 2)
+        assert_equal(job.copied, 2)
+        assert_true(fork_node_settings.root_node.find_child_by_name('Rocket Man'))
+
+    def test_failed_copy_job_resumes(self):
+        self.node_settings.root_node.append_file('Daniel')
+        self.node_settings.root_node.append_file('Rocket Man')
+        fork = self.project.fork_node(self.auth_obj)
+        fork_node_settings = fork.get_addon('osfstorage')
+        fork_node_settings.reload()
+        # Simulate a copy that failed after its first record
+        fork_node_settings.root_node.find_child_by_name('Rocket Man').delete()
+        job = model.OsfStorageCopyJob(
+            source=self.node_settings,
+            destination=fork_node_settings,
+            status=model.OsfStorageCopyJob.FAILURE,
+            error='Exception()',
+            total=2,
+        )
+        job.save()
+
+        tasks.copy_file_tree(job._id)
+
+        job.reload()
+        assert_equal(job.status, model.OsfStorageCopyJob.SUCCESS)
+        assert_is_none(job.error)
+        assert_equal(job.copied, 2)
+        names = [child.name for child in fork_node_settings.root_node.children]
+        assert_equal(sorted(names), ['Daniel', 'Rocket Man'])
+
+
+class TestStorageUsage(StorageTestCase):
+
+    def setUp(self):
+        super(TestStorageUsage, self).setUp()
+        self.root = self.node_settings.root_node
+        self.record = self.root.append_file('kind-of-blue.flac')
+        self.create_version(self.record, 1024)
+
+    def create_version(self, record, size, **metadata):
+        return record.create_version(
+            self.user,
+            dict(factories.generic_location, object=str(bson.ObjectId())),
+            dict(metadata, size=size),
+        )
+
+    def test_create_version(self):
+        assert_equal(usage.get(self.project._id), 1024)
+        self.create_version(self.record, 2048)
+        assert_equal(usage.get(self.project._id), 2048)
+
+    def test_update_metadata_size(self):
+        version = self.create_version(self.record, None)
+        assert_equal(usage.get(self.project._id), 0)
+        version.update_metadata({'size': 512})
+        assert_equal(usage.get(self.project._id), 512)
+
+    def test_delete(self):
+        folder = self.root.append_folder('albums')
+        self.create_version(folder.append_file('giant-steps.flac'), 256)
+        assert_equal(usage.get(self.project._id), 1024 + 256)
+        folder.delete()
+        assert_equal(usage.get(self.project._id), 1024)
+        self.record.delete()
+        assert_equal(usage.get(self.project._id), 0)
+
+    def test_move_across_nodes(self):
+        other = ProjectFactory(creator=self.user)
+        other_root = other.get_addon('osfstorage').root_node
+        self.record.move_under(other_root)
+        assert_equal(usage.get(self.project._id), 0)
+        assert_equal(usage.get(other._id), 1024)
+
+    def test_copy(self):
+        self.record.copy_under(self.root, name='kind-of-blue (1).flac')
+        assert_equal(usage.get(self.project._id), 2048)
+
+    def test_compute(self):
+        self.record.copy_under(self.root, name='kind-of-blue (1).flac')
+        self.create_version(self.record, 512)
+        assert_equal(usage.compute(self.node_settings), 1024 + 512)
+        assert_equal(usage.compute(self.node_settings), usage.get(self.project._id))
+
+    def test_fork(self):
+        fork = self.project.fork_node(self.auth_obj)
+        assert_equal(usage.get(fork._id), 1024)
+
+    def test_subtree(self):
+        component = NodeFactory(parent=self.project, creator=self.user)
+        grandchild = NodeFactory(parent=component, creator=self.user)
+        linked = ProjectFactory(creator=self.user)
+        self.project.add_pointer(linked, auth=self.auth_obj, save=True)
+        usage.record(component._id, 100)
+        usage.record(grandchild._id, 10)
+        usage.record(linked._id, 1)
+        # Linked projects are not components
+        assert_equal(usage.subtree(self.project), 1024 + 100 + 10)
+        assert_equal(usage.subtree(component), 110)
+
+    def test_stat_target(self):
+        target = self.node_settings._get_stat_target('osfstorage', self.user)
+        assert_equal(target.disk_usage, 1024)
+        self.record.delete()
+        assert_is_none(self.node_settings._get_stat_target('osfstorage', self.user))
+
+    def test_stat_target_without_usage(self):
+        database[usage.COLLECTION].remove({'_id': self.project._id})
+        assert_is_none(usage.get(self.project._id, default=None))
+        target = self.node_settings._get_stat_target('osfstorage', self.user)
+        assert_equal(target.disk_usage, 1024)
+
 
 class TestOsfStorageFileVersion(StorageTestCase):
 
@@ -486,6 +628,19 @@ class TestOsfStorageFileVersion(StorageTestCase):
         assert_equal(version.metadata['vault'], 'the cloud')
         assert_equal(version.metadata['archive'], 'erchiv')
 
+    def test_save_indexes_content_hash(self):
+        version = factories.FileVersionFactory(metadata={'sha256': 'existing'})
+        assert_equal(version.sha256, 'existing')
+        assert_equal(blobs.load('existing')['location'], version.location)
+        factories.FileVersionFactory(metadata={'sha256': 'existing'})
+        assert_equal(blobs.load('existing')['refcount'], 2)
+
+    def test_update_metadata_records_archive(self):
+        version = factories.FileVersionFactory(metadata={'sha256': 'existing'})
+        assert_is_none(blobs.find_archive('existing'))
+        version.update_metadata({'vault': 'the cloud', 'archive': 'erchiv'})
+        assert_equal(blobs.find_archive('existing'), ('the cloud', 'erchiv'))
+
     def test_archive_exits(self):
         node_addon = self.project.get_addon('osfstorage')
         fnode = node_addon.root_node.append_file('MyCoolTestFile')
@@ -517,6 +672,7 @@ class TestOsfStorageFileVersion(StorageTestCase):
 
     def test_no_matching_archive(self):
         model.OsfStorageFileVersion.remove()
+        database[blobs.COLLECTION].remove()
         assert_is(False, factories.FileVersionFactory(
             location={
                 'service': 'cloud',
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
+import mock
 from nose.tools import *  # noqa
 
 
@@ -71,3 +72,44 @@ class TestSerializeRevision(StorageTestCase):
             anon=True
         )
         assert_equal(expected, observed)
+
+
+class TestCopyFileTree(StorageTestCase):
+
+    def setUp(self):
+        super(TestCopyFileTree, self).setUp()
+        self.root = self.node_settings.root_node
+        self.folder = self.root.append_folder('albums')
+        self.record = self.folder.append_file('blue-train.flac')
+        self.record.versions.append(factories.FileVersionFactory(creator=self.user))
+        self.record.save()
+        self.dst = self.root.append_folder('copy')
+
+    def test_copy_file_tree(self):
+        copied = utils.copy_file_tree(self.folder, self.dst, self.node_settings)
+        assert_equal(copied, 1)
+        cloned = self.dst.find_child_by_name('blue-train.flac')
+        assert_not_equal(cloned._id, self.record._id)
+        assert_equal(cloned.versions, self.record.versions)
+
+    def test_copy_file_tree_batches(self):
+        self.folder.append_file('giant-steps.flac')
+        batches = []
+        with mock.patch('website.addons.osfstorage.settings.COPY_BATCH_SIZE', 1):
+            copied = utils.copy_file_tree(self.folder, self.dst, self.node_settings, callback=batches.append)
+        assert_equal(copied, 2)
+        assert_equal(batches, [1, 1])
+
+    def test_copy_file_tree_resumes(self):
+        self.folder.append_file('giant-steps.flac')
+        copied_folder = self.dst.append_folder('nested')
+        self.folder.append_folder('nested').append_file('naima.flac')
+        self.dst.append_file('blue-train.flac')
+        copied = utils.copy_file_tree(self.folder, self.dst, self.node_settings)
+        # Only the missing file and the contents of the copied folder
+        assert_equal(copied, 2)
+        assert_equal(len(self.dst.children), 3)
+        assert_true(copied_folder.find_child_by_name('naima.flac'))
+
+    def test_count_files(self):
+        assert_equal(utils.count_files(self.node_settings), 3)
@@ -2,7 +2,15 @@
 from __future__ import unicode_literals
 
 import os
+import shutil
+import zipfile
 import datetime
+import tempfile
+from cStringIO import StringIO
+
+import mock
+import httplib as http
+from modularodm import Q
 from nose.tools import *  # noqa
 
 from framework.auth.core import Auth
@@ -10,14 +18,18 @@ from website.addons.osfstorage.tests.utils import (
     StorageTestCase, Delta, AssertDeltas,
     recursively_create_file,
 )
+from tests.factories import AuthUserFactory
 from website.addons.osfstorage.tests import factories
 
 from framework.auth import signing
+from framework.analytics import get_basic_counters
 from website.util import rubeus
 
 from website.addons.osfstorage import model
 from website.addons.osfstorage import utils
 from website.addons.osfstorage import views
+from website.addons.osfstorage import errors
+from website.addons.osfstorage import zipping
 from website.addons.base.views import make_auth
 from website.addons.osfstorage import settings as storage_settings
 
@@ -85,10 +97,17 @@ class TestGetMetadataHook(HookTestCase):
             user=auth.user,
             nodeUrl=node.url,
             nodeApiUrl=node.api_url,
+            copyJob=None,
         )
         root = result[0]
         assert_equal(root, expected)
 
+    def test_osf_storage_root_copy_job(self):
+        job = model.OsfStorageCopyJob(source=self.node_settings, destination=self.node_settings, total=3)
+        job.save()
+        root = views.osf_storage_root(self.node_settings, auth=Auth(self.project.creator))[0]
+        assert_equal(root['copyJob'], job.serialize())
+
     def test_root_default(self):
         res = self.send_hook('osfstorage_get_metadata', {}, {})
 
@@ -553,3 +572,143 @@ class TestDeleteHook(HookTestCase):
         resp = self.delete(self.root_node, expect_errors=True)
 
         assert_equal(resp.status_code, 400)
+
+
+class TestDownloadZip(StorageTestCase):
+
+    def setUp(self):
+        super(TestDownloadZip, self).setUp()
+        self.folder = tempfile.mkdtemp()
+        self.contents = {
+            'data/raw.csv': b'a,b\n1,2\n',
+            'data/more/notes.txt': b'notes',
+            'paper.md': b'# Paper',
+        }
+        for path, content in self.contents.items():
+            record = recursively_create_file(self.node_settings, path)
+            object_name = path.replace('/', '-')
+            with open(os.path.join(self.folder, object_name), 'wb') as fp:
+                fp.write(content)
+            record.create_version(self.user, {
+                'service': 'filesystem',
+                'folder': self.folder,
+                'object': object_name,
+            }, {'size': len(content)})
+        # Files without versions are left out
+        recursively_create_file(self.node_settings, 'data/empty.txt')
+
+    def tearDown(self):
+        super(TestDownloadZip, self).tearDown()
+        shutil.rmtree(self.folder)
+
+    def download_zip(self, fid=None, **kwargs):
+        url = self.project.api_url_for('osfstorage_download_zip', **({'fid': fid} if fid else {}))
+        return self.app.get(url, auth=self.user.auth, **kwargs)
+
+    def test_download_zip(self):
+        res = self.download_zip()
+        assert_equal(res.status_code, 200)
+        assert_equal(res.content_type, 'application/zip')
+        assert_in('attachment', res.headers['Content-Disposition'])
+        archive = zipfile.ZipFile(StringIO(res.body))
+        assert_equal(sorted(archive.namelist()), sorted(self.contents))
+        for path, content in self.contents.items():
+            assert_equal(archive.read(path), content)
+
+    def test_download_zip_folder(self):
+        folder = model.OsfStorageFileNode.find_one(
+            Q('name', 'eq', 'data') &
+            Q('node_settings', 'eq', self.node_settings)
+        )
+        res = self.download_zip(fid=folder._id)
+        archive = zipfile.ZipFile(StringIO(res.body))
+        assert_equal(sorted(archive.namelist()), ['more/notes.txt', 'raw.csv'])
+
+    def test_download_zip_file_not_folder(self):
+        record = model.OsfStorageFileNode.find_one(
+            Q('name', 'eq', 'paper.md') &
+            Q('node_settings', 'eq', self.node_settings)
+        )
+        res = self.download_zip(fid=record._id, expect_errors=True)
+        assert_equal(res.status_code, 400)
+
+    def test_download_zip_counts_downloads(self):
+        self.download_zip()
+        for record in model.OsfStorageFileNode.find(
+            Q('kind', 'eq', 'file') &
+            Q('node_settings', 'eq', self.node_settings)
+        ):
+            if not record.versions:
+                continue
+            page = 'download:{0}:{1}'.format(self.project._id, record._id)
+            assert_equal(get_basic_counters(page), (1, 1))
+            page = 'download:{0}:{1}:0'.format(self.project._id, record._id)
+            assert_equal(get_basic_counters(page), (1, 1))
+
+    @mock.patch('website.addons.osfstorage.zipping.requests.get')
+    def test_download_zip_through_waterbutler(self, mock_get):
+        record = recursively_create_file(self.node_settings, 'cloud.txt')
+        record.create_version(self.user, factories.generic_location, {'size': 5})
+        mock_get.return_value = mock.Mock(status_code=200)
+        mock_get.return_value.iter_content.return_value = iter([b'cl', b'oud'])
+
+        res = self.download_zip()
+        archive = zipfile.ZipFile(StringIO(res.body))
+        assert_equal(archive.read('cloud.txt'), b'cloud')
+        url = mock_get.call_args[0][0]
+        assert_in('mode=render', url)
+        assert_in(record._id, url)
+
+    @mock.patch('website.addons.osfstorage.zipping.requests.get')
+    def test_read_chunks_waterbutler_error(self, mock_get):
+        mock_get.return_value = mock.Mock(status_code=503)
+        chunks = zipping._read_url('http://localhost:7777/download', 1024)
+        with assert_raises(errors.DownloadError):
+            list(chunks)
+        assert_true(mock_get.return_value.close.called)
+
+    def test_download_zip_private_project(self):
+        non_contributor = AuthUserFactory()
+        res = self.app.get(
+            self.project.api_url_for('osfstorage_download_zip'),
+            auth=non_contributor.auth,
+            expect_errors=True,
+        )
+        assert_equal(res.status_code, http.FORBIDDEN)
+
+
+class TestCopyJob(StorageTestCase):
+
+    def setUp(self):
+        super(TestCopyJob, self).setUp()
+        self.job = model.OsfStorageCopyJob(
+            source=self.node_settings,
+            destination=self.node_settings,
+            status=model.OsfStorageCopyJob.FAILURE,
+            total=3,
+        )
+        self.job.save()
+
+    def test_get_copy_job(self):
+        res = self.app.get(self.project.api_url_for('osfstorage_get_copy_job'), auth=self.user.auth)
+        assert_equal(res.json, self.job.serialize())
+
+    @mock.patch('website.addons.osfstorage.tasks.copy_file_tree')
+    def test_retry_copy_job(self, mock_copy):
+        res = self.app.post(self.project.api_url_for('osfstorage_retry_copy_job'), auth=self.user.auth)
+        self.job.reload()
+        assert_equal(self.job.status, model.OsfStorageCopyJob.PENDING)
+        assert_equal(res.json['status'], model.OsfStorageCopyJob.PENDING)
+        mock_copy.assert_called_once_with(self.job._id)
+
+    @mock.patch('website.addons.osfstorage.tasks.copy_file_tree')
+    def test_retry_copy_job_not_failed(self, mock_copy):
+        self.job.status = model.OsfStorageCopyJob.SUCCESS
+        self.job.save()
+        res = self.app.post(
+            self.project.api_url_for('osfstorage_retry_copy_job'),
+            auth=self.user.auth,
+            expect_errors=True,
+        )
+        assert_equal(res.status_code, 400)
+        assert_false(mock_copy.called)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Bytes stored in OSF Storage by each node, counting the latest version of
+each file. Totals are adjusted as files are uploaded, updated, deleted, moved
+and copied, and rebuilt from the file records by
+`scripts/osfstorage/reconcile_usage.py`.
+
+    {
+        '_id': <Node._id>,
+        'bytes': <int>,
+    }
+
+The usage of a project and its components is the sum of the totals of their
+nodes, so that it stays correct however the component tree is rearranged.
+"""
+
+from framework.mongo import database
+
+
+COLLECTION = 'osfstorageusage'
+
+
+def record(node_id, delta, db=None):
+    """Add `delta` bytes to the usage of a node."""
+    if not delta:
+        return
+    db = db or database  # default to local proxy
+    db[COLLECTION].update(
+        {'_id': node_id},
+        {'$inc': {'bytes': delta}},
+        upsert=True,
+        manipulate=False,
+    )
+
+
+def store(node_id, total, db=None):
+    """Set the usage of a node to `total` bytes."""
+    db = db or database
+    db[COLLECTION].update(
+        {'_id': node_id},
+        {'$set': {'bytes': total}},
+        upsert=True,
+        manipulate=False,
+    )
+
+
+def get(node_id, db=None, default=0):
+    """Return the number of bytes used by a node, or `default` if no usage
+    has been recorded for it.
+    """
+    db = db or database
+    doc = db[COLLECTION].find_one({'_id': node_id})
+    return doc['bytes'] if doc else default
+
+
+def total(node_ids, db=None):
+    """Return the number of bytes used by the nodes `node_ids` together."""
+    db = db or database
+    result = db[COLLECTION].aggregate([
+        {'$match': {'_id': {'$in': list(node_ids)}}},
+        {'$group': {'_id': None, 'bytes': {'$sum': '$bytes'}}},
+    ])
+    # pymongo 2.x returns the command response rather than a cursor
+    result = result.get('result', [])
+    return result[0]['bytes'] if result else 0
+
+
+def _subtree_ids(node, db):
+    """Return the ids of a node and its primary descendants, reading the raw
+    child references one level of the tree per query rather than loading
+    each descendant.
+    """
+    # `nodes` is an abstract foreign field, stored as [id, name] pairs
+    ids = [node._id]
+    seen = set(ids)
+    level = [child_id for child_id, name in node.nodes._to_data() if name == node._name]
+    while level:
+        level = [each for each in set(level) if each not in seen]
+        if not level:
+            break
+        seen.update(level)
+        ids.extend(level)
+        children = db[node._name].find({'_id': {'$in': level}}, {'nodes': True})
+        level = [
+            child_id
+            for doc in children
+            for child_id, name in doc.get('nodes', [])
+            if name == node._name
+        ]
+    return ids
+
+
+def subtree(node, db=None):
+    """Return the number of bytes used by a node and its components."""
+    db = db or database
+    return total(_subtree_ids(node, db), db=db)
+
+
+def compute(node_settings, db=None):
+    """Add up the sizes of the latest versions of the files of
+    `node_settings` from the file records.
+    """
+    # Avoid circular imports
+    from website.addons.osfstorage.model import OsfStorageFileNode, OsfStorageFileVersion
+    db = db or database
+    files = db[OsfStorageFileNode._name].find(
+        {'node_settings': node_settings._id, 'kind': 'file'},
+        {'versions': True},
+    )
+    latest = [doc['versions'][-1] for doc in files if doc.get('versions')]
+    sizes = {
+        doc['_id']: doc.get('size') or 0
+        for doc in db[OsfStorageFileVersion._name].find(
+            {'_id': {'$in': latest}}, {'size': True}
+        )
+    }
+    # Copies of a file share versions, so count each file rather than each version
+    return sum(sizes.get(version_id, 0) for version_id in latest)
+
+
+def version_resized(version, delta, db=None):
+    """Adjust the usage of every node with a file whose latest version is
+    `version`, after its size changed by `delta` bytes.
+    """
+    # Avoid circular imports
+    from website.addons.osfstorage.model import OsfStorageFileNode, OsfStorageNodeSettings
+    if not delta:
+        return
+    db = db or database
+    files = db[OsfStorageFileNode._name].find(
+        {'versions': version._id},
+        {'versions': True, 'node_settings': True},
+    )
+    for doc in files:
+        if doc['versions'][-1] != version._id:
+            continue
+        node_settings = db[OsfStorageNodeSettings._name].find_one(
+            {'_id': doc['node_settings']}, {'owner': True}
+        )
+        if node_settings and node_settings.get('owner'):
+            record(node_settings['owner'], delta, db=db)
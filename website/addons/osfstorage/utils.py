@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 
 import os
+import bson
 import httplib
 import logging
 import functools
 
 from modularodm.exceptions import ValidationValueError
 
+from framework.mongo import database
 from framework.exceptions import HTTPError
 from framework.analytics import update_counter
 
@@ -118,7 +120,85 @@ def copy_files(src, target_settings, parent=None, name=None):
     cloned.save()
 
     if src.is_folder:
-        for child in src.children:
-            copy_files(child, target_settings, parent=cloned)
+        copy_file_tree(src, cloned, target_settings)
 
     return cloned
+
+
+def _insert_clones(collection, docs, callback=None):
+    if docs:
+        collection.insert(docs, manipulate=False)
+        if callback:
+            callback(len(docs))
+
+
+def copy_file_tree(src, dst, target_settings, callback=None, db=None):
+    """Copy the contents of folder `src` into folder `dst`, one level of the
+    tree at a time, with bulk inserts of at most ``settings.COPY_BATCH_SIZE``
+    records. Copied files share their versions with the originals. Children
+    already copied into `dst` by an earlier, interrupted call are kept, so a
+    failed copy can be resumed by calling this again.
+
+    :param OsfStorageFileNode src: Folder to copy children from
+    :param OsfStorageFileNode dst: Saved folder to copy children into
+    :param OsfStorageNodeSettings target_settings: Node settings that own `dst`
+    :param callable callback: Called with the number of records copied after
+        each insert
+    :return int: Number of records copied
+    """
+    # Avoid circular imports
+    from website.addons.osfstorage.model import OsfStorageFileNode
+    db = db or database  # default to local proxy
+    collection = db[OsfStorageFileNode._name]
+    copied = 0
+    # Source folder id => id of its copy
+    parents = {src._id: dst._id}
+    while parents:
+        # (parent, name, kind) => id of copies made by an earlier call
+        existing = {
+            (doc['parent'], doc['name'], doc['kind']): doc['_id']
+            for doc in collection.find(
+                {'parent': {'$in': list(parents.values())}},
+                {'parent': True, 'name': True, 'kind': True},
+            )
+        }
+        children = collection.find({'parent': {'$in': list(parents)}})
+        next_parents = {}
+        batch = []
+        for doc in children:
+            parent = parents[doc['parent']]
+            clone_id = existing.get((parent, doc['name'], doc['kind']))
+            if clone_id is None:
+                clone = dict(doc)
+                # References to the clone are not tracked on the versions
+                clone.pop('__backrefs', None)
+                clone_id = str(bson.ObjectId())
+                clone.update({
+                    '_id': clone_id,
+                    'parent': parent,
+                    'node_settings': target_settings._id,
+                })
+                batch.append(clone)
+            if doc['kind'] == 'folder':
+                # Descend into folders copied earlier too; their contents may
+                # be incomplete
+                next_parents[doc['_id']] = clone_id
+            if len(batch) >= settings.COPY_BATCH_SIZE:
+                _insert_clones(collection, batch, callback)
+                copied += len(batch)
+                batch = []
+        _insert_clones(collection, batch, callback)
+        copied += len(batch)
+        parents = next_parents
+    return copied
+
+
+def count_files(node_settings, db=None):
+    """Return the number of file and folder records of `node_settings`,
+    excluding its root folder.
+    """
+    # Avoid circular imports
+    from website.addons.osfstorage.model import OsfStorageFileNode
+    db = db or database
+    count = db[OsfStorageFileNode._name].find({'node_settings': node_settings._id}).count()
+    return max(count - 1, 0)
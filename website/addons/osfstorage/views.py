@@ -7,20 +7,26 @@ from modularodm import Q
 from modularodm.storage.base import KeyExistsException
 
 from flask import request
+from flask import Response
 
 from framework.auth import Auth
 from framework.exceptions import HTTPError
 from framework.auth.decorators import must_be_signed
+from framework.analytics import update_counter_pages
 
 from website.models import User
 from website.project.decorators import (
-    must_not_be_registration, must_have_addon,
+    must_not_be_registration, must_have_addon, must_be_contributor_or_public,
+    must_have_permission,
 )
 from website.util import rubeus
+from website.util.zipstream import zip_stream
 from website.project.model import has_anonymous_link
 
 from website.addons.osfstorage import model
+from website.addons.osfstorage import tasks
 from website.addons.osfstorage import utils
+from website.addons.osfstorage import zipping
 from website.addons.osfstorage import decorators
 from website.addons.osfstorage import settings as osf_storage_settings
 
@@ -33,6 +39,7 @@ def osf_storage_root(node_settings, auth, **kwargs):
     URL creation for uploaded files.
     """
     node = node_settings.owner
+    job = node_settings.copy_job
     root = rubeus.build_addon_root(
         node_settings=node_settings,
         name='',
@@ -40,6 +47,7 @@ def osf_storage_root(node_settings, auth, **kwargs):
         user=auth.user,
         nodeUrl=node.url,
         nodeApiUrl=node.api_url,
+        copyJob=job.serialize() if job else None,
     )
     return [root]
 
@@ -71,6 +79,33 @@ def osfstorage_update_metadata(node_addon, payload, **kwargs):
 
     return {'status': 'success'}
 
+@must_be_contributor_or_public
+@must_have_addon('osfstorage', 'node')
+def osfstorage_get_copy_job(node_addon, **kwargs):
+    job = node_addon.copy_job
+    if job is None:
+        raise HTTPError(httplib.NOT_FOUND)
+    return job.serialize()
+
+
+@must_have_permission('write')
+@must_not_be_registration
+@must_have_addon('osfstorage', 'node')
+def osfstorage_retry_copy_job(node_addon, **kwargs):
+    """Queue a failed copy of files into a fork again; the copy resumes
+    where it stopped.
+    """
+    job = node_addon.copy_job
+    if job is None:
+        raise HTTPError(httplib.NOT_FOUND)
+    if job.status != job.FAILURE:
+        raise make_error(httplib.BAD_REQUEST, message_short='Only failed copies can be retried')
+    job.status = job.PENDING
+    job.save()
+    tasks.copy_file_tree(job._id)
+    return job.serialize()
+
+
 @must_be_signed
 @decorators.autoload_filenode(must_be='file')
 def osfstorage_get_revisions(file_node, node_addon, payload, **kwargs):
@@ -223,3 +258,31 @@ def osfstorage_download(file_node, payload, node_addon, **kwargs):
             osf_storage_settings.WATERBUTLER_RESOURCE: version.location[osf_storage_settings.WATERBUTLER_RESOURCE],
         },
     }
+
+
+@must_be_contributor_or_public
+@decorators.autoload_filenode(must_be='folder', default_root=True)
+def osfstorage_download_zip(file_node, node_addon, auth, **kwargs):
+    """Stream the latest versions of the files under a folder as a zip
+    archive, counting a download of each.
+    """
+    node = node_addon.owner
+    members, pages = [], []
+    for path, file_doc, version in zipping.iter_files(file_node):
+        version_idx = len(file_doc['versions']) - 1
+        members.append((
+            path,
+            version.get('date_modified') or version.get('date_created'),
+            zipping.read_chunks(node, file_doc, version, user=auth.user),
+        ))
+        pages.append(u'download:{0}:{1}'.format(node._id, file_doc['_id']))
+        pages.append(u'download:{0}:{1}:{2}'.format(node._id, file_doc['_id'], version_idx))
+
+    update_counter_pages(pages)
+
+    name = file_node.name if file_node.parent else node.title
+    response = Response(zip_stream(members), mimetype='application/zip')
+    response.headers['Content-Disposition'] = u'attachment; filename="{0}.zip"'.format(
+        name.replace('"', '')
+    ).encode('utf-8')
+    return response
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Stream the files under an OSF Storage folder as a zip archive. The file
+records of the folder's node are loaded with one query and the latest
+versions of its files with another, and file contents are streamed from
+storage a chunk at a time.
+"""
+
+import os
+import logging
+import collections
+
+import requests
+
+from framework.mongo import database
+from website.util import waterbutler_url_for
+
+from website.addons.osfstorage import errors
+from website.addons.osfstorage import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def iter_files(folder, db=None):
+    """Yield (path, file record, latest version record) for each file under
+    `folder`, with paths relative to `folder`. Records are raw documents.
+    """
+    # Avoid circular imports
+    from website.addons.osfstorage.model import OsfStorageFileNode, OsfStorageFileVersion
+    db = db or database  # default to local proxy
+
+    children = collections.defaultdict(list)
+    for doc in db[OsfStorageFileNode._name].find(
+        {'node_settings': folder.node_settings._id},
+        {'name': True, 'kind': True, 'parent': True, 'versions': True},
+    ):
+        children[doc.get('parent')].append(doc)
+
+    files = []
+    stack = [(folder._id, u'')]
+    while stack:
+        parent_id, prefix = stack.pop()
+        for doc in sorted(children[parent_id], key=lambda each: each['name']):
+            path = prefix + doc['name']
+            if doc['kind'] == 'folder':
+                stack.append((doc['_id'], path + u'/'))
+            elif doc.get('versions'):
+                files.append((path, doc))
+
+    versions = {
+        doc['_id']: doc
+        for doc in db[OsfStorageFileVersion._name].find(
+            {'_id': {'$in': [doc['versions'][-1] for _, doc in files]}},
+            {'location': True, 'date_created': True, 'date_modified': True},
+        )
+    }
+    for path, doc in files:
+        version = versions.get(doc['versions'][-1])
+        if version is not None:
+            yield path, doc, version
+
+
+def _read_file(path, chunk_size):
+    with open(path, 'rb') as fp:
+        while True:
+            chunk = fp.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _read_url(url, chunk_size):
+    response = requests.get(url, stream=True)
+    try:
+        if response.status_code != 200:
+            # Abort the stream rather than archive an empty file
+            logger.error('Could not download {0} for zip archive: {1}'.format(url, response.status_code))
+            raise errors.DownloadError(url, response.status_code)
+        for chunk in response.iter_content(chunk_size):
+            yield chunk
+    finally:
+        response.close()
+
+
+def read_chunks(node, file_doc, version, user=None, chunk_size=None):
+    """Return an iterator over the contents of the latest version of a file.
+    Contents kept on the local filesystem are read directly; anything else is
+    downloaded through WaterButler. Build iterators within the request, since
+    WaterButler URLs depend on its cookies and arguments.
+    """
+    chunk_size = chunk_size or settings.ZIP_CHUNK_SIZE
+    location = version.get('location') or {}
+    if location.get('service') == 'filesystem' and location.get('folder'):
+        path = os.path.join(location['folder'], location['object'])
+        return _read_file(path, chunk_size)
+    url = waterbutler_url_for(
+        'download', 'osfstorage', '/' + file_doc['_id'], node,
+        user=user,
+        version=len(file_doc['versions']),
+        # Downloads are counted by the zip view rather than per file
+        mode='render',
+    )
+    return _read_url(url, chunk_size)
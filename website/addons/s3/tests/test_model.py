@@ -224,7 +224,7 @@ class TestCallbacks(OsfTestCase):
         assert_true(self.node_settings.user_settings is None)
         assert_true(self.node_settings.bucket is None)
 
-    @mock.patch('website.archiver.tasks.archive.si')
+    @mock.patch('website.archiver.tasks.archive_tree.si')
     def test_does_not_get_copied_to_registrations(self, mock_archive):
         registration = self.project.register_node(
             schema=None,
@@ -96,6 +96,8 @@ def render_content(content, node):
 
 class NodeWikiPage(GuidStoredObject):
 
+    DEEP_URL_FIELDS = {'node', 'page_name'}
+
     _id = fields.StringField(primary=True)
 
     page_name = fields.StringField(validate=validate_page_name)
@@ -5,6 +5,7 @@ from pyzotero import zotero
 
 from website.addons.base import AddonOAuthNodeSettingsBase
 from website.addons.base import AddonOAuthUserSettingsBase
+from website.addons.citations import library
 from website.addons.citations.utils import serialize_folder
 from website.addons.zotero import serializer
 from website.addons.zotero import settings
@@ -15,6 +16,9 @@ from website.oauth.models import ExternalProvider
 # For now, we load 200 citations max and show a message to the user.
 MAX_CITATION_LOAD = 200
 
+# Zotero item types that are not citations
+NON_CITATION_TYPES = ('note', 'attachment')
+
 class Zotero(ExternalProvider):
     name = "Zotero"
     short_name = "zotero"
@@ -49,12 +53,14 @@ class Zotero(ExternalProvider):
 
     def citation_lists(self, extract_folder):
         """List of CitationList objects, derived from Zotero collections"""
-        client = self.client
-
-        # Note: Pagination is the only way to ensure all of the collections
-        #       are retrieved. 100 is the limit per request. This applies
-        #       to Mendeley too, though that limit is 500.
-        collections = client.collections(limit=100)
+        state = library.load_state(self)
+        if state is not None:
+            collections = state['folders']
+        else:
+            # Note: Pagination is the only way to ensure all of the collections
+            #       are retrieved. 100 is the limit per request. This applies
+            #       to Mendeley too, though that limit is 500.
+            collections = self.client.collections(limit=100)
 
         all_documents = serialize_folder(
             'All Documents',
@@ -70,6 +76,11 @@ class Zotero(ExternalProvider):
         return [all_documents] + serialized_folders
 
     def _folder_metadata(self, folder_id):
+        state = library.get_state(self.account._id)
+        if state is not None:
+            for collection in state['folders']:
+                if collection['data'].get('key') == folder_id:
+                    return collection
         collection = self.client.collection(folder_id)
         return collection
 
@@ -82,6 +93,9 @@ class Zotero(ExternalProvider):
         if list_id == 'ROOT':
             list_id = None
 
+        if library.load_state(self) is not None:
+            return library.get_citations(self.account._id, folder_id=list_id)
+
         if list_id:
             citations = []
             more = True
@@ -119,6 +133,57 @@ class Zotero(ExternalProvider):
                 offset = offset + len(page)
         return citations
 
+    def _all_pages(self, method, **kwargs):
+        results = []
+        offset = 0
+        while True:
+            page = method(limit=100, start=offset, **kwargs)
+            results.extend(page)
+            if len(page) < 100:
+                return results
+            offset += len(page)
+
+    def sync_library(self):
+        """Update the local copy of the user's library with the items changed
+        since the library version recorded at the last sync.
+        """
+        account_id = self.account._id
+        state = library.get_state(account_id)
+        since = state.get('version') if state else None
+
+        version = self.client.last_modified_version()
+        if since is not None and version == since:
+            library.save_sync(account_id, version)
+            return
+
+        changed = self._all_pages(
+            self.client.items,
+            include='data,csljson',
+            since=since or 0,
+        )
+        items = []
+        removed = []
+        for each in changed:
+            data = each['data']
+            if data.get('itemType') in NON_CITATION_TYPES or data.get('deleted'):
+                removed.append(each['key'])
+            else:
+                items.append((
+                    each['key'],
+                    each['csljson'],
+                    data.get('collections', []),
+                ))
+        if since is not None:
+            removed.extend(self.client.deleted(since=since).get('items', []))
+
+        library.save_sync(
+            account_id,
+            version,
+            folders=self._all_pages(self.client.collections),
+            items=items,
+            removed=removed,
+        )
+
 
 class ZoteroUserSettings(AddonOAuthUserSettingsBase):
     oauth_provider = Zotero
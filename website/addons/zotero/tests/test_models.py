@@ -14,6 +14,7 @@ from website.addons.zotero.tests.factories import (
     ExternalAccountFactory,
 )
 from website.addons.zotero.provider import ZoteroCitationsProvider
+from website.addons.citations import library
 
 from website.addons.zotero import model
 
@@ -48,7 +49,7 @@ class ZoteroProviderTestCase(OsfTestCase):
 
         mock_client.collections.return_value = mock_folders
         self.provider._client = mock_client
-        mock_account = mock.Mock()
+        mock_account = mock.Mock(_id='fake_account_id')
         self.provider.account = mock_account
 
         res = self.provider.citation_lists(ZoteroCitationsProvider()._extract_folder)
@@ -61,6 +62,107 @@ class ZoteroProviderTestCase(OsfTestCase):
             'Fake Key'
         )
 
+    def _mock_item(self, key, item_type='book', collections=None):
+        return {
+            'key': key,
+            'data': {'itemType': item_type, 'collections': collections or []},
+            'csljson': {'id': key, 'title': 'Title ' + key},
+        }
+
+    def test_sync_library(self):
+        mock_client = mock.Mock()
+        mock_client.last_modified_version.return_value = 5
+        mock_client.items.return_value = [
+            self._mock_item('A', collections=['C1']),
+            self._mock_item('B'),
+            self._mock_item('N', item_type='note'),
+        ]
+        mock_client.collections.return_value = [{'data': {'key': 'C1', 'name': 'Folder'}}]
+        self.provider._client = mock_client
+        self.provider.account = mock.Mock(_id='fake_account_id')
+
+        self.provider.sync_library()
+
+        assert_equal(library.get_state('fake_account_id')['version'], 5)
+        assert_equal(
+            sorted(each['id'] for each in library.get_citations('fake_account_id')),
+            ['A', 'B'],
+        )
+        assert_equal(
+            [each['id'] for each in library.get_citations('fake_account_id', folder_id='C1')],
+            ['A'],
+        )
+
+    def test_sync_library_incremental(self):
+        library.save_sync(
+            'fake_account_id', 5,
+            folders=[],
+            items=[('A', {'id': 'A'}, []), ('B', {'id': 'B'}, [])],
+        )
+        mock_client = mock.Mock()
+        mock_client.last_modified_version.return_value = 6
+        mock_client.items.return_value = [self._mock_item('B')]
+        mock_client.deleted.return_value = {'items': ['A']}
+        mock_client.collections.return_value = []
+        self.provider._client = mock_client
+        self.provider.account = mock.Mock(_id='fake_account_id')
+
+        self.provider.sync_library()
+
+        assert_equal(mock_client.items.call_args[1]['since'], 5)
+        mock_client.deleted.assert_called_once_with(since=5)
+        assert_equal(
+            library.get_citations('fake_account_id'),
+            [{'id': 'B', 'title': 'Title B'}],
+        )
+
+    def test_sync_library_unchanged(self):
+        library.save_sync('fake_account_id', 5, folders=[], items=[])
+        mock_client = mock.Mock()
+        mock_client.last_modified_version.return_value = 5
+        self.provider._client = mock_client
+        self.provider.account = mock.Mock(_id='fake_account_id')
+
+        self.provider.sync_library()
+
+        assert_false(mock_client.items.called)
+
+    def test_get_list_served_from_library(self):
+        library.save_sync(
+            'fake_account_id', 5,
+            folders=[],
+            items=[('A', {'id': 'A'}, ['C1']), ('B', {'id': 'B'}, [])],
+        )
+        mock_client = mock.Mock()
+        self.provider._client = mock_client
+        self.provider.account = mock.Mock(_id='fake_account_id')
+
+        assert_equal(self.provider.get_list('C1'), [{'id': 'A'}])
+        assert_equal(len(self.provider.get_list('ROOT')), 2)
+        assert_false(mock_client.items.called)
+        assert_false(mock_client.collection_items.called)
+
+    @mock.patch('website.addons.citations.tasks.sync_library')
+    def test_stale_library_schedules_sync(self, mock_sync):
+        library.save_sync('fake_account_id', 5, folders=[], items=[])
+        self.provider.account = mock.Mock(_id='fake_account_id')
+        with mock.patch('website.settings.CITATION_LIBRARY_SYNC_INTERVAL', -1):
+            library.load_state(self.provider)
+        mock_sync.assert_called_once_with('zotero', 'fake_account_id')
+        mock_sync.reset_mock()
+        library.load_state(self.provider)
+        assert_false(mock_sync.called)
+
+    @mock.patch('website.addons.citations.tasks.sync_library')
+    def test_unsynced_library_schedules_sync_once(self, mock_sync):
+        self.provider.account = mock.Mock(_id='unsynced_account_id')
+        assert_is_none(library.load_state(self.provider))
+        mock_sync.assert_called_once_with('zotero', 'unsynced_account_id')
+        # A failed first sync is retried after the interval, not on every request
+        mock_sync.reset_mock()
+        assert_is_none(library.load_state(self.provider))
+        assert_false(mock_sync.called)
+
 class ZoteroNodeSettingsTestCase(OsfTestCase):
 
     def setUp(self):
@@ -1,8 +1,6 @@
-import celery
-
 from framework.tasks import handlers
 
-from website.archiver.tasks import archive
+from website.archiver.tasks import archive_tree
 from website.archiver import utils as archiver_utils
 from website.archiver import (
     ARCHIVER_UNCAUGHT_ERROR,
@@ -13,20 +11,19 @@ from website.project import signals as project_signals
 
 @project_signals.after_create_registration.connect
 def after_register(src, dst, user):
-    """Blinker listener for registration initiations. Enqueqes a chain
-    of archive tasks for the current node and its descendants
+    """Blinker listener for registration initiations. Creates ArchiveJobs for
+    the registration and its primary descendants, then enqueues a single
+    archive task for the whole tree
 
     :param src: Node being registered
     :param dst: registration Node
     :param user: registration initiator
     """
-    archiver_utils.before_archive(dst, user)
     if dst.root != dst:  # if not top-level registration
         return
-    archive_tasks = [archive.si(job_pk=t.archive_job._id) for t in dst.node_and_primary_descendants()]
-    handlers.enqueue_task(
-        celery.chain(*archive_tasks)
-    )
+    for node in dst.node_and_primary_descendants():
+        archiver_utils.before_archive(node, user)
+    handlers.enqueue_task(archive_tree.si(job_pk=dst.archive_job._id))
 
 
 @project_signals.archive_callback.connect
@@ -1,8 +1,10 @@
 import requests
 import json
+import itertools
 
 import celery
 from celery.utils.log import get_task_logger
+from celery.datastructures import ExceptionInfo
 
 from framework.tasks import app as celery_app
 from framework.tasks.utils import logged
@@ -17,7 +19,6 @@ from website.archiver import (
     NO_ARCHIVE_LIMIT,
     AggregateStatResult,
 )
-from website.archiver import utils
 from website.archiver.model import ArchiveJob
 from website.archiver import signals as archiver_signals
 
@@ -103,7 +104,7 @@ def stat_addon(addon_short_name, job_pk):
     src, dst, user = job.info()
     src_addon = src.get_addon(addon_name)
     try:
-        file_tree = src_addon._get_file_tree(user=user, version=version)
+        target = src_addon._get_stat_target(addon_short_name, user, version=version)
     except HTTPError as e:
         dst.archive_job.update_target(
             addon_short_name,
@@ -114,7 +115,7 @@ def stat_addon(addon_short_name, job_pk):
     result = AggregateStatResult(
         src_addon._id,
         addon_short_name,
-        targets=[utils.aggregate_file_tree_metadata(addon_short_name, file_tree, user)],
+        targets=[target],
     )
     return result
 
@@ -260,3 +261,74 @@ def archive(self, job_pk):
             for target in job.target_addons
         )
     )(archive_node.s(job_pk=job_pk))
+
+
+@celery_app.task(name='archiver.stat_addons')
+@logged('stat_addons')
+def stat_addons(targets):
+    """Run #stat_addon for each target in turn
+
+    :param targets: <list> of (addon_short_name, job_pk) pairs
+    :return: <list> of (job_pk, AggregateStatResult) pairs
+    """
+    results = []
+    for addon_short_name, job_pk in targets:
+        try:
+            result = stat_addon(addon_short_name=addon_short_name, job_pk=job_pk)
+        except Exception as error:
+            # Fail the job of the target, as a standalone #stat_addon would
+            stat_addon.on_failure(error, None, (), {'job_pk': job_pk}, ExceptionInfo())
+            raise
+        results.append((job_pk, result))
+    return results
+
+
+@celery_app.task(name='archiver.archive_nodes')
+@logged('archive_nodes')
+def archive_nodes(results, job_pks):
+    """Run #archive_node for each ArchiveJob of a registration tree with the
+    results of the #stat_addons subtasks spawned in #archive_tree
+
+    :param results: <list> of results of #stat_addons
+    :param job_pks: primary keys of the ArchiveJobs of the tree
+    :return: None
+    """
+    job_results = {job_pk: [] for job_pk in job_pks}
+    for job_pk, result in itertools.chain(*results):
+        job_results[job_pk].append(result)
+    for job_pk in job_pks:
+        archive_node.delay(job_results[job_pk], job_pk=job_pk)
+
+
+@celery_app.task(base=ArchiverTask, name='archiver.archive_tree')
+@logged('archive_tree')
+def archive_tree(job_pk):
+    """Starts a single celery.chord that runs stat_addon for each complete
+    addon of each Node in a registration tree, then runs #archive_node for
+    each Node with its results. The addons of the whole tree are spread over
+    at most settings.ARCHIVER_MAX_CONCURRENCY subtasks.
+
+    :param job_pk: primary key of the ArchiveJob of the top-level registration
+    :return: None
+    """
+    create_app_context()
+    job = ArchiveJob.load(job_pk)
+    src, dst, user = job.info()
+    logger.info("Received archive task for tree of Node: {0} into Node: {1}".format(src._id, dst._id))
+    jobs = [node.archive_job for node in dst.node_and_primary_descendants()]
+    job_pks = [each._id for each in jobs]
+    targets = [
+        (target.name, each._id)
+        for each in jobs
+        for target in each.target_addons
+    ]
+    if not targets:
+        archive_nodes.delay([], job_pks=job_pks)
+        return
+    lanes = [
+        targets[index::settings.ARCHIVER_MAX_CONCURRENCY]
+        for index in range(min(len(targets), settings.ARCHIVER_MAX_CONCURRENCY))
+    ]
+    celery.chord(
+        celery.group(stat_addons.si(targets=lane) for lane in lanes)
+    )(archive_nodes.s(job_pks=job_pks))
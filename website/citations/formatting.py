@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""Server-side rendering of node citations in a CSL style, so that clients
+need not load citeproc-js and style files to show an APA/MLA/Chicago
+citation. Rendered citations are cached per (node, style, format) and
+checked against the id of the node's most recent log, which changes
+whenever the title, contributors or visibility change; entries also expire
+after ``settings.CITATION_RENDER_CACHE_TTL`` seconds to pick up contributor
+name changes.
+"""
+
+import os
+import re
+import datetime
+
+from citeproc import formatter
+from citeproc import Citation, CitationItem
+from citeproc import CitationStylesStyle, CitationStylesBibliography
+from citeproc.source.json import CiteProcJSON
+
+from framework.mongo import database
+
+from website import settings
+from website.project import log_index
+
+
+COLLECTION = 'citationrendercache'
+
+FORMATTERS = {
+    'text': formatter.plain,
+    'html': formatter.html,
+}
+
+STYLE_ID_RE = re.compile(r'^[\w.-]+$')
+
+# Parsed styles by id; parsing a style file is far slower than rendering
+_style_cache = {}
+
+
+def get_style(style_id):
+    """Return the parsed CSL style `style_id`.
+
+    :raises: ValueError if there is no such style
+    """
+    if style_id not in _style_cache:
+        if not style_id or not STYLE_ID_RE.match(style_id):
+            raise ValueError('Invalid citation style: {0!r}'.format(style_id))
+        path = os.path.join(settings.CITATION_STYLES_PATH, style_id + '.csl')
+        if not os.path.isfile(path):
+            raise ValueError('Unknown citation style: {0!r}'.format(style_id))
+        _style_cache[style_id] = CitationStylesStyle(path, validate=False)
+    return _style_cache[style_id]
+
+
+def render_csl(csl, style_id, fmt='text'):
+    """Render a single CSL-JSON item as a bibliography entry.
+
+    :param dict csl: CSL-JSON item; must have an `id`
+    :param str style_id: Name of a style in ``settings.CITATION_STYLES_PATH``
+    :param str fmt: 'text' or 'html'
+    :raises: ValueError if the style or format is unknown
+    """
+    if fmt not in FORMATTERS:
+        raise ValueError('Unknown citation format: {0!r}'.format(fmt))
+    style = get_style(style_id)
+    bibliography = CitationStylesBibliography(
+        style, CiteProcJSON([csl]), FORMATTERS[fmt]
+    )
+    bibliography.register(Citation([CitationItem(csl['id'])]))
+    return u''.join(unicode(entry) for entry in bibliography.bibliography())
+
+
+def _cache_key(node_id, style_id, fmt):
+    return ':'.join([node_id, style_id, fmt])
+
+
+def _marker(node):
+    return log_index.latest(node._id)
+
+
+def render_node_citations(nodes, style_id, fmt='text', db=None):
+    """Render citations for many nodes at once. Cached citations are fetched
+    in a single query; only nodes modified since they were cached are
+    rendered again.
+
+    :param list nodes: Nodes to cite
+    :return dict: Node id => rendered citation
+    :raises: ValueError if the style or format is unknown
+    """
+    db = db or database  # default to local proxy
+    collection = db[COLLECTION]
+    if fmt not in FORMATTERS:
+        raise ValueError('Unknown citation format: {0!r}'.format(fmt))
+    get_style(style_id)
+
+    markers = {node._id: _marker(node) for node in nodes}
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(
+        seconds=settings.CITATION_RENDER_CACHE_TTL
+    )
+    cached = collection.find({
+        '_id': {'$in': [_cache_key(node._id, style_id, fmt) for node in nodes]},
+        'date': {'$gt': cutoff},
+    })
+    citations = {
+        entry['node']: entry['citation']
+        for entry in cached
+        if entry['marker'] == markers.get(entry['node'])
+    }
+
+    for node in nodes:
+        if node._id in citations:
+            continue
+        citation = render_csl(node.csl, style_id, fmt)
+        collection.update(
+            {'_id': _cache_key(node._id, style_id, fmt)},
+            {
+                'node': node._id,
+                'marker': markers[node._id],
+                'date': datetime.datetime.utcnow(),
+                'citation': citation,
+            },
+            upsert=True,
+            manipulate=False,
+        )
+        citations[node._id] = citation
+    return citations
+
+
+def render_node_citation(node, style_id, fmt='text', db=None):
+    """Render the citation of a single node; see `render_node_citations`."""
+    return render_node_citations([node], style_id, fmt=fmt, db=db)[node._id]
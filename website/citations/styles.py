@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Process-level index of citation styles for the style picker. Styles only
+change when `scripts/parse_citation_styles.py` runs, so they are loaded
+once, kept in memory, and searched without touching the database. The index
+reloads itself after ``settings.CITATION_STYLE_INDEX_TTL`` seconds so that a
+parse run in another process is eventually picked up.
+"""
+
+import re
+import bisect
+import datetime
+from collections import namedtuple
+
+from website import settings
+from website.citations.models import CitationStyle
+
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+_Entry = namedtuple('_Entry', ['style', 'id', 'title', 'short_title', 'words'])
+
+
+def _normalize(value):
+    return (value or '').lower()
+
+
+class StyleIndex(object):
+    """In-memory index of `CitationStyle` records. Every word of a style's id,
+    title and short title is kept in a sorted list, so styles with a word
+    starting with a search token are found by bisection.
+    """
+
+    def __init__(self):
+        self._entries = None
+        self._words = None
+        self._date_loaded = None
+
+    def reset(self):
+        """Drop the loaded styles; they are reloaded on the next search."""
+        self._entries = None
+        self._words = None
+        self._date_loaded = None
+
+    def _expired(self):
+        if self._entries is None:
+            return True
+        age = datetime.datetime.utcnow() - self._date_loaded
+        return age > datetime.timedelta(seconds=settings.CITATION_STYLE_INDEX_TTL)
+
+    def load(self):
+        entries = []
+        for style in CitationStyle.find():
+            _id, title, short_title = (
+                _normalize(style._id),
+                _normalize(style.title),
+                _normalize(style.short_title),
+            )
+            entries.append(_Entry(
+                style=style.to_json(),
+                id=_id,
+                title=title,
+                short_title=short_title,
+                words=frozenset(WORD_RE.findall(' '.join([_id, title, short_title]))),
+            ))
+        entries.sort(key=lambda entry: (entry.title, entry.id))
+        self._entries = entries
+        self._words = sorted(
+            (word, position)
+            for position, entry in enumerate(entries)
+            for word in entry.words
+        )
+        self._date_loaded = datetime.datetime.utcnow()
+
+    def _ensure_loaded(self):
+        if self._expired():
+            self.load()
+
+    def _with_word_prefix(self, prefix):
+        """Return positions of entries with a word starting with `prefix`."""
+        positions = set()
+        start = bisect.bisect_left(self._words, (prefix, ))
+        for word, position in self._words[start:]:
+            if not word.startswith(prefix):
+                break
+            positions.add(position)
+        return positions
+
+    @staticmethod
+    def _rank(entry, term):
+        if term in (entry.id, entry.short_title):
+            return 0
+        if entry.id.startswith(term) or entry.short_title.startswith(term):
+            return 1
+        if entry.title.startswith(term):
+            return 2
+        return 3
+
+    def search(self, term=None, limit=None):
+        """Return serialized styles matching `term`, best matches first.
+
+        Styles with an id, title or short title starting with `term` rank
+        highest, then styles with a word starting with each token of `term`,
+        then styles merely containing `term`.
+
+        :param str term: Search string; return every style if empty
+        :param int limit: Maximum number of results
+        :return list: Dicts as returned by `CitationStyle.to_json`
+        """
+        self._ensure_loaded()
+        term = _normalize(term).strip()
+        if not term:
+            return [entry.style for entry in self._entries[:limit]]
+
+        tokens = WORD_RE.findall(term)
+        positions = None
+        for token in tokens:
+            matches = self._with_word_prefix(token)
+            positions = matches if positions is None else positions & matches
+        ranked = [
+            (self._rank(self._entries[position], term), position)
+            for position in positions or []
+        ]
+
+        if limit is None or len(ranked) < limit:
+            # Fall back to substring matches, e.g. on punctuation or mid-word
+            seen = positions or set()
+            ranked.extend(
+                (4, position)
+                for position, entry in enumerate(self._entries)
+                if position not in seen and (
+                    term in entry.id or term in entry.title or term in entry.short_title
+                )
+            )
+
+        ranked.sort()
+        return [self._entries[position].style for _, position in ranked[:limit]]
+
+
+#: Shared index for this process
+index = StyleIndex()
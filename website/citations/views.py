@@ -1,25 +1,29 @@
 # -*- coding: utf-8 -*-
 
+import httplib as http
+
 from flask import request
 
 from modularodm import Q
-from website.models import CitationStyle
+
+from framework.exceptions import HTTPError
+from framework.auth.decorators import collect_auth
+
+from website import settings
+from website.models import Node
+from website.citations import styles
+from website.citations import formatting
 from website.project.decorators import must_be_contributor_or_public
 
 
 def list_citation_styles():
-    query = None
-
     term = request.args.get('q')
-    if term:
-        query = (
-            Q('_id', 'icontains', term) |
-            Q('title', 'icontains', term) |
-            Q('short_title', 'icontains', term)
-        )
+    limit = request.args.get('limit', type=int)
+    if term and limit is None:
+        limit = settings.CITATION_STYLE_SEARCH_LIMIT
 
     return {
-        'styles': [style.to_json() for style in CitationStyle.find(query)],
+        'styles': styles.index.search(term, limit=limit),
     }
 
 
@@ -27,3 +31,60 @@ def list_citation_styles():
 def node_citation(**kwargs):
     node = kwargs['node'] or kwargs['project']
     return {node.csl['id']: node.csl}
+
+
+@must_be_contributor_or_public
+def node_citation_formatted(style, **kwargs):
+    """Return the node's citation rendered in CSL style `style`, as plain text
+    or, with ``?format=html``, as HTML.
+    """
+    node = kwargs['node'] or kwargs['project']
+    fmt = request.args.get('format', 'text')
+    try:
+        citation = formatting.render_node_citation(node, style, fmt)
+    except ValueError as error:
+        raise HTTPError(http.BAD_REQUEST, data={'message_long': error.message})
+    return {
+        'id': node._id,
+        'style': style,
+        'citation': citation,
+    }
+
+
+@collect_auth
+def render_citations(auth, **kwargs):
+    """Render citations for several nodes in one request, e.g. for a meeting
+    listing. Nodes the current user cannot view are left out.
+
+    Query parameters: ``nodes`` (comma-separated ids), ``style`` and
+    optionally ``format``.
+    """
+    node_ids = [
+        each for each in request.args.get('nodes', '').split(',') if each
+    ]
+    if not node_ids:
+        raise HTTPError(http.BAD_REQUEST, data={'message_long': 'No nodes given'})
+    if len(node_ids) > settings.CITATION_RENDER_BATCH_LIMIT:
+        raise HTTPError(http.BAD_REQUEST, data={
+            'message_long': 'At most {0} nodes may be cited at once'.format(
+                settings.CITATION_RENDER_BATCH_LIMIT
+            ),
+        })
+    nodes = [
+        node for node in Node.find(
+            Q('_id', 'in', node_ids) &
+            Q('is_deleted', 'eq', False)
+        )
+        if node.can_view(auth)
+    ]
+    style = request.args.get('style')
+    try:
+        citations = formatting.render_node_citations(
+            nodes, style, request.args.get('format', 'text')
+        )
+    except ValueError as error:
+        raise HTTPError(http.BAD_REQUEST, data={'message_long': error.message})
+    return {
+        'style': style,
+        'citations': citations,
+    }
@@ -19,6 +19,7 @@ from framework.mongo import StoredObject
 from framework.mongo.utils import unique_on
 from framework.sessions import session
 
+from website import settings
 from website.util import web_url_for
 from requests.exceptions import HTTPError as RequestsHTTPError
 from oauthlib.oauth2.rfc6749.errors import MissingTokenError
@@ -56,9 +57,17 @@ class ExternalAccount(StoredObject):
 
     # Used for OAuth2 only
     refresh_token = fields.StringField()
-    expires_at = fields.DateTimeField()
+    expires_at = fields.DateTimeField(index=True)
     scopes = fields.StringField(list=True, default=lambda: list())
 
+    # Bookkeeping for the token refresh scheduler (see website.oauth.refresh)
+    date_last_refreshed = fields.DateTimeField()
+    # Consecutive failed refreshes; reset by a successful refresh
+    refresh_failures = fields.IntegerField(default=0)
+    refresh_error = fields.StringField()
+    # Do not retry a failed refresh before this time
+    date_refresh_retry = fields.DateTimeField()
+
     # The `name` of the service
     # This lets us query for only accounts on a particular provider
     provider = fields.StringField(required=True)
@@ -106,6 +115,10 @@ class ExternalProvider(object):
     # Default to OAuth v2.0.
     _oauth_version = OAUTH2
 
+    # The provider URL to exchange a refresh token for a new access token. Set
+    # for OAuth2 providers whose access tokens expire.
+    auto_refresh_url = None
+
     def __init__(self):
         super(ExternalProvider, self).__init__()
 
@@ -333,6 +346,61 @@ class ExternalProvider(object):
 
             return values
 
+    def needs_refresh(self, leeway=None):
+        """Whether the access token of ``self.account`` can be refreshed and
+        expires within `leeway` seconds (default
+        ``settings.OAUTH_REFRESH_LEEWAY``).
+        """
+        if self._oauth_version != OAUTH2 or not self.auto_refresh_url:
+            return False
+        if not (self.account and self.account.refresh_token and self.account.expires_at):
+            return False
+        if leeway is None:
+            leeway = settings.OAUTH_REFRESH_LEEWAY
+        remaining = self.account.expires_at - datetime.datetime.utcnow()
+        return remaining < datetime.timedelta(seconds=leeway)
+
+    def refresh_oauth_key(self, force=False):
+        """Exchange the refresh token of ``self.account`` for a new access
+        token, if the current one is about to expire or `force` is True.
+
+        Tokens are normally refreshed ahead of expiry by the scheduler in
+        ``website.oauth.refresh``; calling this before using a client is a
+        fallback for tokens the scheduler has not reached.
+
+        :return bool: True if the token was refreshed
+        :raises: requests/oauthlib errors if the provider rejects the refresh
+        """
+        if not (force or self.needs_refresh(leeway=0)):
+            return False
+        if not (self.auto_refresh_url and self.account.refresh_token):
+            return False
+
+        response = OAuth2Session(
+            self.client_id,
+            token={
+                'access_token': self.account.oauth_key,
+                'refresh_token': self.account.refresh_token,
+                'token_type': 'Bearer',
+            },
+        ).refresh_token(
+            self.auto_refresh_url,
+            refresh_token=self.account.refresh_token,
+            client_id=self.client_id,
+            client_secret=self.client_secret,
+        )
+        info = self._default_handle_callback(response)
+
+        self.account.oauth_key = info['key']
+        self.account.refresh_token = info.get('refresh_token', self.account.refresh_token)
+        self.account.expires_at = info.get('expires_at')
+        self.account.date_last_refreshed = datetime.datetime.utcnow()
+        self.account.refresh_failures = 0
+        self.account.refresh_error = None
+        self.account.date_refresh_retry = None
+        self.account.save()
+        return True
+
     @abc.abstractmethod
     def handle_callback(self, response):
         """Hook for allowing subclasses to parse information from the callback.
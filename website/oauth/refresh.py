@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Scheduler that refreshes OAuth2 access tokens ahead of expiry for every
+``ExternalProvider`` that sets ``auto_refresh_url``, so that requests do not
+pay for a token refresh round trip. Run periodically via
+``scripts/refresh_oauth_tokens.py``, at an interval shorter than
+``settings.OAUTH_REFRESH_LEEWAY``.
+
+Accounts whose refresh fails are retried with exponential back-off and
+skipped entirely after ``settings.OAUTH_REFRESH_MAX_FAILURES`` consecutive
+failures, until the user reconnects the account.
+"""
+
+import logging
+import datetime
+import collections
+
+from modularodm import Q
+
+from website import settings
+from website.oauth.models import ExternalAccount
+from website.oauth.utils import PROVIDER_LOOKUP
+
+
+logger = logging.getLogger(__name__)
+
+REFRESHED = 'refreshed'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+
+def refreshable_providers():
+    """Short names of providers that support refreshing access tokens."""
+    return sorted(
+        short_name
+        for short_name, provider in PROVIDER_LOOKUP.iteritems()
+        if provider.auto_refresh_url
+    )
+
+
+def get_targets(now=None):
+    """Return accounts whose access tokens expire within
+    ``settings.OAUTH_REFRESH_LEEWAY`` seconds and are not backing off after a
+    failure, soonest expiry first.
+    """
+    now = now or datetime.datetime.utcnow()
+    cutoff = now + datetime.timedelta(seconds=settings.OAUTH_REFRESH_LEEWAY)
+    return ExternalAccount.find(
+        Q('provider', 'in', refreshable_providers()) &
+        Q('refresh_token', 'ne', None) &
+        Q('expires_at', 'lt', cutoff) &
+        (
+            Q('refresh_failures', 'eq', None) |
+            Q('refresh_failures', 'lt', settings.OAUTH_REFRESH_MAX_FAILURES)
+        ) &
+        (
+            Q('date_refresh_retry', 'eq', None) |
+            Q('date_refresh_retry', 'lt', now)
+        )
+    ).sort('expires_at')
+
+
+def backoff(failures):
+    """Seconds to wait before retrying after `failures` consecutive failures."""
+    return min(
+        settings.OAUTH_REFRESH_BACKOFF * 2 ** max(failures - 1, 0),
+        settings.OAUTH_REFRESH_MAX_BACKOFF,
+    )
+
+
+def record_failure(account, error):
+    account.refresh_failures = (account.refresh_failures or 0) + 1
+    account.refresh_error = repr(error)
+    account.date_refresh_retry = datetime.datetime.utcnow() + datetime.timedelta(
+        seconds=backoff(account.refresh_failures)
+    )
+    account.save()
+
+
+def refresh_account(account):
+    """Refresh the access token of `account`, recording any failure.
+
+    :return str: One of `REFRESHED`, `SKIPPED` or `FAILED`
+    """
+    provider = PROVIDER_LOOKUP[account.provider]()
+    provider.account = account
+    try:
+        refreshed = provider.refresh_oauth_key(force=True)
+    except Exception as error:
+        logger.warning('Could not refresh token for {0!r}: {1!r}'.format(account, error))
+        record_failure(account, error)
+        return FAILED
+    return REFRESHED if refreshed else SKIPPED
+
+
+def partition(accounts):
+    """Split accounts into batches, at most
+    ``settings.OAUTH_REFRESH_CONCURRENCY`` per provider (falling back to
+    ``OAUTH_REFRESH_DEFAULT_CONCURRENCY``). Each batch is refreshed serially,
+    which bounds the number of concurrent requests made to each provider.
+
+    :return list: (provider short name, list of account ids) tuples
+    """
+    by_provider = collections.defaultdict(list)
+    for account in accounts:
+        by_provider[account.provider].append(account._id)
+    batches = []
+    for provider, account_ids in sorted(by_provider.iteritems()):
+        concurrency = settings.OAUTH_REFRESH_CONCURRENCY.get(
+            provider, settings.OAUTH_REFRESH_DEFAULT_CONCURRENCY
+        )
+        batches.extend(
+            (provider, account_ids[index::concurrency])
+            for index in range(min(concurrency, len(account_ids)))
+        )
+    return batches
+
+
+def get_metrics(now=None):
+    """Summarize token health per refreshable provider.
+
+    :return dict: Provider short name => dict of counts: `expiring` (due for
+        refresh), `expired`, `backing_off` (failed, waiting to retry),
+        `abandoned` (reached the failure limit) and `refreshed_last_day`
+    """
+    now = now or datetime.datetime.utcnow()
+    cutoff = now + datetime.timedelta(seconds=settings.OAUTH_REFRESH_LEEWAY)
+    metrics = {}
+    for provider in refreshable_providers():
+        base = Q('provider', 'eq', provider) & Q('refresh_token', 'ne', None)
+        metrics[provider] = {
+            'expiring': ExternalAccount.find(base & Q('expires_at', 'lt', cutoff)).count(),
+            'expired': ExternalAccount.find(base & Q('expires_at', 'lt', now)).count(),
+            'backing_off': ExternalAccount.find(
+                base &
+                Q('date_refresh_retry', 'gt', now) &
+                Q('refresh_failures', 'lt', settings.OAUTH_REFRESH_MAX_FAILURES)
+            ).count(),
+            'abandoned': ExternalAccount.find(
+                base & Q('refresh_failures', 'gte', settings.OAUTH_REFRESH_MAX_FAILURES)
+            ).count(),
+            'refreshed_last_day': ExternalAccount.find(
+                base & Q('date_last_refreshed', 'gt', now - datetime.timedelta(days=1))
+            ).count(),
+        }
+    return metrics
+
+
+def schedule(dry_run=False):
+    """Refresh every account due for a refresh. Each batch from `partition` is
+    sent to a Celery worker if ``settings.USE_CELERY``; otherwise batches run
+    in this process.
+
+    :return list: (provider short name, list of account ids) batches
+    """
+    # Avoid circular imports
+    from website.oauth import tasks
+    batches = partition(get_targets())
+    for provider, account_ids in batches:
+        logger.info('Refreshing {0} {1} tokens'.format(len(account_ids), provider))
+        if dry_run:
+            continue
+        if settings.USE_CELERY:
+            tasks.refresh_accounts.delay(account_ids)
+        else:
+            tasks.refresh_accounts(account_ids)
+    return batches
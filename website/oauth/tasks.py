@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+import collections
+
+from framework.tasks import app
+from framework.transactions.context import transaction
+
+from website.oauth import refresh
+from website.oauth.models import ExternalAccount
+
+
+@app.task
+@transaction()
+def refresh_accounts(account_ids):
+    """Refresh the access tokens of `account_ids` one at a time.
+
+    :return dict: Number of accounts per outcome (see `website.oauth.refresh`)
+    """
+    results = collections.Counter()
+    for account_id in account_ids:
+        account = ExternalAccount.load(account_id)
+        if account is None:
+            continue
+        results[refresh.refresh_account(account)] += 1
+    return dict(results)
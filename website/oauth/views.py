@@ -3,12 +3,15 @@
 import httplib as http
 
 from flask import redirect
+from modularodm import Q
 
+from framework.auth import User
 from framework.auth.decorators import must_be_logged_in
 from framework.exceptions import HTTPError
 from website.oauth.models import ExternalAccount
 from website.oauth.utils import get_service
 from website.oauth.signals import oauth_complete
+from website.addons.citations import library
 
 @must_be_logged_in
 def oauth_disconnect(external_account_id, auth):
@@ -31,6 +34,10 @@ def oauth_disconnect(external_account_id, auth):
     user.external_accounts.remove(account)
     user.save()
 
+    # Drop local copies of the account's data once no user is connected to it
+    if not User.find(Q('external_accounts', 'eq', account._id)).count():
+        library.clear(account._id)
+
 @must_be_logged_in
 def oauth_connect(service_name, auth):
     service = get_service(service_name)
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Maintained index of how many projects each pair of users contributes to
+together. One document per user holds the counts for all of that user's
+co-contributors, so "most in common" suggestions are a single read by
+primary key instead of a scan over every project the user contributed to.
+
+    {
+        '_id': <User._id>,
+        'counts': {<other User._id>: <number of shared nodes>, ...},
+    }
+"""
+
+import itertools
+
+from framework.mongo import database
+
+
+COLLECTION = 'cocontributorcounters'
+
+
+def _update_pairs(pairs, amount, db=None):
+    db = db or database  # default to local proxy
+    collection = db[COLLECTION]
+    increments = {}
+    for user_id, other_id in pairs:
+        if user_id == other_id:
+            continue
+        increments.setdefault(user_id, {})
+        increments[user_id]['counts.{0}'.format(other_id)] = amount
+    for user_id, inc in increments.iteritems():
+        collection.update(
+            {'_id': user_id},
+            {'$inc': inc},
+            upsert=True,
+            manipulate=False,
+        )
+
+
+def _pairs(changed_ids, other_ids):
+    """Yield both directions of every pair between `changed_ids` and
+    `other_ids`, plus every pair within `changed_ids`.
+    """
+    changed_ids = list(changed_ids)
+    for user_id, other_id in itertools.product(changed_ids, other_ids):
+        yield user_id, other_id
+        yield other_id, user_id
+    for user_id, other_id in itertools.permutations(changed_ids, 2):
+        yield user_id, other_id
+
+
+def contributors_added(added_ids, existing_ids, db=None):
+    """Record that `added_ids` joined a node whose other contributors are
+    `existing_ids`.
+    """
+    _update_pairs(_pairs(added_ids, existing_ids), 1, db=db)
+
+
+def contributors_removed(removed_ids, remaining_ids, db=None):
+    """Record that `removed_ids` left a node whose remaining contributors are
+    `remaining_ids`.
+    """
+    _update_pairs(_pairs(removed_ids, remaining_ids), -1, db=db)
+
+
+def get_counts(user_id, db=None):
+    """Return a dict mapping co-contributor id => number of shared nodes."""
+    db = db or database
+    result = db[COLLECTION].find_one({'_id': user_id}, {'counts': 1})
+    if not result:
+        return {}
+    return {
+        other_id: count
+        for other_id, count in result.get('counts', {}).iteritems()
+        if count > 0
+    }
+
+
+def most_common(user_id, exclude=None, db=None):
+    """Return (co-contributor id, shared node count) tuples ordered from most
+    to least shared nodes.
+
+    :param str user_id: User to look up
+    :param exclude: Collection of user ids to leave out
+    """
+    exclude = set(exclude or [])
+    return sorted(
+        (
+            (other_id, count)
+            for other_id, count in get_counts(user_id, db=db).iteritems()
+            if other_id not in exclude
+        ),
+        key=lambda item: (-item[1], item[0]),
+    )
+
+
+def rebuild(nodes, db=None):
+    """Recompute all counts from scratch over `nodes`."""
+    db = db or database
+    collection = db[COLLECTION]
+    counts = {}
+    for node in nodes:
+        contributor_ids = node.contributors._to_primary_keys()
+        for user_id, other_id in itertools.permutations(contributor_ids, 2):
+            user_counts = counts.setdefault(user_id, {})
+            user_counts[other_id] = user_counts.get(other_id, 0) + 1
+    collection.remove({})
+    for user_id, user_counts in counts.iteritems():
+        collection.insert({'_id': user_id, 'counts': user_counts}, manipulate=False)
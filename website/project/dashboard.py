@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Lightweight queries backing the dashboard node listing. These read the
+node collection directly so that permission filtering happens in MongoDB,
+only the fields needed for a summary are transferred, and log counts and
+modification dates are fetched for all nodes at once instead of loading
+every node and its log list into Python.
+"""
+
+from framework.mongo import database
+
+from website.project import log_index
+from website.project.model import Node
+
+
+#: Node fields needed to render a dashboard summary
+SUMMARY_FIELDS = ('title', 'category', 'date_created')
+
+
+def find_dashboard_nodes(user, include_components=True, permission=None, db=None):
+    """Return summary documents for the non-deleted, non-registration nodes
+    `user` contributes to. Projects are listed before components.
+
+    :param User user: Current user
+    :param bool include_components: Include nodes that are not projects
+    :param str permission: Only include nodes on which `user` has this permission
+    :return list: Dicts with the keys in `SUMMARY_FIELDS` plus `_id` and
+        `permissions` (`user`'s permissions only)
+    """
+    db = db or database
+    query = {
+        'contributors': user._id,
+        'is_deleted': False,
+        'is_registration': False,
+        'is_folder': False,
+    }
+    if not include_components:
+        query['category'] = 'project'
+    if permission:
+        query['permissions.{0}'.format(user._id)] = permission
+
+    projection = {field: True for field in SUMMARY_FIELDS}
+    projection['permissions.{0}'.format(user._id)] = True
+
+    docs = []
+    for doc in db[Node._name].find(query, projection):
+        doc['permissions'] = doc.get('permissions', {}).get(user._id, [])
+        docs.append(doc)
+    docs.sort(key=lambda doc: doc.get('category') != 'project')
+    return docs
+
+
+def get_last_log_dates(docs, db=None):
+    """Return a dict mapping node id => date of its most recent log, falling
+    back to the node's creation date, for documents returned by
+    `find_dashboard_nodes`.
+    """
+    log_dates = log_index.latest_dates([doc['_id'] for doc in docs], db=db)
+    return {
+        doc['_id']: log_dates.get(doc['_id']) or doc.get('date_created')
+        for doc in docs
+    }
+
+
+def get_log_counts(node_ids, db=None):
+    """Return a dict mapping node id => number of logs, computed with a single
+    aggregation over the log index.
+    """
+    return log_index.counts(node_ids, db=db)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Buffer for logs created by WaterButler file-action callbacks. A folder
+upload sends one callback per file; instead of appending each log to
+``Node.logs`` and saving the whole node, each log is saved on its own and its
+id queued per node. The queue is added to the node's log index in one bulk
+insert after ``settings.WATERBUTLER_LOG_BUFFER_WINDOW`` seconds (see
+`website.project.tasks.flush_node_logs`), so every per-file log is kept for
+the activity feed.
+
+    {
+        '_id': <Node._id>,
+        'logs': [<NodeLog._id>, ...],
+    }
+"""
+
+import logging
+import threading
+import contextlib
+
+from modularodm import Q
+
+from framework.mongo import database
+from framework.tasks.handlers import enqueue_task
+
+from website import settings
+
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = 'pendingnodelogs'
+
+_local = threading.local()
+
+
+def is_buffering(node_id):
+    """Whether logs added to node `node_id` in this thread are buffered."""
+    return node_id in getattr(_local, 'node_ids', ())
+
+
+@contextlib.contextmanager
+def buffering(node_id):
+    """Buffer logs added to node `node_id` within the block, unless
+    ``settings.WATERBUTLER_LOG_BUFFER_WINDOW`` is 0.
+    """
+    if not settings.WATERBUTLER_LOG_BUFFER_WINDOW or is_buffering(node_id):
+        yield
+        return
+    if not hasattr(_local, 'node_ids'):
+        _local.node_ids = set()
+    _local.node_ids.add(node_id)
+    try:
+        yield
+    finally:
+        _local.node_ids.discard(node_id)
+
+
+def push(node_id, log_id, db=None):
+    """Queue saved log `log_id` to be added to node `node_id`, scheduling a
+    flush if it is the first log queued for the node.
+    """
+    db = db or database  # default to local proxy
+    result = db[COLLECTION].update(
+        {'_id': node_id},
+        {'$push': {'logs': log_id}},
+        upsert=True,
+        manipulate=False,
+    )
+    if not result.get('updatedExisting'):
+        schedule_flush(node_id)
+
+
+def schedule_flush(node_id):
+    # Avoid circular imports
+    from website.project import tasks
+    enqueue_task(
+        tasks.flush_node_logs.si(node_id).set(
+            countdown=settings.WATERBUTLER_LOG_BUFFER_WINDOW
+        )
+    )
+
+
+def flush(node_id, db=None):
+    """Add the queued logs of node `node_id` to the node in one bulk insert.
+
+    :return int: Number of logs added
+    """
+    # Avoid circular imports
+    from website.project.model import Node, NodeLog
+    db = db or database
+    pending = db[COLLECTION].find_and_modify({'_id': node_id}, remove=True)
+    if not pending:
+        return 0
+    node = Node.load(node_id)
+    if node is None:
+        logger.error('Dropping {0} logs of missing node {1}'.format(
+            len(pending['logs']), node_id
+        ))
+        return 0
+    logs = list(NodeLog.find(Q('_id', 'in', pending['logs'])).sort('date'))
+    node.logs.extend(logs)
+    return len(logs)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""Append-only index of the logs of each node, kept outside the node document
+so that adding a log is a single insert and loading or saving a node does not
+carry its whole log history. One document per (node, log) pair; a log shared
+by a fork or registration and its original has an entry for each node.
+
+    {
+        '_id': <ObjectId>,
+        'node': <Node._id>,
+        'log': <NodeLog._id>,
+        'date': <NodeLog.date>,
+    }
+
+Entries are ordered by log date, then by insertion order.
+"""
+
+import pymongo
+
+from framework.mongo import database
+
+
+COLLECTION = 'nodelogindex'
+
+ORDER = [('date', pymongo.ASCENDING), ('_id', pymongo.ASCENDING)]
+REVERSE_ORDER = [('date', pymongo.DESCENDING), ('_id', pymongo.DESCENDING)]
+
+
+def _collection(db=None):
+    db = db or database  # default to local proxy
+    collection = db[COLLECTION]
+    collection.ensure_index([('node', pymongo.ASCENDING), ('date', pymongo.ASCENDING)])
+    collection.ensure_index('log')
+    return collection
+
+
+def extend(node_id, entries, db=None):
+    """Add logs to a node.
+
+    :param list entries: (log id, log date) tuples
+    """
+    docs = [
+        {'node': node_id, 'log': log_id, 'date': date}
+        for log_id, date in entries
+    ]
+    if docs:
+        _collection(db).insert(docs, manipulate=False)
+
+
+def append(node_id, log_id, date, db=None):
+    extend(node_id, [(log_id, date)], db=db)
+
+
+def copy(source_id, target_id, db=None):
+    """Give node `target_id` every log of node `source_id`."""
+    collection = _collection(db)
+    entries = collection.find({'node': source_id}, {'log': True, 'date': True}).sort(ORDER)
+    extend(target_id, [(each['log'], each['date']) for each in entries], db=db)
+
+
+def remove(node_id, log_ids=None, db=None):
+    """Remove logs `log_ids` from a node, or all of its logs."""
+    query = {'node': node_id}
+    if log_ids is not None:
+        query['log'] = {'$in': list(log_ids)}
+    _collection(db).remove(query)
+
+
+def count(node_id, db=None):
+    return _collection(db).find({'node': node_id}).count()
+
+
+def log_ids(node_id, skip=0, limit=0, reverse=False, db=None):
+    """Return ids of a node's logs, oldest first unless `reverse`."""
+    cursor = _collection(db).find({'node': node_id}, {'log': True})
+    cursor = cursor.sort(REVERSE_ORDER if reverse else ORDER).skip(skip).limit(limit)
+    return [each['log'] for each in cursor]
+
+
+def latest(node_id, db=None):
+    """Return the id of a node's most recent log, or None."""
+    ids = log_ids(node_id, limit=1, reverse=True, db=db)
+    return ids[0] if ids else None
+
+
+def contains(node_id, log_id, db=None):
+    return _collection(db).find_one({'node': node_id, 'log': log_id}) is not None
+
+
+def node_ids(log_id, db=None):
+    """Return ids of every node that has log `log_id`, in the order the log
+    was added to them.
+    """
+    cursor = _collection(db).find({'log': log_id}, {'node': True}).sort('_id')
+    return [each['node'] for each in cursor]
+
+
+def log_ids_for_nodes(node_ids, db=None):
+    """Return ids of every log of any node in `node_ids`."""
+    return _collection(db).find({'node': {'$in': list(node_ids)}}).distinct('log')
+
+
+def _aggregate(node_ids, group, db=None):
+    node_ids = list(node_ids)
+    if not node_ids:
+        return []
+    result = _collection(db).aggregate([
+        {'$match': {'node': {'$in': node_ids}}},
+        {'$group': dict(group, _id='$node')},
+    ])
+    # pymongo 2.x returns the command response rather than a cursor
+    return result.get('result', [])
+
+
+def counts(node_ids, db=None):
+    """Return a dict mapping node id => number of logs."""
+    return {
+        each['_id']: each['count']
+        for each in _aggregate(node_ids, {'count': {'$sum': 1}}, db=db)
+    }
+
+
+def latest_dates(node_ids, db=None):
+    """Return a dict mapping node id => date of its most recent log, for
+    nodes that have logs.
+    """
+    return {
+        each['_id']: each['date']
+        for each in _aggregate(node_ids, {'date': {'$max': '$date'}}, db=db)
+    }
@@ -18,10 +18,12 @@ from modularodm import fields
 from modularodm.validators import MaxLengthValidator
 from modularodm.exceptions import ValidationTypeError
 from modularodm.exceptions import ValidationValueError
+from modularodm.storage.mongostorage import translate_query
 
 from api.base.utils import absolute_reverse
 from framework import status
 from framework.mongo import ObjectId
+from framework.mongo import database
 from framework.mongo import StoredObject
 from framework.addons import AddonModelMixin
 from framework.auth import get_user, User, Auth
@@ -42,6 +44,8 @@ from website import language, mails, settings, tokens
 from website.util import web_url_for
 from website.util import api_url_for
 from website.util import sanitize
+from website.util import smart_folders
+from website.util import waterbutler_grants
 from website.exceptions import (
     NodeStateError,
     InvalidSanctionApprovalToken, InvalidSanctionRejectionToken,
@@ -52,6 +56,9 @@ from website.util.permissions import expand_permissions
 from website.util.permissions import CREATOR_PERMISSIONS, DEFAULT_CONTRIBUTOR_PERMISSIONS, ADMIN
 from website.project.metadata.schemas import OSF_META_SCHEMAS
 from website.project import signals as project_signals
+from website.project import cocontributors
+from website.project import log_buffer
+from website.project import log_index
 
 logger = logging.getLogger(__name__)
 
@@ -414,6 +421,101 @@ class NodeLog(StoredObject):
         }
 
 
+class NodeLogList(object):
+    """List-like view of a node's logs in chronological order, backed by
+    `website.project.log_index`. Appending writes to the index immediately;
+    items are loaded on access.
+    """
+
+    def __init__(self, node):
+        self.node = node
+
+    @property
+    def _node_id(self):
+        # Logs may be added before a new node is first saved
+        if self.node._primary_key is None:
+            self.node._ensure_guid()
+        return self.node._primary_key
+
+    @staticmethod
+    def _load(log_ids):
+        logs = {
+            log._id: log
+            for log in NodeLog.find(Q('_id', 'in', log_ids))
+        } if log_ids else {}
+        return [logs[log_id] for log_id in log_ids if log_id in logs]
+
+    def _to_primary_keys(self):
+        if self.node._primary_key is None:
+            return []
+        return log_index.log_ids(self.node._primary_key)
+
+    def __len__(self):
+        if self.node._primary_key is None:
+            return 0
+        return log_index.count(self.node._primary_key)
+
+    def __nonzero__(self):
+        return self.node._primary_key is not None and \
+            log_index.latest(self.node._primary_key) is not None
+
+    def __iter__(self):
+        return iter(self._load(self._to_primary_keys()))
+
+    def __reversed__(self):
+        # Returns a list, so that callers can slice the result
+        if self.node._primary_key is None:
+            return []
+        return self._load(log_index.log_ids(self.node._primary_key, reverse=True))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._load(self._to_primary_keys()[index])
+        log_ids = []
+        if self.node._primary_key is not None:
+            if index < 0:
+                log_ids = log_index.log_ids(
+                    self.node._primary_key, skip=-index - 1, limit=1, reverse=True
+                )
+            else:
+                log_ids = log_index.log_ids(self.node._primary_key, skip=index, limit=1)
+        if not log_ids:
+            raise IndexError('list index out of range')
+        return NodeLog.load(log_ids[0])
+
+    def __contains__(self, log):
+        if self.node._primary_key is None or log is None:
+            return False
+        return log_index.contains(self.node._primary_key, log._id)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '<NodeLogList({0!r})>'.format(self.node._primary_key)
+
+    def append(self, log):
+        log_index.append(self._node_id, log._id, log.date)
+        self.node._logs_modified(log.date)
+
+    def extend(self, logs):
+        entries = [(log._id, log.date) for log in logs]
+        log_index.extend(self._node_id, entries)
+        if entries:
+            self.node._logs_modified(max(date for _, date in entries))
+
+    def remove(self, log):
+        log_index.remove(self._node_id, [log._id])
+
+    def find(self, query=None):
+        """Query this node's logs, e.g. ``node.logs.find(Q('user', 'eq', user))``."""
+        in_node = Q('_id', 'in', self._to_primary_keys())
+        return NodeLog.find(in_node & query if query is not None else in_node)
+
+
 class Tag(StoredObject):
 
     _id = fields.StringField(primary=True, validate=MaxLengthValidator(128))
@@ -540,6 +642,9 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         'is_retracted',
     }
 
+    # The deep URL of a node depends only on its primary key
+    DEEP_URL_FIELDS = set()
+
     # Maps category identifier => Human-readable representation for use in
     # titles, menus, etc.
     # Use an OrderedDict so that menu items show in the correct order
@@ -562,9 +667,15 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         'category',
     ]
 
+    # Maximum number of users kept in `User.recently_added`
+    MAX_RECENT_LENGTH = 15
+
     _id = fields.StringField(primary=True)
 
     date_created = fields.DateTimeField(auto_now_add=datetime.datetime.utcnow, index=True)
+    # Date of the most recent log, or of creation for nodes without logs;
+    # kept up to date by `NodeLogList`
+    date_modified = fields.DateTimeField(index=True)
 
     # Privacy
     is_public = fields.BooleanField(default=False, index=True)
@@ -618,7 +729,6 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
     contributors = fields.ForeignField('user', list=True, backref='contributed')
     users_watching_node = fields.ForeignField('user', list=True, backref='watched')
 
-    logs = fields.ForeignField('nodelog', list=True, backref='logged')
     tags = fields.ForeignField('tag', list=True, backref='tagged')
 
     # Tags for internal use
@@ -812,6 +922,82 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             self.is_admin_parent(auth.user)
         )
 
+    @classmethod
+    def find_viewable(cls, query, auth):
+        """Find the nodes matching `query` that `auth` can view, deciding as
+        `can_view` does but in the database rather than node by node.
+        """
+        return cls.find(cls.viewable_query(query, auth))
+
+    @classmethod
+    def viewable_query(cls, query, auth):
+        """Return a query for the nodes matching `query` that `auth` can view,
+        as used by `find_viewable`.
+        """
+        user = auth.user if auth else None
+        private_key = auth.private_key if auth else None
+
+        visible = Q('is_public', 'eq', True)
+        if user:
+            # Matches if 'read' is among the user's permissions
+            visible = visible | Q('permissions.{0}'.format(user._id), 'eq', 'read')
+        if private_key:
+            links = database[PrivateLink._name].find(
+                {'key': private_key, 'is_deleted': False},
+                {'nodes': True},
+            )
+            shared = [node_id for link in links for node_id in link.get('nodes', [])]
+            if shared:
+                visible = visible | Q('_id', 'in', shared)
+        if user:
+            # Only nodes hidden so far can be visible through an admin parent
+            hidden_query = query & ~visible
+            cls._process_query(hidden_query)  # replace records with their keys
+            hidden = database[cls._name].find(
+                translate_query(hidden_query),
+                {'_id': True},
+            )
+            admin_child_ids = cls._admin_child_ids([doc['_id'] for doc in hidden], user)
+            if admin_child_ids:
+                visible = visible | Q('_id', 'in', list(admin_child_ids))
+
+        return query & visible
+
+    @classmethod
+    def _admin_child_ids(cls, node_ids, user):
+        """Return those of `node_ids` with an ancestor administered by `user`,
+        as `is_admin_parent` would find it, fetching one level of parents per
+        query. As with `parent_node`, the walk stops at deleted parents.
+        """
+        found = set()
+        seen = set(node_ids)
+        # Map each ancestor to reach to the nodes beneath it
+        below = {node_id: set([node_id]) for node_id in node_ids}
+        while below:
+            # `nodes` is an abstract foreign field, stored as [id, name] pairs
+            parents = database[cls._name].find(
+                {'nodes': {'$in': [[node_id, cls._name] for node_id in below]}},
+                {'nodes': True, 'permissions': True, 'is_deleted': True},
+            )
+            next_below = {}
+            for parent in parents:
+                if parent.get('is_deleted'):
+                    continue
+                descendants = set()
+                for child_id, _ in parent.get('nodes', []):
+                    descendants |= below.get(child_id, set())
+                if ADMIN in parent.get('permissions', {}).get(user._id, []):
+                    found |= descendants
+                elif parent['_id'] not in seen:
+                    seen.add(parent['_id'])
+                    next_below.setdefault(parent['_id'], set()).update(descendants)
+            below = {
+                parent_id: descendants - found
+                for parent_id, descendants in next_below.items()
+                if descendants - found
+            }
+        return found
+
     def is_expanded(self, user=None):
         """Return if a user is has expanded the folder in the dashboard view.
         Must specify one of (`auth`, `user`).
@@ -955,8 +1141,12 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
 
     @property
     def visible_contributors(self):
+        users = {
+            user._id: user
+            for user in User.find(Q('_id', 'in', self.visible_contributor_ids))
+        }
         return [
-            User.load(_id)
+            users.get(_id)
             for _id in self.visible_contributor_ids
         ]
 
@@ -995,10 +1185,11 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         a contributor visible is more efficient than recomputing order on
         accessing `visible_contributors`.
         """
+        visible_ids = set(self.visible_contributor_ids)
         self.visible_contributor_ids = [
-            contributor._id
-            for contributor in self.contributors
-            if contributor._id in self.visible_contributor_ids
+            contributor_id
+            for contributor_id in self.contributors._to_primary_keys()
+            if contributor_id in visible_ids
         ]
         if save:
             self.save()
@@ -1102,6 +1293,9 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             if existing_dashboards.count() > 0:
                 raise NodeStateError("Only one dashboard allowed per user.")
 
+        if first_save and self.date_modified is None:
+            self.date_modified = self.date_created or datetime.datetime.utcnow()
+
         is_original = not self.is_registration and not self.is_fork
         if 'suppress_log' in kwargs.keys():
             suppress_log = kwargs['suppress_log']
@@ -1111,6 +1305,17 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
 
         saved_fields = super(Node, self).save(*args, **kwargs)
 
+        if first_save and len(self.contributors) > 1:
+            cocontributors.contributors_added(
+                self.contributors._to_primary_keys(), [],
+            )
+
+        if smart_folders.COUNTED_FIELDS.intersection(saved_fields):
+            smart_folders.invalidate(self.contributors._to_primary_keys())
+
+        if not first_save and waterbutler_grants.GRANT_FIELDS.intersection(saved_fields):
+            waterbutler_grants.invalidate([self._id])
+
         if first_save and is_original and not suppress_log:
             # TODO: This logic also exists in self.use_as_template()
             for addon in settings.ADDONS_AVAILABLE:
@@ -1397,7 +1602,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         ids = [self._id] + [n._id
                             for n in self.get_descendants_recursive()
                             if n.can_view(auth)]
-        query = Q('__backrefs.logged.node.logs', 'in', ids)
+        query = Q('_id', 'in', log_index.log_ids_for_nodes(ids))
         return NodeLog.find(query).sort('-_id')
 
     @property
@@ -1508,23 +1713,58 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         # Return forked content
         return forked
 
+    @property
+    def logs(self):
+        """This node's logs, oldest first. Logs are kept in
+        `website.project.log_index` rather than on the node document.
+        """
+        return NodeLogList(self)
+
+    @logs.setter
+    def logs(self, logs):
+        """Replace this node's logs, e.g. with the logs of another node."""
+        node_logs = NodeLogList(self)
+        log_index.remove(node_logs._node_id)
+        if isinstance(logs, NodeLogList):
+            if logs.node._primary_key is not None:
+                log_index.copy(logs.node._primary_key, node_logs._node_id)
+        else:
+            log_index.extend(node_logs._node_id, [
+                (log._id, log.date) for log in logs if log is not None
+            ])
+        latest = log_index.latest_dates([node_logs._node_id]).get(node_logs._node_id)
+        self._logs_modified(latest or self.date_created, later_only=False)
+
     def get_recent_logs(self, n=10):
         """Return a list of the n most recent logs, in reverse chronological
         order.
 
         :param int n: Number of logs to retrieve
         """
-        return list(reversed(self.logs)[:n])
+        if self._primary_key is None:
+            return []
+        return NodeLogList._load(log_index.log_ids(self._id, limit=n, reverse=True))
 
-    @property
-    def date_modified(self):
-        '''The most recent datetime when this node was modified, based on
-        the logs.
-        '''
-        try:
-            return self.logs[-1].date
-        except IndexError:
-            return self.date_created
+    def _logs_modified(self, date, later_only=True):
+        """Set `date_modified` to `date`, the date of the most recent log.
+        Adding a log does not save the node, so stored nodes are also updated
+        in the database.
+
+        :param bool later_only: Only move `date_modified` forward
+        """
+        if date is None:
+            return
+        if later_only and self.date_modified and self.date_modified >= date:
+            return
+        self.date_modified = date
+        if self._is_loaded:
+            query = {'_id': self._primary_key}
+            if later_only:
+                query['$or'] = [
+                    {'date_modified': {'$lt': date}},
+                    {'date_modified': None},
+                ]
+            database[self._name].update(query, {'$set': {'date_modified': date}})
 
     def set_title(self, title, auth, save=False):
         """Set the title of this Node and log it.
@@ -1752,7 +1992,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         return forked
 
     def register_node(self, schema, auth, template, data, parent=None):
-        """Make a frozen copy of a node.
+        """Make a frozen copy of a node and its non-deleted components.
 
         :param schema: Schema object
         :param auth: All the auth information including user, API key.
@@ -1760,6 +2000,28 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         :param data: Form data
         :param parent Node: parent registration of registration to be created
         """
+        self._ensure_registrable(auth)
+
+        template = urllib.unquote_plus(template)
+        template = to_mongo(template)
+
+        when = datetime.datetime.utcnow()
+
+        # Create the GUIDs of the whole tree at once
+        guids = self.reserve_guids(self._count_registrable())
+
+        registered = self._register_tree(schema, auth, template, data, when, guids)
+
+        if parent:
+            registered.parent_node = parent
+
+        # Archive the whole tree from its top-level registration
+        if settings.ENABLE_ARCHIVER:
+            project_signals.after_create_registration.send(self, dst=registered, user=auth.user)
+
+        return registered
+
+    def _ensure_registrable(self, auth):
         # NOTE: Admins can register child nodes even if they don't have write access them
         if not self.can_edit(auth=auth) and not self.is_admin_parent(user=auth.user):
             raise PermissionsError(
@@ -1769,11 +2031,19 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if self.is_folder:
             raise NodeStateError("Folders may not be registered")
 
-        template = urllib.unquote_plus(template)
-        template = to_mongo(template)
-
-        when = datetime.datetime.utcnow()
+    def _count_registrable(self):
+        """Count the nodes that registering this node registers."""
+        return 1 + sum(
+            node_contained._count_registrable()
+            for node_contained in self.nodes
+            if node_contained.primary and not node_contained.is_deleted
+        )
 
+    def _register_tree(self, schema, auth, template, data, when, guids=None):
+        """Register this node after its components, so that each registration
+        is saved once, with its components already in place, rather than
+        saved again as each component registration is attached to it.
+        """
         original = self.load(self._primary_key)
 
         # Note: Cloning a node copies its `wiki_pages_current` and
@@ -1784,7 +2054,23 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if original.is_deleted:
             raise NodeStateError('Cannot register deleted node.')
 
+        child_registrations = []
+        for node_contained in original.nodes:
+            if node_contained.is_deleted:
+                continue
+            if node_contained.primary:
+                node_contained._ensure_registrable(auth)
+                child_registration = node_contained._register_tree(
+                    schema, auth, template, data, when, guids
+                )
+            else:
+                child_registration = node_contained.register_node()
+            if child_registration is not None:
+                child_registrations.append(child_registration)
+
         registered = original.clone()
+        if guids:
+            registered._primary_key = guids.pop()
 
         registered.is_registration = True
         registered.registered_date = when
@@ -1801,31 +2087,17 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         registered.logs = self.logs
         registered.tags = self.tags
         registered.piwik_site_id = None
+        for child_registration in child_registrations:
+            registered.nodes.append(child_registration)
 
         registered.save()
 
-        if parent:
-            registered.parent_node = parent
-
         # After register callback
         for addon in original.get_addons():
             _, message = addon.after_register(original, registered, auth.user)
             if message:
                 status.push_status_message(message, kind='info', trust=False)
 
-        for node_contained in original.nodes:
-            if not node_contained.is_deleted:
-                child_registration = node_contained.register_node(
-                    schema, auth, template, data, parent=registered
-                )
-                if child_registration and not child_registration.primary:
-                    registered.nodes.append(child_registration)
-
-        registered.save()
-
-        if settings.ENABLE_ARCHIVER:
-            project_signals.after_create_registration.send(self, dst=registered, user=auth.user)
-
         return registered
 
     def remove_tag(self, tag, auth, save=True):
@@ -1876,9 +2148,12 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if log_date:
             log.date = log_date
         log.save()
-        self.logs.append(log)
-        if save:
-            self.save()
+        if log_buffer.is_buffering(self._id):
+            log_buffer.push(self._id, log._id)
+        else:
+            self.logs.append(log)
+            if save:
+                self.save()
         if user:
             increment_user_activity_counters(user._primary_key, action, log.date)
         return log
@@ -2136,6 +2411,14 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
                 self.permissions.pop(old._id)
                 if old._id in self.visible_contributor_ids:
                     self.visible_contributor_ids[self.visible_contributor_ids.index(old._id)] = new._id
+                if self._is_loaded:
+                    other_ids = [
+                        user_id for user_id in self.contributors._to_primary_keys()
+                        if user_id != new._id
+                    ]
+                    cocontributors.contributors_removed([old._id], other_ids)
+                    cocontributors.contributors_added([new._id], other_ids)
+                smart_folders.invalidate([old._id])
                 return True
         return False
 
@@ -2191,29 +2474,79 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
 
         self.save()
 
+        cocontributors.contributors_removed(
+            [contributor._id], self.contributors._to_primary_keys(),
+        )
+        smart_folders.invalidate([contributor._id])
+
         #send signal to remove this user from project subscriptions
         auth_signals.contributor_removed.send(contributor, node=self)
 
         return True
 
     def remove_contributors(self, contributors, auth=None, log=True, save=False):
+        """Remove multiple contributors in a single pass. All membership
+        changes are applied in memory, add-on callbacks run once per add-on
+        with the full list of removed users, and a single log is written.
 
-        results = []
-        removed = []
+        :param list contributors: User objects to be removed
+        :param Auth auth: All the auth information including user, API key
+        :param bool log: Add log to self
+        :param bool save: Save after removing contributors
+        :returns: Whether contributors were removed; ``False`` if removing
+            them would leave no visible or no registered admin contributors
+        """
+        removed_ids = set(contributor._id for contributor in contributors)
+        removed_ids.intersection_update(self.contributors._to_primary_keys())
+        removed = [
+            contributor for contributor in contributors
+            if contributor._id in removed_ids
+        ]
+        if not removed:
+            return True
+
+        # Node must keep at least one visible contributor and one registered
+        # admin user
+        remaining_ids = [
+            user_id for user_id in self.contributors._to_primary_keys()
+            if user_id not in removed_ids
+        ]
+        if not set(remaining_ids).intersection(self.visible_contributor_ids):
+            return False
+        admin_ids = [
+            user_id for user_id in remaining_ids
+            if ADMIN in self.permissions.get(user_id, [])
+        ]
+        if not any(User.load(user_id).is_registered for user_id in admin_ids):
+            return False
+
+        users_to_save = []
+        for contributor in removed:
+            # remove unclaimed record if necessary
+            if self._primary_key in contributor.unclaimed_records:
+                del contributor.unclaimed_records[self._primary_key]
+                users_to_save.append(contributor)
+            self.permissions.pop(contributor._id, None)
+            self.contributors.remove(contributor._id)
+
+        self.visible_contributor_ids = [
+            user_id for user_id in self.visible_contributor_ids
+            if user_id not in removed_ids
+        ]
+
+        # After remove callback
+        for addon in self.get_addons():
+            messages = addon.after_remove_contributors(self, removed, auth)
+            for message in messages:
+                status.push_status_message(message, kind='info', trust=True)
 
-        for contrib in contributors:
-            outcome = self.remove_contributor(
-                contributor=contrib, auth=auth, log=False,
-            )
-            results.append(outcome)
-            removed.append(contrib._id)
         if log:
             self.add_log(
                 action=NodeLog.CONTRIB_REMOVED,
                 params={
                     'project': self.parent_id,
                     'node': self._primary_key,
-                    'contributors': removed,
+                    'contributors': [user._id for user in removed],
                 },
                 auth=auth,
                 save=False,
@@ -2222,8 +2555,18 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if save:
             self.save()
 
-        if False in results:
-            return False
+        for user in users_to_save:
+            user.save()
+
+        if self._is_loaded:
+            cocontributors.contributors_removed(
+                removed_ids, self.contributors._to_primary_keys(),
+            )
+        smart_folders.invalidate(removed_ids)
+
+        # send signal to remove these users from project subscriptions
+        for contributor in removed:
+            auth_signals.contributor_removed.send(contributor, node=self)
 
         return True
 
@@ -2242,6 +2585,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             users = []
             user_ids = []
             permissions_changed = {}
+            visibility_added = []
             visibility_removed = []
             to_retain = []
             to_remove = []
@@ -2257,20 +2601,35 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
                 if set(permissions) != set(self.get_permissions(user)):
                     self.set_permissions(user, permissions, save=False)
                     permissions_changed[user._id] = permissions
-                # visible must be added before removed to ensure they are validated properly
                 if user_dict['visible']:
-                    self.set_visible(user,
-                                     visible=True,
-                                     auth=auth)
-                else:
-                    visibility_removed.append(user)
+                    if user._id not in self.visible_contributor_ids:
+                        visibility_added.append(user._id)
+                elif user._id in self.visible_contributor_ids:
+                    visibility_removed.append(user._id)
                 users.append(user)
                 user_ids.append(user_dict['id'])
 
-            for user in visibility_removed:
-                self.set_visible(user,
-                                 visible=False,
-                                 auth=auth)
+            # visible must be added before removed to ensure they are validated properly
+            visible_ids = set(self.visible_contributor_ids)
+            visible_ids.update(visibility_added)
+            visible_ids.difference_update(visibility_removed)
+            if not visible_ids:
+                raise ValueError('Must have at least one visible contributor')
+            self.visible_contributor_ids = list(visible_ids)
+            for action, changed in (
+                    (NodeLog.MADE_CONTRIBUTOR_VISIBLE, visibility_added),
+                    (NodeLog.MADE_CONTRIBUTOR_INVISIBLE, visibility_removed)):
+                if changed:
+                    self.add_log(
+                        action,
+                        params={
+                            'parent': self.parent_id,
+                            'node': self._id,
+                            'contributors': changed,
+                        },
+                        auth=auth,
+                        save=False,
+                    )
 
             for user in self.contributors:
                 if user._id in user_ids:
@@ -2341,8 +2700,6 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         :param bool save: Save after adding contributor
         :returns: Whether contributor was added
         """
-        MAX_RECENT_LENGTH = 15
-
         # If user is merged into another account, use master account
         contrib_to_add = contributor.merged_by if contributor.is_merged else contributor
         if contrib_to_add not in self.contributors:
@@ -2358,12 +2715,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
 
             # Add contributor to recently added list for user
             if auth is not None:
-                user = auth.user
-                if contrib_to_add in user.recently_added:
-                    user.recently_added.remove(contrib_to_add)
-                user.recently_added.insert(0, contrib_to_add)
-                while len(user.recently_added) > MAX_RECENT_LENGTH:
-                    user.recently_added.pop()
+                self._update_recently_added(auth.user, [contrib_to_add])
 
             if log:
                 self.add_log(
@@ -2379,6 +2731,16 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
             if save:
                 self.save()
 
+            # Unsaved nodes are indexed in full on first save
+            if self._is_loaded:
+                cocontributors.contributors_added(
+                    [contrib_to_add._id],
+                    [
+                        user_id for user_id in self.contributors._to_primary_keys()
+                        if user_id != contrib_to_add._id
+                    ],
+                )
+
             project_signals.contributor_added.send(self, contributor=contributor)
 
             return True
@@ -2393,8 +2755,22 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         else:
             return False
 
+    def _update_recently_added(self, user, added):
+        """Move `added` users to the front of `user.recently_added`, most
+        recently added first.
+        """
+        added_ids = set(contrib._id for contrib in added)
+        recent = [
+            contrib for contrib in reversed(added)
+        ] + [
+            contrib for contrib in user.recently_added
+            if contrib._id not in added_ids
+        ]
+        user.recently_added = recent[:self.MAX_RECENT_LENGTH]
+
     def add_contributors(self, contributors, auth=None, log=True, save=False):
-        """Add multiple contributors
+        """Add multiple contributors. Membership changes are applied in memory
+        in a single pass and a single log is written for the whole batch.
 
         :param list contributors: A list of dictionaries of the form:
             {
@@ -2405,22 +2781,52 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         :param auth: All the auth information including user, API key.
         :param log: Add log to self
         :param save: Save after adding contributor
+        :returns: List of users that were added
         """
+        contributor_ids = set(self.contributors._to_primary_keys())
+        visible_ids = set(self.visible_contributor_ids)
+        added = []
         for contrib in contributors:
-            self.add_contributor(
-                contributor=contrib['user'], permissions=contrib['permissions'],
-                visible=contrib['visible'], auth=auth, log=False, save=False,
+            contributor = contrib['user']
+            # If user is merged into another account, use master account
+            contrib_to_add = contributor.merged_by if contributor.is_merged else contributor
+            permissions = contrib.get('permissions')
+            if contrib_to_add._id in contributor_ids:
+                # Permissions must be overridden if changed when contributor is
+                # added to parent he/she is already on a child of.
+                if permissions is not None:
+                    self.set_permissions(contrib_to_add, permissions)
+                continue
+            self.contributors.append(contrib_to_add)
+            contributor_ids.add(contrib_to_add._id)
+            if contrib.get('visible', True):
+                visible_ids.add(contrib_to_add._id)
+            self.set_permissions(
+                contrib_to_add,
+                list(permissions or DEFAULT_CONTRIBUTOR_PERMISSIONS),
             )
-        if log and contributors:
+            added.append((contributor, contrib_to_add))
+
+        if not added:
+            if save:
+                self.save()
+            return []
+
+        if visible_ids != set(self.visible_contributor_ids):
+            self.visible_contributor_ids = list(visible_ids)
+            self.update_visible_ids(save=False)
+
+        added_users = [user for _, user in added]
+        if auth is not None:
+            self._update_recently_added(auth.user, added_users)
+
+        if log:
             self.add_log(
                 action=NodeLog.CONTRIB_ADDED,
                 params={
                     'project': self.parent_id,
                     'node': self._primary_key,
-                    'contributors': [
-                        contrib['user']._id
-                        for contrib in contributors
-                    ],
+                    'contributors': [user._id for user in added_users],
                 },
                 auth=auth,
                 save=False,
@@ -2428,6 +2834,22 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin):
         if save:
             self.save()
 
+        # Unsaved nodes are indexed in full on first save
+        if self._is_loaded:
+            added_ids = set(user._id for user in added_users)
+            cocontributors.contributors_added(
+                added_ids,
+                [
+                    user_id for user_id in self.contributors._to_primary_keys()
+                    if user_id not in added_ids
+                ],
+            )
+
+        for contributor, _ in added:
+            project_signals.contributor_added.send(self, contributor=contributor)
+
+        return added_users
+
     def add_unregistered_contributor(self, fullname, email, auth,
                                      permissions=None, save=False):
         """Add a non-registered contributor to the project.
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+
+from framework.tasks import app
+from framework.transactions.context import transaction
+
+from website.project import log_buffer
+
+
+@app.task
+@transaction()
+def flush_node_logs(node_id):
+    """Add the buffered WaterButler logs of a node; see
+    `website.project.log_buffer`.
+    """
+    return log_buffer.flush(node_id)
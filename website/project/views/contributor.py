@@ -1,11 +1,11 @@
 # -*- coding: utf-8 -*-
 
-from collections import Counter
 import httplib as http
 import itertools
 import time
 
 from flask import request
+from modularodm import Q
 from modularodm.exceptions import ValidationError, ValidationValueError
 
 from framework import forms
@@ -28,6 +28,7 @@ from website import security
 from website import settings
 from website.models import Node
 from website.profile import utils as profile_utils
+from website.project import cocontributors
 from website.project.decorators import (must_have_permission, must_be_valid_project,
         must_not_be_registration, must_be_contributor_or_public, must_be_contributor)
 from website.project.model import has_anonymous_link
@@ -148,19 +149,24 @@ def get_most_in_common_contributors(auth, node, **kwargs):
     except (TypeError, ValueError):
         n_contribs = settings.MAX_MOST_IN_COMMON_LENGTH
 
-    contrib_counts = Counter(contrib_id
-        for node in auth.user.node__contributed
-        for contrib_id in node.contributors._to_primary_keys()
-        if contrib_id not in node_contrib_ids)
+    most_common = cocontributors.most_common(auth.user._id, exclude=node_contrib_ids)
 
-    active_contribs = itertools.ifilter(
-        lambda c: User.load(c[0]).is_active,
-        contrib_counts.most_common()
-    )
-
-    limited = itertools.islice(active_contribs, n_contribs)
-
-    contrib_objs = [(User.load(_id), count) for _id, count in limited]
+    # Load candidates in batches until enough active users are found
+    contrib_objs = []
+    batch_size = max(n_contribs, 1) * 2
+    for start in range(0, len(most_common), batch_size):
+        batch = most_common[start:start + batch_size]
+        users = {
+            user._id: user
+            for user in User.find(Q('_id', 'in', [_id for _id, _ in batch]))
+        }
+        contrib_objs.extend(
+            (users[_id], count) for _id, count in batch
+            if _id in users and users[_id].is_active
+        )
+        if len(contrib_objs) >= n_contribs:
+            break
+    contrib_objs = contrib_objs[:n_contribs]
 
     contribs = [
         profile_utils.add_contributor_json(most_contrib, auth.user)
@@ -20,6 +20,7 @@ from website import language
 from website.util import paths
 from website.util import rubeus
 from website.exceptions import NodeStateError
+from website.project import log_index
 from website.project import clean_template_name, new_node, new_private_link
 from website.project.decorators import (
     must_be_contributor_or_public,
@@ -892,7 +893,7 @@ def _get_user_activity(node, auth, rescale_ratio):
 
 @must_be_valid_project
 def get_recent_logs(node, **kwargs):
-    logs = list(reversed(node.logs._to_primary_keys()))[:3]
+    logs = log_index.log_ids(node._id, limit=3, reverse=True)
     return {'logs': logs}
 
 
@@ -912,6 +913,7 @@ def _get_summary(node, auth, rescale_ratio, primary=True, link_id=None, show_pat
     }
 
     if node.can_view(auth):
+        parent = node.parent_node
         summary.update({
             'can_view': True,
             'can_edit': node.can_edit(auth),
@@ -937,8 +939,8 @@ def _get_summary(node, auth, rescale_ratio, primary=True, link_id=None, show_pat
             'non_ua': None,
             'addons_enabled': node.get_addon_names(),
             'is_public': node.is_public,
-            'parent_title': node.parent_node.title if node.parent_node else None,
-            'parent_is_public': node.parent_node.is_public if node.parent_node else False,
+            'parent_title': parent.title if parent else None,
+            'parent_is_public': parent.is_public if parent else False,
             'show_path': show_path
         })
         if rescale_ratio:
@@ -233,6 +233,12 @@ def make_url_map(app):
             citation_views.list_citation_styles,
             json_renderer,
         ),
+        Rule(
+            '/citations/render/',
+            'get',
+            citation_views.render_citations,
+            json_renderer,
+        ),
     ], prefix='/api/v1')
 
     process_rules(app, [
@@ -396,6 +402,15 @@ def make_url_map(app):
             citation_views.node_citation,
             json_renderer,
         ),
+        Rule(
+            [
+                '/project/<pid>/citation/<style>/',
+                '/project/<pid>/node/<nid>/citation/<style>/',
+            ],
+            'get',
+            citation_views.node_citation_formatted,
+            json_renderer,
+        ),
 
     ], prefix='/api/v1')
 
@@ -5,6 +5,7 @@ from __future__ import division
 import re
 import copy
 import math
+import time
 import logging
 import unicodedata
 
@@ -22,9 +23,9 @@ from framework import sentry
 
 from website import settings
 from website.filters import gravatar
-from website.models import User, Node
+from website.models import Node
 from website.search import exceptions
-from website.search.util import build_query
+from website.project import cocontributors
 from website.util import sanitize
 from website.views import validate_page_num
 
@@ -46,6 +47,41 @@ NOT_ANALYZED_PROPERTY = {'type': 'string', 'index': 'not_analyzed'}
 # Perform stemming on the field it's applied to.
 ENGLISH_ANALYZER_PROPERTY = {'type': 'string', 'analyzer': 'english'}
 
+# Index every prefix of each name token so that as-you-type contributor
+# search is a plain term lookup rather than a wildcard/fuzzy scan.
+INDEX_SETTINGS = {
+    'analysis': {
+        'filter': {
+            'name_prefix_filter': {
+                'type': 'edgeNGram',
+                'min_gram': 1,
+                'max_gram': 20,
+            },
+        },
+        'analyzer': {
+            'name_prefix': {
+                'type': 'custom',
+                'tokenizer': 'standard',
+                'filter': ['lowercase', 'asciifolding', 'name_prefix_filter'],
+            },
+        },
+    },
+}
+
+NAME_PREFIX_PROPERTY = {
+    'type': 'string',
+    'fields': {
+        'prefix': {
+            'type': 'string',
+            'index_analyzer': 'name_prefix',
+            'search_analyzer': 'standard',
+        },
+    },
+}
+
+# Maps (query, page, size, excluded ids) => (expiration time, hits, total)
+_contributor_search_cache = {}
+
 INDEX = settings.ELASTIC_INDEX
 
 try:
@@ -324,6 +360,7 @@ def bulk_update_contributors(nodes, index=INDEX):
 @requires_search
 def update_user(user, index=None):
     index = index or INDEX
+    _contributor_search_cache.clear()
     if not user.is_active:
         try:
             es.delete(index=index, doc_type='user', id=user._id, refresh=True, ignore=[404])
@@ -363,6 +400,14 @@ def update_user(user, index=None):
         'degree': user.schools[0]['degree'] if user.schools else '',
         'social': user.social_links,
         'boost': 2,  # TODO(fabianvf): Probably should make this a constant or something
+        # Display fields for the add contributors widget
+        'gravatar_url': gravatar(
+            user,
+            use_ssl=True,
+            size=settings.GRAVATAR_SIZE_ADD_CONTRIBUTOR,
+        ),
+        'profile_url': user.profile_url,
+        'registered': user.is_registered,
     }
 
     es.index(index=index, doc_type='user', body=user_doc, id=user._id, refresh=True)
@@ -388,7 +433,7 @@ def create_index(index=None):
     project_like_types = ['project', 'component', 'registration']
     analyzed_fields = ['title', 'description']
 
-    es.indices.create(index, ignore=[400])
+    es.indices.create(index, body={'settings': INDEX_SETTINGS}, ignore=[400])
     for type_ in document_types:
         mapping = {'properties': {'tags': NOT_ANALYZED_PROPERTY}}
         if type_ in project_like_types:
@@ -414,6 +459,9 @@ def create_index(index=None):
                     'type': 'string',
                     'boost': '0.01'
                 },
+                'normalized_user': NAME_PREFIX_PROPERTY,
+                'gravatar_url': {'type': 'string', 'index': 'no'},
+                'profile_url': {'type': 'string', 'index': 'no'},
             }
             mapping['properties'].update(fields)
         es.indices.put_mapping(index=index, doc_type=type_, body=mapping, ignore=[400, 404])
@@ -426,15 +474,48 @@ def delete_doc(elastic_document_id, node, index=None, category=None):
     es.delete(index=index, doc_type=category, id=elastic_document_id, refresh=True, ignore=[404])
 
 
+def build_contributor_query(items, exclude_ids=None):
+    """Build a query matching users whose names start with each of `items`.
+    Exact word matches rank above prefix-only matches.
+    """
+    text = ' '.join(items)
+    return {
+        'bool': {
+            'must': [{
+                'match': {
+                    'normalized_user.prefix': {
+                        'query': text,
+                        'operator': 'and',
+                    },
+                },
+            }],
+            'should': [{
+                'match': {
+                    'normalized_user': {
+                        'query': text,
+                        'boost': 2,
+                    },
+                },
+            }],
+            'must_not': [{
+                'ids': {'values': list(exclude_ids or [])},
+            }],
+        },
+    }
+
+
 @requires_search
 def search_contributor(query, page=0, size=10, exclude=None, current_user=None):
     """Search for contributors to add to a project using elastic search. Request must
     include JSON data with a "query" field.
 
+    The response is built from the indexed user documents alone. Identical
+    queries are cached for ``settings.SEARCH_CONTRIBUTOR_CACHE_TTL`` seconds.
+
     :param query: The substring of the username to search for
     :param page: For pagination, the page number to use for results
     :param size: For pagination, the number of results per page
-    :param exclude: A list of User objects to exclude from the search
+    :param exclude: A list of User objects or user IDs to exclude from the search
     :param current_user: A User object of the current user
 
     :return: List of dictionaries, each containing the ID, full name,
@@ -443,7 +524,7 @@ def search_contributor(query, page=0, size=10, exclude=None, current_user=None):
     """
     start = (page * size)
     items = re.split(r'[\s-]+', query)
-    exclude = exclude or []
+    exclude_ids = sorted(getattr(excluded, '_id', excluded) for excluded in (exclude or []))
     normalized_items = []
     for item in items:
         try:
@@ -451,60 +532,56 @@ def search_contributor(query, page=0, size=10, exclude=None, current_user=None):
         except TypeError:
             normalized_item = item
         normalized_item = unicodedata.normalize('NFKD', normalized_item).encode('ascii', 'ignore')
-        normalized_items.append(normalized_item)
+        if normalized_item:
+            normalized_items.append(normalized_item)
     items = normalized_items
 
-    query = "  AND ".join('{}*~'.format(re.escape(item)) for item in items) + \
-            "".join(' NOT id:"{}"'.format(excluded._id) for excluded in exclude)
-
-    results = search(build_query(query, start=start, size=size), index=INDEX, doc_type='user')
-    docs = results['results']
-    pages = math.ceil(results['counts'].get('user', 0) / size)
+    cache_key = (tuple(items), start, size, tuple(exclude_ids))
+    cached = _contributor_search_cache.get(cache_key)
+    if cached and cached[0] > time.time():
+        _, hits, total = cached
+    else:
+        body = {
+            'query': build_contributor_query(items, exclude_ids),
+            'from': start,
+            'size': size,
+        }
+        raw_results = es.search(index=INDEX, doc_type='user', body=body)
+        hits = [hit['_source'] for hit in raw_results['hits']['hits']]
+        total = raw_results['hits']['total']
+        if settings.SEARCH_CONTRIBUTOR_CACHE_TTL:
+            if len(_contributor_search_cache) >= settings.SEARCH_CONTRIBUTOR_CACHE_SIZE:
+                _contributor_search_cache.clear()
+            _contributor_search_cache[cache_key] = (
+                time.time() + settings.SEARCH_CONTRIBUTOR_CACHE_TTL, hits, total,
+            )
+
+    pages = math.ceil(total / size)
     validate_page_num(page, pages)
 
+    if current_user:
+        projects_in_common = cocontributors.get_counts(current_user._id)
+    else:
+        projects_in_common = {}
+
     users = []
-    for doc in docs:
-        # TODO: use utils.serialize_user
-        user = User.load(doc['id'])
-
-        if current_user:
-            n_projects_in_common = current_user.n_projects_in_common(user)
-        else:
-            n_projects_in_common = 0
-
-        if user is None:
-            logger.error('Could not load user {0}'.format(doc['id']))
-            continue
-        if user.is_active:  # exclude merged, unregistered, etc.
-            current_employment = None
-            education = None
-
-            if user.jobs:
-                current_employment = user.jobs[0]['institution']
-
-            if user.schools:
-                education = user.schools[0]['institution']
-
-            users.append({
-                'fullname': doc['user'],
-                'id': doc['id'],
-                'employment': current_employment,
-                'education': education,
-                'n_projects_in_common': n_projects_in_common,
-                'gravatar_url': gravatar(
-                    user,
-                    use_ssl=True,
-                    size=settings.GRAVATAR_SIZE_ADD_CONTRIBUTOR,
-                ),
-                'profile_url': user.profile_url,
-                'registered': user.is_registered,
-                'active': user.is_active
-
-            })
+    for doc in hits:
+        # Only active users are indexed
+        users.append({
+            'fullname': doc['user'],
+            'id': doc['id'],
+            'employment': doc.get('job') or None,
+            'education': doc.get('school') or None,
+            'n_projects_in_common': projects_in_common.get(doc['id'], 0),
+            'gravatar_url': doc.get('gravatar_url'),
+            'profile_url': doc.get('profile_url'),
+            'registered': doc.get('registered', True),
+            'active': True,
+        })
 
     return {
         'users': users,
-        'total': results['counts']['total'],
+        'total': total,
         'pages': pages,
         'page': page,
     }
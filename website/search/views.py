@@ -193,7 +193,7 @@ def process_project_search_results(results, **kwargs):
 def search_contributor(auth):
     user = auth.user if auth else None
     nid = request.args.get('excludeNode')
-    exclude = Node.load(nid).contributors if nid else []
+    exclude = Node.load(nid).contributors._to_primary_keys() if nid else []
     query = bleach.clean(request.args.get('query', ''), tags=[], strip=True)
     page = int(bleach.clean(request.args.get('page', '0'), tags=[], strip=True))
     size = int(bleach.clean(request.args.get('size', '5'), tags=[], strip=True))
@@ -66,6 +66,9 @@ SEARCH_ENGINE = 'elastic'  # Can be 'elastic', or None
 ELASTIC_URI = 'localhost:9200'
 ELASTIC_TIMEOUT = 10
 ELASTIC_INDEX = 'website'
+# Seconds to cache identical add-contributor search queries; 0 disables caching
+SEARCH_CONTRIBUTOR_CACHE_TTL = 10
+SEARCH_CONTRIBUTOR_CACHE_SIZE = 1000
 SHARE_ELASTIC_URI = ELASTIC_URI
 SHARE_ELASTIC_INDEX = 'share'
 # For old indices
@@ -150,6 +153,32 @@ GRAVATAR_SIZE_DISCUSSION = 20
 # Conference options
 CONFERNCE_MIN_COUNT = 5
 
+# Minimum seconds between background syncs of a linked citation library
+# (Zotero, Mendeley); citation lists are served from the local copy
+CITATION_LIBRARY_SYNC_INTERVAL = 60 * 10
+
+# Seconds before the in-memory citation style index is reloaded, and the
+# default number of styles returned for a search term
+CITATION_STYLE_INDEX_TTL = 60 * 60
+CITATION_STYLE_SEARCH_LIMIT = 50
+
+# Seconds to keep server-rendered node citations, and the most nodes that may
+# be cited in one request
+CITATION_RENDER_CACHE_TTL = 60 * 60 * 24
+CITATION_RENDER_BATCH_LIMIT = 100
+
+# OAuth token refresh (see website.oauth.refresh). Tokens expiring within
+# OAUTH_REFRESH_LEEWAY seconds are refreshed; run the refresh script more often
+# than that
+OAUTH_REFRESH_LEEWAY = 15 * 60
+# Maximum concurrent refresh batches per provider short name
+OAUTH_REFRESH_CONCURRENCY = {}
+OAUTH_REFRESH_DEFAULT_CONCURRENCY = 2
+# Seconds to wait after the first failed refresh, doubled on each failure
+OAUTH_REFRESH_BACKOFF = 5 * 60
+OAUTH_REFRESH_MAX_BACKOFF = 6 * 60 * 60
+OAUTH_REFRESH_MAX_FAILURES = 10
+
 WIKI_WHITELIST = {
     'tags': [
         'a', 'abbr', 'acronym', 'b', 'bdo', 'big', 'blockquote', 'br',
@@ -189,6 +218,10 @@ CELERY_IMPORTS = (
     'framework.email.tasks',
     'framework.analytics.tasks',
     'website.mailchimp_utils',
+    'website.addons.citations.tasks',
+    'website.addons.osfstorage.tasks',
+    'website.oauth.tasks',
+    'website.project.tasks',
     'scripts.send_digest'
 )
 
@@ -255,6 +288,12 @@ DEFAULT_HMAC_SECRET = 'changeme'
 DEFAULT_HMAC_ALGORITHM = hashlib.sha256
 WATERBUTLER_URL = 'http://localhost:7777'
 WATERBUTLER_ADDRS = ['127.0.0.1']
+# Seconds to reuse an auth callback response for the same user, node, provider
+# and class of action; also the lifetime of the signed grant returned with it
+WATERBUTLER_GRANT_TTL = 60
+# Seconds to collect logs of WaterButler file actions on a node before adding
+# them to the node in one save; 0 to add each log immediately
+WATERBUTLER_LOG_BUFFER_WINDOW = 10
 
 # Test identifier namespaces
 DOI_NAMESPACE = 'doi:10.5072/FK2'
@@ -265,6 +304,11 @@ EZID_PASSWORD = 'changeme'
 # Format for DOIs and ARKs
 EZID_FORMAT = '{namespace}osf.io/{guid}'
 
+# Number of unused guids generated at a time when the guid pool runs out
+GUID_POOL_BATCH_SIZE = 1000
+# Seconds to cache what a guid resolves to; 0 to resolve guids on every request
+GUID_RESOLUTION_TTL = 24 * 60 * 60
+
 
 USE_SHARE = True
 SHARE_REGISTRATION_URL = ''
@@ -282,6 +326,8 @@ MAX_FILE_SIZE = MAX_ARCHIVE_SIZE  # TODO limit file size?
 ARCHIVE_TIMEOUT_TIMEDELTA = timedelta(1)  # 24 hours
 
 ENABLE_ARCHIVER = True
+# Largest number of addons of a registration tree that are examined at once
+ARCHIVER_MAX_CONCURRENCY = 4
 
 JWT_SECRET = 'changeme'
 JWT_ALGORITHM = 'HS256'
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+
+class TTLCache(object):
+    """Size-bounded, process-local mapping whose entries expire `ttl` seconds
+    after they are set. When full, expired entries are dropped first, then
+    the entries closest to expiring.
+
+    :param int ttl: Lifetime of an entry in seconds; nothing is cached if 0
+    :param int max_size: Maximum number of entries
+    """
+
+    def __init__(self, ttl, max_size=1000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data = {}
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires, value = entry
+        if expires <= time.time():
+            self._data.pop(key, None)
+            return default
+        return value
+
+    def set(self, key, value):
+        if not self.ttl:
+            return
+        if key not in self._data and len(self._data) >= self.max_size:
+            self._evict()
+        self._data[key] = (time.time() + self.ttl, value)
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self, match=None):
+        """Remove all entries, or those whose key satisfies `match`."""
+        if match is None:
+            self._data.clear()
+            return
+        for key in [key for key in self._data if match(key)]:
+            self._data.pop(key, None)
+
+    def _evict(self):
+        now = time.time()
+        for key, (expires, _) in self._data.items():
+            if expires <= now:
+                del self._data[key]
+        overflow = len(self._data) - self.max_size + 1
+        if overflow > 0:
+            oldest = sorted(self._data, key=lambda key: self._data[key][0])
+            for key in oldest[:overflow]:
+                del self._data[key]
@@ -11,6 +11,7 @@ from framework.auth.decorators import Auth
 
 from website.util import paths
 from website.util import sanitize
+from website.util import smart_folders
 from website.settings import (
     ALL_MY_PROJECTS_ID, ALL_MY_REGISTRATIONS_ID, ALL_MY_PROJECTS_NAME,
     ALL_MY_REGISTRATIONS_NAME, DISK_SAVING_MODE
@@ -175,6 +176,12 @@ class NodeProjectCollector(object):
         return rv
 
     def collect_all_projects_smart_folder(self):
+        children_count = smart_folders.get_count(
+            self.auth.user._id, ALL_MY_PROJECTS_ID, self._count_all_projects,
+        )
+        return self.make_smart_folder(ALL_MY_PROJECTS_NAME, ALL_MY_PROJECTS_ID, children_count)
+
+    def _count_all_projects(self):
         contributed = self.auth.user.node__contributed
         all_my_projects = contributed.find(
             Q('category', 'eq', 'project') &
@@ -194,10 +201,15 @@ class NodeProjectCollector(object):
             # exclude registrations
             Q('is_registration', 'eq', False)
         )
-        children_count = all_my_projects.count() + comps.count()
-        return self.make_smart_folder(ALL_MY_PROJECTS_NAME, ALL_MY_PROJECTS_ID, children_count)
+        return all_my_projects.count() + comps.count()
 
     def collect_all_registrations_smart_folder(self):
+        children_count = smart_folders.get_count(
+            self.auth.user._id, ALL_MY_REGISTRATIONS_ID, self._count_all_registrations,
+        )
+        return self.make_smart_folder(ALL_MY_REGISTRATIONS_NAME, ALL_MY_REGISTRATIONS_ID, children_count)
+
+    def _count_all_registrations(self):
         contributed = self.auth.user.node__contributed
         all_my_registrations = contributed.find(
             Q('category', 'eq', 'project') &
@@ -217,8 +229,7 @@ class NodeProjectCollector(object):
             # exclude registrations
             Q('is_registration', 'eq', True)
         )
-        children_count = all_my_registrations.count() + comps.count()
-        return self.make_smart_folder(ALL_MY_REGISTRATIONS_NAME, ALL_MY_REGISTRATIONS_ID, children_count)
+        return all_my_registrations.count() + comps.count()
 
     def make_smart_folder(self, title, node_id, children_count=0):
         return_value = {
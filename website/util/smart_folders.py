@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Per-user cache of the children counts shown on the project organizer's
+"All my projects" and "All my registrations" smart folders.
+
+Counts are stored in one document per user and dropped whenever a node the
+user contributes to is created, deleted, registered or changes contributors,
+so the next organizer load recomputes them once instead of on every load.
+
+    {
+        '_id': <User._id>,
+        '<smart folder id>': <count>,
+    }
+"""
+
+from framework.mongo import database
+
+
+COLLECTION = 'smartfoldercounts'
+
+# Node fields whose change can affect a contributor's smart folder counts
+COUNTED_FIELDS = {
+    'contributors',
+    'category',
+    'nodes',
+    'is_deleted',
+    'is_registration',
+    'is_folder',
+}
+
+
+def get_count(user_id, folder_id, compute, db=None):
+    """Return the cached count of `folder_id` for `user_id`, calling
+    `compute` and storing its result on a miss.
+    """
+    db = db or database  # default to local proxy
+    collection = db[COLLECTION]
+    cached = collection.find_one({'_id': user_id}, {folder_id: True})
+    if cached and folder_id in cached:
+        return cached[folder_id]
+    count = compute()
+    collection.update(
+        {'_id': user_id},
+        {'$set': {folder_id: count}},
+        upsert=True,
+        manipulate=False,
+    )
+    return count
+
+
+def invalidate(user_ids, db=None):
+    """Drop cached counts for every user in `user_ids`."""
+    db = db or database
+    user_ids = list(user_ids)
+    if user_ids:
+        db[COLLECTION].remove({'_id': {'$in': user_ids}})
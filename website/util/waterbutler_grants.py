@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Short-lived cache of the responses to WaterButler's auth callback
+(`website.addons.base.views.get_auth`), which is called for every file
+operation. A grant is keyed by user, node, provider and class of action, and
+expires after ``settings.WATERBUTLER_GRANT_TTL`` seconds. Grants are dropped
+as soon as the permissions, contributors or privacy of their node or one of
+its ancestors change, or when an add-on of their node is changed. Since
+responses include add-on credentials, expired grants are deleted by a TTL
+index rather than kept until they are next requested.
+
+    {
+        '_id': '<user id>:<node id>:<provider>:<action class>',
+        'nodes': [<node id>, <parent id>, ...],
+        'date': <when the grant was issued>,
+        'response': <auth callback response>,
+    }
+"""
+
+import datetime
+
+from framework.mongo import database
+
+from website import settings
+
+
+COLLECTION = 'waterbutlergrants'
+
+# Node fields whose change can affect access to the node or its children
+GRANT_FIELDS = {
+    'contributors',
+    'permissions',
+    'is_public',
+    'is_deleted',
+    'is_registration',
+    'nodes',
+}
+
+
+def grant_key(user_id, node_id, provider, action_class):
+    return ':'.join([user_id or 'anonymous', node_id, provider, action_class])
+
+
+def load(key, db=None):
+    """Return the cached response for grant `key`, or None if there is no
+    unexpired grant.
+    """
+    db = db or database  # default to local proxy
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(
+        seconds=settings.WATERBUTLER_GRANT_TTL
+    )
+    grant = db[COLLECTION].find_one({'_id': key, 'date': {'$gt': cutoff}})
+    return grant['response'] if grant else None
+
+
+def store(key, node_ids, response, db=None):
+    """Cache `response` as grant `key`.
+
+    :param list node_ids: Ids of the node and every ancestor whose
+        permissions were consulted
+    """
+    if not settings.WATERBUTLER_GRANT_TTL:
+        return
+    db = db or database
+    collection = db[COLLECTION]
+    collection.ensure_index('nodes')
+    collection.ensure_index('date', expireAfterSeconds=settings.WATERBUTLER_GRANT_TTL)
+    collection.update(
+        {'_id': key},
+        {
+            'nodes': list(node_ids),
+            'date': datetime.datetime.utcnow(),
+            'response': response,
+        },
+        upsert=True,
+        manipulate=False,
+    )
+
+
+def invalidate(node_ids, db=None):
+    """Drop every grant that depends on a node in `node_ids`."""
+    db = db or database
+    node_ids = list(node_ids)
+    if node_ids:
+        db[COLLECTION].remove({'nodes': {'$in': node_ids}})
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Write ZIP archives as a stream of chunks, without seeking and without
+holding whole files in memory. Each member is followed by a data descriptor
+carrying its checksum and sizes, so that its header can be sent before its
+contents have been read. Archives and members are limited to 4 GB, since
+ZIP64 is not supported.
+
+    response = Response(zip_stream([('a.txt', date, chunks)]), mimetype='application/zip')
+"""
+
+import zlib
+import struct
+import datetime
+import zipfile
+
+
+LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+DATA_DESCRIPTOR = struct.Struct('<IIII')
+CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+END_OF_CENTRAL_DIRECTORY = struct.Struct('<IHHHHIIH')
+
+VERSION = 20
+# Sizes and checksum follow the contents; names are UTF-8
+FLAGS = 0x08 | 0x800
+
+
+def _dos_datetime(date):
+    date = date or datetime.datetime.utcnow()
+    # DOS dates start in 1980 and have a resolution of two seconds
+    date = max(date, datetime.datetime(1980, 1, 1))
+    return (
+        (date.year - 1980) << 9 | date.month << 5 | date.day,
+        date.hour << 11 | date.minute << 5 | date.second // 2,
+    )
+
+
+class ZipStream(object):
+
+    def __init__(self, compression=zipfile.ZIP_DEFLATED):
+        self.compression = compression
+        self.offset = 0
+        self.members = []
+
+    def _write(self, data):
+        self.offset += len(data)
+        return data
+
+    def add(self, name, chunks, date=None):
+        """Yield the chunks of archive member `name` with contents `chunks`."""
+        if isinstance(name, unicode):
+            name = name.encode('utf-8')
+        dos_date, dos_time = _dos_datetime(date)
+        offset = self.offset
+        yield self._write(LOCAL_HEADER.pack(
+            0x04034b50, VERSION, FLAGS, self.compression, dos_time, dos_date,
+            0, 0, 0, len(name), 0,
+        ) + name)
+
+        crc, size, compressed_size = 0, 0, 0
+        compressor = (
+            zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+            if self.compression == zipfile.ZIP_DEFLATED
+            else None
+        )
+        for chunk in chunks:
+            if not chunk:
+                continue
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                compressed_size += len(chunk)
+                yield self._write(chunk)
+        if compressor:
+            chunk = compressor.flush()
+            compressed_size += len(chunk)
+            yield self._write(chunk)
+
+        crc &= 0xffffffff
+        yield self._write(DATA_DESCRIPTOR.pack(0x08074b50, crc, compressed_size, size))
+        self.members.append((name, dos_date, dos_time, crc, compressed_size, size, offset))
+
+    def finish(self):
+        """Yield the central directory, which ends the archive."""
+        start = self.offset
+        for name, dos_date, dos_time, crc, compressed_size, size, offset in self.members:
+            yield self._write(CENTRAL_HEADER.pack(
+                0x02014b50, VERSION, VERSION, FLAGS, self.compression, dos_time, dos_date,
+                crc, compressed_size, size, len(name), 0, 0, 0, 0, 0, offset,
+            ) + name)
+        yield self._write(END_OF_CENTRAL_DIRECTORY.pack(
+            0x06054b50, 0, 0, len(self.members), len(self.members),
+            self.offset - start, start, 0,
+        ))
+
+
+def zip_stream(members, compression=zipfile.ZIP_DEFLATED):
+    """Yield the chunks of a ZIP archive.
+
+    :param members: Iterable of (name, date, chunks) tuples, where `chunks` is
+        an iterable of the byte strings of a member's contents
+    """
+    stream = ZipStream(compression=compression)
+    for name, date, chunks in members:
+        for data in stream.add(name, chunks, date=date):
+            yield data
+    for data in stream.finish():
+        yield data
@@ -6,15 +6,18 @@ import httplib as http
 
 from modularodm import Q
 from flask import request
+from werkzeug.exceptions import HTTPException
 
 from framework import utils
 from framework import sentry
 from framework.auth.core import User
 from framework.flask import redirect  # VOL-aware redirect
-from framework.routing import proxy_url
+from framework.flask import app
+from framework.routing import proxy_url, proxy_view
 from framework.exceptions import HTTPError
 from framework.auth.forms import SignInForm
 from framework.forms import utils as form_utils
+from framework.guid import resolutions as guid_resolutions
 from framework.guid.model import GuidStoredObject
 from framework.auth.forms import RegistrationForm
 from framework.auth.forms import ResetPasswordForm
@@ -27,6 +30,7 @@ from website.models import Node
 from website.util import rubeus
 from website.util import sanitize
 from website.project import model
+from website.project import dashboard as dashboard_queries
 from website.util import web_url_for
 from website.util import permissions
 from website.project import new_dashboard
@@ -99,6 +103,41 @@ def _render_nodes(nodes, auth=None, show_path=False):
     return ret
 
 
+def _render_dashboard_nodes(docs):
+    """Render summary documents from `dashboard.find_dashboard_nodes` in the
+    same format as `_render_nodes`, without loading any nodes.
+    """
+    dates_modified = dashboard_queries.get_last_log_dates(docs)
+    log_counts = dashboard_queries.get_log_counts([doc['_id'] for doc in docs])
+    nodes = []
+    for doc in docs:
+        nodes.append({
+            'title': doc.get('title'),
+            'id': doc['_id'],
+            # Mirrors `Node.url` and `Node.api_url`
+            'url': '/{0}/'.format(doc['_id']),
+            'api_url': '/api/v1/project/{0}/'.format(doc['_id']),
+            'primary': True,
+            'date_modified': utils.iso8601format(dates_modified[doc['_id']]),
+            'category': doc.get('category'),
+            'permissions': (
+                permissions.reduce_permissions(doc['permissions'])
+                if doc['permissions'] else None
+            ),
+            # Only registrations are archived
+            'archiving': False,
+        })
+    if not docs:
+        rescale_ratio = 0
+    else:
+        rescale_ratio = float(max(log_counts.values() or [0]))
+    return {
+        'nodes': nodes,
+        'rescale_ratio': rescale_ratio,
+        'show_path': False,
+    }
+
+
 @collect_auth
 def index(auth):
     """Redirect to dashboard if user is logged in, else show homepage.
@@ -191,28 +230,8 @@ def get_dashboard_nodes(auth):
     """
     user = auth.user
 
-    contributed = user.node__contributed  # nodes user contributed to
-
-    nodes = contributed.find(
-        Q('category', 'eq', 'project') &
-        Q('is_deleted', 'eq', False) &
-        Q('is_registration', 'eq', False) &
-        Q('is_folder', 'eq', False)
-    )
-
-    if request.args.get('no_components') not in [True, 'true', 'True', '1', 1]:
-        comps = contributed.find(
-            # components only
-            Q('category', 'ne', 'project') &
-            # exclude deleted nodes
-            Q('is_deleted', 'eq', False) &
-            # exclude registrations
-            Q('is_registration', 'eq', False)
-        )
-    else:
-        comps = []
-
-    nodes = list(nodes) + list(comps)
+    include_components = request.args.get('no_components') not in [True, 'true', 'True', '1', 1]
+    perm = None
     if request.args.get('permissions'):
         perm = request.args['permissions'].strip().lower()
         if perm not in permissions.PERMISSIONS:
@@ -220,10 +239,13 @@ def get_dashboard_nodes(auth):
                 message_short='Invalid query parameter',
                 message_long='{0} is not in {1}'.format(perm, permissions.PERMISSIONS)
             ))
-        response_nodes = [node for node in nodes if node.has_permission(user, permission=perm)]
-    else:
-        response_nodes = nodes
-    return _render_nodes(response_nodes, auth)
+
+    docs = dashboard_queries.find_dashboard_nodes(
+        user,
+        include_components=include_components,
+        permission=perm,
+    )
+    return _render_dashboard_nodes(docs)
 
 
 @must_be_logged_in
@@ -327,6 +349,49 @@ def _build_guid_url(base, suffix=None):
     return u'/{0}/'.format(url)
 
 
+def _resolve_guid(guid):
+    """Return the deep URL that GUID `guid` resolves to, with the endpoint and
+    view function arguments of the URL for GET requests, or None if there is
+    no such GUID. Resolutions are cached.
+
+    :param str guid: GUID primary key
+    :return: Tuple of URL, endpoint and view function arguments
+    """
+    resolution = guid_resolutions.load(guid)
+    if resolution:
+        return resolution['url'], resolution['endpoint'], resolution['view_kwargs']
+
+    guid_object = Guid.load(guid)
+    if not guid_object:
+        return None
+
+    # verify that the object is a GuidStoredObject descendant. If a model
+    #   was once a descendant but that relationship has changed, it's
+    #   possible to have referents that are instances of classes that don't
+    #   have a redirect_mode attribute or otherwise don't behave as
+    #   expected.
+    if not isinstance(guid_object.referent, GuidStoredObject):
+        sentry.log_message(
+            'Guid `{}` resolved to non-guid object'.format(guid)
+        )
+        raise HTTPError(http.NOT_FOUND)
+    referent = guid_object.referent
+    if referent is None:
+        logger.error('Referent of GUID {0} not found'.format(guid))
+        raise HTTPError(http.NOT_FOUND)
+    if not referent.deep_url:
+        raise HTTPError(http.NOT_FOUND)
+
+    url = _build_guid_url(referent.deep_url)
+    try:
+        endpoint, view_kwargs = app.url_map.bind('').match(url, method='GET')
+    except HTTPException:
+        # Not served directly, e.g. redirected; match the URL on each request
+        endpoint, view_kwargs = None, {}
+    guid_resolutions.store(guid, referent, url, endpoint, view_kwargs)
+    return url, endpoint, view_kwargs
+
+
 def resolve_guid(guid, suffix=None):
     """Load GUID by primary key, look up the corresponding view function in the
     routing table, and return the return value of the view function without
@@ -336,35 +401,23 @@ def resolve_guid(guid, suffix=None):
     :param str suffix: Remainder of URL after the GUID
     :return: Return value of proxied view function
     """
-    # Look up GUID
-    guid_object = Guid.load(guid)
-    if guid_object:
-
-        # verify that the object is a GuidStoredObject descendant. If a model
-        #   was once a descendant but that relationship has changed, it's
-        #   possible to have referents that are instances of classes that don't
-        #   have a redirect_mode attribute or otherwise don't behave as
-        #   expected.
-        if not isinstance(guid_object.referent, GuidStoredObject):
-            sentry.log_message(
-                'Guid `{}` resolved to non-guid object'.format(guid)
-            )
-            raise HTTPError(http.NOT_FOUND)
-        referent = guid_object.referent
-        if referent is None:
-            logger.error('Referent of GUID {0} not found'.format(guid))
-            raise HTTPError(http.NOT_FOUND)
-        if not referent.deep_url:
-            raise HTTPError(http.NOT_FOUND)
-        url = _build_guid_url(referent.deep_url, suffix)
-        return proxy_url(url)
+    resolved = _resolve_guid(guid)
+    if resolved:
+        url, endpoint, view_kwargs = resolved
+        # Call the view function of the deep URL without matching it again;
+        # HEAD requests are served by GET rules
+        if (not suffix and request.method in ('GET', 'HEAD')
+                and endpoint in app.view_functions):
+            return proxy_view(endpoint, view_kwargs)
+        return proxy_url(_build_guid_url(url, suffix))
 
     # GUID not found; try lower-cased and redirect if exists
-    guid_object_lower = Guid.load(guid.lower())
-    if guid_object_lower:
-        return redirect(
-            _build_guid_url(guid.lower(), suffix)
-        )
+    if guid != guid.lower():
+        guid_object_lower = Guid.load(guid.lower())
+        if guid_object_lower:
+            return redirect(
+                _build_guid_url(guid.lower(), suffix)
+            )
 
     # GUID not found
     raise HTTPError(http.NOT_FOUND)